@@ -0,0 +1,21 @@
+"""Benchmark suite for Pixel Snake.
+
+Run it from the repository root:
+
+    python -m bench                     # run and compare against bench/baseline.json
+    python -m bench --update-baseline   # store the current results as the new baseline
+
+SDL's dummy video and audio drivers are used so the suite runs without a
+display or sound card.
+"""
+import os
+import sys
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+os.environ.setdefault('PYGAME_HIDE_SUPPORT_PROMPT', '1')
+
+# The game modules live flat in src/ and import each other by module name
+SRC_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src')
+if SRC_DIR not in sys.path:
+    sys.path.insert(0, SRC_DIR)
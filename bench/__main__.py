@@ -0,0 +1,91 @@
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+
+import bench  # Sets up the dummy SDL drivers and the src path
+import pygame
+from bench import codec, rendering, simulation, startup
+
+SUITES = {'simulation': simulation, 'rendering': rendering, 'startup': startup, 'codec': codec}
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m bench', description='Pixel Snake benchmark suite')
+    parser.add_argument('--suite', action='append', choices=sorted(SUITES), dest='suites',
+                        help='suite to run, may be repeated (default: all)')
+    parser.add_argument('--output', help='write the results to this JSON file')
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE,
+                        help='results to compare against (default: bench/baseline.json)')
+    parser.add_argument('--threshold', type=float, default=0.25,
+                        help='relative slowdown that counts as a regression (default: 0.25)')
+    parser.add_argument('--update-baseline', action='store_true',
+                        help='store these results as the new baseline instead of comparing')
+    parser.add_argument('--quick', action='store_true', help='fewer iterations, for a fast sanity check')
+    return parser.parse_args(argv)
+
+def run_suites(names, quick=False):
+    results = {
+        'metadata': {
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python': platform.python_version(),
+            'pygame': pygame.version.ver,
+            'platform': platform.platform(),
+            'quick': quick,
+        },
+        'metrics': {},
+    }
+    for name in names:
+        print(f'Running {name}...', flush=True)
+        results['metrics'].update(SUITES[name].run(quick=quick))
+    return results
+
+def compare(metrics, baseline, threshold):
+    """Print each metric against the baseline; returns the names that regressed"""
+    regressions = []
+    for name, current in sorted(metrics.items()):
+        value = current['value']
+        previous = baseline.get(name)
+        if previous is None or not previous['value']:
+            print(f'  {name:<50} {value:>12.2f} {current["unit"]:<8} (new)')
+            continue
+        # Positive change means better, whichever direction the metric goes
+        change = (value - previous['value']) / previous['value']
+        if not current['higher_is_better']:
+            change = -change
+        status = ''
+        if change < -threshold:
+            status = '  REGRESSION'
+            regressions.append(name)
+        print(f'  {name:<50} {value:>12.2f} {current["unit"]:<8} {change:+7.1%}{status}')
+    return regressions
+
+def main(argv=None):
+    args = parse_args(argv)
+    names = args.suites or list(SUITES)
+    results = run_suites(names, args.quick)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+
+    if args.update_baseline:
+        with open(args.baseline, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f'Baseline written to {args.baseline}')
+        return 0
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)['metrics']
+    regressions = compare(results['metrics'], baseline, args.threshold)
+    if regressions:
+        print(f'{len(regressions)} metric(s) regressed by more than {args.threshold:.0%}')
+        return 1
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
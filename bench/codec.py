@@ -0,0 +1,63 @@
+import time
+from bench.simulation import _cycle
+from bench.timing import best_of, metric
+from constants import *
+from engine import SnakeEngine
+from codec import StateEncoder, StateDecoder
+
+KEYFRAME_LENGTHS = [100, 10000]
+KEYFRAME_BOARD = (400, 400)
+
+def stream(ticks, seed=0):
+    """Encode autopilot games tick by tick; returns (bytes per tick, encode us, decode us)"""
+    from autopilot import Autopilot
+
+    autopilot = Autopilot()
+    engine = SnakeEngine(BOARD_COLS * SNAKE_BLOCK, BOARD_ROWS * SNAKE_BLOCK, seed=seed)
+    encoder = StateEncoder()
+    messages = []
+    encode_time = 0.0
+    while len(messages) < ticks:
+        if engine.game_over:
+            seed += 1
+            engine = SnakeEngine(BOARD_COLS * SNAKE_BLOCK, BOARD_ROWS * SNAKE_BLOCK, seed=seed)
+        engine.step(autopilot.act(engine))
+        start = time.perf_counter()
+        messages.append(encoder.encode(engine))
+        encode_time += time.perf_counter() - start
+
+    decoder = StateDecoder()
+    start = time.perf_counter()
+    for message in messages:
+        decoder.decode(message)
+    decode_time = time.perf_counter() - start
+    return (sum(map(len, messages)) / ticks, encode_time / ticks * 1e6, decode_time / ticks * 1e6)
+
+def keyframe(length, repeats):
+    """(bytes, encode us, decode us) of a keyframe with a `length` segment snake"""
+    cols, rows = KEYFRAME_BOARD
+    path = _cycle(cols, rows)
+    engine = SnakeEngine(cols * SNAKE_BLOCK, rows * SNAKE_BLOCK, speed=HARD, game_mode=TIME_ATTACK_MODE)
+    engine.snake.set_positions([(path[i][0] * SNAKE_BLOCK, path[i][1] * SNAKE_BLOCK)
+                                for i in range(length - 1, -1, -1)])
+    encoder = StateEncoder()
+    data = encoder.keyframe(engine)
+    decode = StateDecoder().decode
+    number = 20 if length > 1000 else 200
+    return (len(data), best_of(lambda: encoder.keyframe(engine), repeats, number) * 1e6,
+            best_of(lambda: decode(data), repeats, number) * 1e6)
+
+def run(quick=False):
+    repeats = 3 if quick else 7
+    bytes_per_tick, encode_us, decode_us = stream(3000 if quick else 20000)
+    results = {
+        'codec.bytes_per_tick': metric(bytes_per_tick, 'B', False),
+        'codec.encode_us_per_tick': metric(encode_us, 'us', False),
+        'codec.decode_us_per_tick': metric(decode_us, 'us', False),
+    }
+    for length in KEYFRAME_LENGTHS:
+        size, encode_us, decode_us = keyframe(length, repeats)
+        results[f'codec.keyframe_bytes[length={length}]'] = metric(size, 'B', False)
+        results[f'codec.keyframe_encode_us[length={length}]'] = metric(encode_us, 'us', False)
+        results[f'codec.keyframe_decode_us[length={length}]'] = metric(decode_us, 'us', False)
+    return results
@@ -0,0 +1,48 @@
+import pygame
+from bench.timing import best_of, metric
+from constants import *
+from game_manager import GameManager
+
+STATES = {'menu': MENU, 'running': GAME_RUNNING, 'paused': GAME_PAUSED, 'game_over': GAME_OVER}
+
+def _game_manager(dirty_rects=False, board_size=(BOARD_COLS, BOARD_ROWS)):
+    screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+    game_manager = GameManager(screen, pygame.time.Clock(), dirty_rects=dirty_rects, board_size=board_size)
+    game_manager.wait_for_assets()
+    game_manager._start_new_game()
+    # Play a few seconds so the snake has a body, particles and moved obstacles
+    for _ in range(TICK_RATE * 3):
+        game_manager.update()
+    return game_manager
+
+def _long_snake(game_manager, length):
+    """Lay the snake out row by row from the top-left, head last"""
+    cols = game_manager.engine.width // SNAKE_BLOCK
+    body = [((i % cols if (i // cols) % 2 == 0 else cols - 1 - i % cols) * SNAKE_BLOCK,
+             (i // cols) * SNAKE_BLOCK) for i in range(length)]
+    game_manager.snake.set_positions(body[::-1])
+
+def frame_time(game_manager, state, frames):
+    """Mean milliseconds spent in GameManager.draw for one state"""
+    game_manager.game_state = state
+    game_manager.draw()  # Warm up the background, text and sprite caches
+    return best_of(game_manager.draw, repeats=3, number=frames) * 1000
+
+def run(quick=False):
+    frames = 30 if quick else 120
+    pygame.init()
+    results = {}
+    game_manager = _game_manager()
+    for name, state in STATES.items():
+        results[f'render.frame_ms[{name}]'] = metric(frame_time(game_manager, state, frames), 'ms', False)
+    game_manager = _game_manager(dirty_rects=True)
+    results['render.frame_ms[running,dirty_rects]'] = metric(
+        frame_time(game_manager, GAME_RUNNING, frames), 'ms', False)
+
+    # A huge board with a snake far longer than the screen only draws what is in view
+    game_manager = _game_manager(board_size=(1000, 1000))
+    _long_snake(game_manager, 200000)
+    results['render.frame_ms[running,board=1000x1000,length=200000]'] = metric(
+        frame_time(game_manager, GAME_RUNNING, frames), 'ms', False)
+    pygame.quit()
+    return results
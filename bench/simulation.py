@@ -0,0 +1,114 @@
+import time
+from bench.timing import metric
+from constants import *
+from engine import SnakeEngine
+
+# (columns, rows) of the boards and snake lengths to measure
+BOARD_SIZES = [(40, 30), (100, 100), (400, 400)]
+SNAKE_LENGTHS = [3, 100, 1000]
+AUTOPILOT_BOARDS = [(40, 30), (400, 400)]
+
+def _cycle(cols, rows):
+    """Hamiltonian cycle over the board: serpentine over columns 1.., back up column 0"""
+    path = []
+    for row in range(rows):
+        columns = range(1, cols) if row % 2 == 0 else range(cols - 1, 0, -1)
+        path.extend((col, row) for col in columns)
+    path.extend((0, row) for row in range(rows - 1, -1, -1))
+    return path
+
+def _start_engine(cols, rows, length, path, actions):
+    """Engine with a snake of `length` laid along the cycle, moving every tick"""
+    engine = SnakeEngine(cols * SNAKE_BLOCK, rows * SNAKE_BLOCK, speed=HARD, game_mode=TIME_ATTACK_MODE)
+    head_index = length - 1
+    body = [(path[i][0] * SNAKE_BLOCK, path[i][1] * SNAKE_BLOCK) for i in range(head_index, -1, -1)]
+    engine.snake.set_positions(body)
+    engine.snake.direction = actions[head_index - 1]
+    engine.snake.last_direction = engine.snake.direction
+    engine.food.spawn()
+    return engine, head_index
+
+def tick_throughput(cols, rows, length, ticks=20000):
+    """Engine ticks per second with the snake following a cycle so it never crashes"""
+    path = _cycle(cols, rows)
+    # Direction that takes the head from path[i] to path[i + 1]
+    actions = []
+    for i, (col, row) in enumerate(path):
+        next_col, next_row = path[(i + 1) % len(path)]
+        actions.append(((next_col - col) * SNAKE_BLOCK, (next_row - row) * SNAKE_BLOCK))
+
+    engine, index = _start_engine(cols, rows, length, path, actions)
+    elapsed = 0.0
+    done = 0
+    while done < ticks:
+        start = time.perf_counter()
+        while done < ticks and not engine.game_over:
+            engine.step(actions[index % len(actions)])
+            index += 1
+            done += 1
+        elapsed += time.perf_counter() - start
+        if engine.game_over:
+            # Time attack ran out (or the board filled up): set up again off the clock
+            engine, index = _start_engine(cols, rows, length, path, actions)
+    return done / elapsed
+
+def autopilot_throughput(cols, rows, ticks=5000, seed=0):
+    """Engine ticks per second with the autopilot deciding every move"""
+    from autopilot import Autopilot
+
+    autopilot = Autopilot()
+    engine = SnakeEngine(cols * SNAKE_BLOCK, rows * SNAKE_BLOCK, speed=HARD, seed=seed)
+    done = 0
+    start = time.perf_counter()
+    while done < ticks:
+        if engine.game_over:
+            seed += 1
+            engine.reset(seed)
+        engine.step(autopilot.act(engine))
+        done += 1
+    return done / (time.perf_counter() - start)
+
+def env_throughput(cols, rows, steps=20000, seed=0):
+    """SnakeEnv steps (snake moves, with observation updates) per second under random actions"""
+    import numpy as np
+    from snake_env import SnakeEnv
+
+    env = SnakeEnv(cols, rows, speed=HARD)
+    env.reset(seed=seed)
+    actions = np.random.default_rng(seed).integers(-1, 4, size=steps).tolist()
+    start = time.perf_counter()
+    for action in actions:
+        terminated = env.step(action)[2]
+        if terminated:
+            env.reset()
+    return steps / (time.perf_counter() - start)
+
+def batch_throughput(num_envs=4096, steps=200):
+    """Snake moves per second of the NumPy batch environment"""
+    import numpy as np
+    from batch_env import SnakeBatchEnv
+
+    env = SnakeBatchEnv(num_envs, seed=0)
+    actions = np.random.default_rng(0).integers(-1, 4, size=(steps, num_envs))
+    start = time.perf_counter()
+    for step in range(steps):
+        env.step(actions[step])
+    return num_envs * steps / (time.perf_counter() - start)
+
+def run(quick=False):
+    results = {}
+    ticks = 5000 if quick else 20000
+    for cols, rows in BOARD_SIZES:
+        for length in SNAKE_LENGTHS:
+            if length >= cols * rows // 2:
+                continue
+            rate = tick_throughput(cols, rows, length, ticks)
+            results[f'sim.ticks_per_sec[board={cols}x{rows},length={length}]'] = metric(rate, 'ticks/s', True)
+    for cols, rows in AUTOPILOT_BOARDS:
+        rate = autopilot_throughput(cols, rows, 2000 if quick else 10000)
+        results[f'sim.autopilot_ticks_per_sec[board={cols}x{rows}]'] = metric(rate, 'ticks/s', True)
+    results[f'sim.env_steps_per_sec[board={BOARD_COLS}x{BOARD_ROWS}]'] = metric(
+        env_throughput(BOARD_COLS, BOARD_ROWS, 5000 if quick else 20000), 'steps/s', True)
+    results['sim.batch_moves_per_sec[envs=4096]'] = metric(
+        batch_throughput(steps=50 if quick else 200), 'moves/s', True)
+    return results
@@ -0,0 +1,67 @@
+import time
+import pygame
+from bench.timing import best_of, metric
+from constants import *
+from food import Food
+from free_cells import FreeCellIndex
+from game_manager import GameManager
+from sounds import SoundManager
+from textures import TextureManager
+
+FILL_LEVELS = [0.0, 0.5, 0.9, 0.99]
+
+def _occupied_cells(fill, cols, rows):
+    """The first `fill` fraction of the board, row by row"""
+    count = int(cols * rows * fill)
+    return [((i % cols) * SNAKE_BLOCK, (i // cols) * SNAKE_BLOCK) for i in range(count)]
+
+def spawn_latency(fill, use_index, number):
+    """Mean microseconds per Food.spawn with `fill` of the board taken"""
+    cols = SCREEN_WIDTH // SNAKE_BLOCK
+    rows = SCREEN_HEIGHT // SNAKE_BLOCK
+    occupied = _occupied_cells(fill, cols, rows)
+    if use_index:
+        free_cells = FreeCellIndex(SCREEN_WIDTH, SCREEN_HEIGHT)
+        for position in occupied:
+            free_cells.occupy(position)
+        food = Food(SCREEN_WIDTH, SCREEN_HEIGHT, free_cells=free_cells)
+        spawn = food.spawn
+    else:
+        occupancy = dict.fromkeys(occupied, 1)
+        food = Food(SCREEN_WIDTH, SCREEN_HEIGHT)
+        spawn = lambda: food.spawn(occupancy, [])
+    return best_of(spawn, repeats=7, number=number) * 1e6
+
+def first_frame(screen):
+    """Construct a GameManager and draw its first (loading) frame, then finish loading"""
+    game_manager = GameManager(screen, pygame.time.Clock())
+    game_manager.draw()
+    elapsed = time.perf_counter()
+    game_manager.wait_for_assets()
+    game_manager.shutdown()
+    return elapsed
+
+def first_frame_ms(screen, repeats):
+    """Best milliseconds from GameManager() to its first drawn frame"""
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        times.append(first_frame(screen) - start)
+    return min(times) * 1000
+
+def run(quick=False):
+    repeats = 2 if quick else 7
+    pygame.init()
+    screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+    results = {
+        'startup.texture_manager_ms': metric(best_of(TextureManager, repeats) * 1000, 'ms', False),
+        'startup.sound_manager_ms': metric(best_of(SoundManager, repeats) * 1000, 'ms', False),
+        'startup.first_frame_ms': metric(first_frame_ms(screen, repeats), 'ms', False),
+    }
+    number = 200 if quick else 1000
+    for fill in FILL_LEVELS:
+        results[f'spawn.food_us[fill={fill},index]'] = metric(spawn_latency(fill, True, number), 'us', False)
+        results[f'spawn.food_us[fill={fill},scan]'] = metric(
+            spawn_latency(fill, False, number // 10), 'us', False)
+    pygame.quit()
+    return results
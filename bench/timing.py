@@ -0,0 +1,14 @@
+import time
+
+def best_of(function, repeats=5, number=1):
+    """Best wall time in seconds of `number` calls, over `repeats` runs"""
+    best = float('inf')
+    for _ in range(repeats):
+        start = time.perf_counter()
+        for _ in range(number):
+            function()
+        best = min(best, time.perf_counter() - start)
+    return best / number
+
+def metric(value, unit, higher_is_better):
+    return {'value': value, 'unit': unit, 'higher_is_better': higher_is_better}
@@ -0,0 +1,298 @@
+import sys
+import time
+import heapq
+import argparse
+from array import array
+from constants import *
+from engine import SnakeEngine
+
+# Moves in the order the search tries them: up, right, down, left
+DIRECTIONS = ((0, -SNAKE_BLOCK), (SNAKE_BLOCK, 0), (0, SNAKE_BLOCK), (-SNAKE_BLOCK, 0))
+
+# Search budget per decision; about 10 ms of pure Python, well inside one tick
+MAX_EXPANSIONS = 3000
+
+class Autopilot:
+    """Plays a SnakeEngine game: shortest safe path to the food, else chase the tail.
+
+    The search runs on cell indices (row * cols + col) and reads occupancy from
+    the engine's FreeCellIndex counts, which the snake, food and obstacles keep
+    up to date as they move, so nothing is rebuilt per decision. The A* and
+    flood fill buffers are allocated once per board size and "cleared" by
+    bumping a generation stamp. Every search stops at its target or after
+    `max_expansions` cells; a path to the food is only taken when the snake
+    still has room to reach its tail from the first step, otherwise it
+    follows its tail, and failing that heads for the largest open area.
+
+    A planned path is kept and followed while the food stays put and the next
+    cell stays free and roomy, so most moves cost no search at all. When the food is
+    farther away than the budget reaches (huge boards), the path to the
+    closest cell found is followed and the search resumes from its end.
+    """
+
+    def __init__(self, max_expansions=MAX_EXPANSIONS):
+        self.max_expansions = max_expansions
+        self.cols = 0
+        self.rows = 0
+        self.expanded = 0  # Cells expanded by the last decision, for load tests
+        self.plan = []         # Cells still to visit towards the food, next one last
+        self.plan_target = None
+        self.plan_head = None  # Where the head must be for the plan to still apply
+
+    def _resize(self, cols, rows):
+        size = cols * rows
+        self.cols = cols
+        self.rows = rows
+        self.seen = array('i', bytes(4 * size))   # Generation stamp of every reached cell
+        self.cost = array('i', bytes(4 * size))   # Path length to each reached cell
+        self.parent = array('i', bytes(4 * size)) # Previous cell on the path to each reached cell
+        self.queue = array('i', bytes(4 * size))  # Flood fill queue
+        self.generation = 0
+        self.plan = []
+
+    def _next_generation(self):
+        self.generation += 1
+        if self.generation == 2 ** 31 - 1:
+            self.seen = array('i', bytes(4 * self.cols * self.rows))
+            self.generation = 1
+        return self.generation
+
+    def _cell(self, position):
+        return (position[1] // SNAKE_BLOCK) * self.cols + position[0] // SNAKE_BLOCK
+
+    def _neighbours(self, cell):
+        """(move, cell) for every neighbour on the board"""
+        cols = self.cols
+        col = cell % cols
+        if cell >= cols:
+            yield 0, cell - cols
+        if col < cols - 1:
+            yield 1, cell + 1
+        if cell + cols < cols * self.rows:
+            yield 2, cell + cols
+        if col > 0:
+            yield 3, cell - 1
+
+    def act(self, engine):
+        """Action for the next engine.step(): a direction on ticks where the snake moves, else None"""
+        if not engine.will_move():
+            return None
+        return self.choose(engine)
+
+    def choose(self, engine):
+        """Direction the snake should take on its next move"""
+        cols = engine.width // SNAKE_BLOCK
+        rows = engine.height // SNAKE_BLOCK
+        if cols != self.cols or rows != self.rows:
+            self._resize(cols, rows)
+        self.expanded = 0
+
+        snake = engine.snake
+        counts = engine.free_cells.counts
+        head = self._cell(snake.get_head_position())
+        tail_position = snake.positions[-1]
+        tail = self._cell(tail_position)
+
+        # Occupied cells the head may still enter: the food, and the tail when it moves away
+        open_cells = set()
+        food_position = engine.food.get_position()
+        food = self._cell(food_position) if food_position is not None else None
+        if food is not None:
+            open_cells.add(food)
+        tail_moves = not snake.grow_flag and snake.occupancy[tail_position] == 1
+        if tail_moves:
+            open_cells.add(tail)
+        blocked = self._obstacle_lookahead(engine)
+        # The snake can't turn back on itself, even onto a tail that is moving away
+        head_x, head_y = snake.get_head_position()
+        back_x, back_y = head_x - snake.direction[0], head_y - snake.direction[1]
+        if 0 <= back_x < engine.width and 0 <= back_y < engine.height:
+            blocked.add(self._cell((back_x, back_y)))
+        length = len(snake.positions)
+
+        if food is not None:
+            if (self.plan and self.plan_target == food and self.plan_head == head and
+                    self._passable(self.plan[-1], counts, open_cells, blocked) and
+                    self._has_room(self.plan[-1], tail, length, counts, open_cells, blocked)):
+                return self._follow_plan(head)
+            path, found = self._search(head, food, counts, open_cells, blocked)
+            if path and self._has_room(path[-1], tail, length, counts, open_cells, blocked):
+                self.plan, self.plan_target = path, food
+                return self._follow_plan(head)
+        self.plan = []
+
+        # No safe way to the food: follow the tail, which keeps a way out open
+        open_cells.add(tail)
+        path, found = self._search(head, tail, counts, open_cells, blocked)
+        if found and (tail_moves or path[-1] != tail):
+            return self._direction(head, path[-1])
+
+        # Boxed in: move towards the most open space left
+        best_move, best_room = None, -1
+        for move, cell in self._neighbours(head):
+            if self._passable(cell, counts, open_cells, blocked):
+                room = self._room(cell, tail, length, counts, open_cells, blocked)[0]
+                if room > best_room:
+                    best_move, best_room = move, room
+        return DIRECTIONS[best_move] if best_move is not None else snake.direction
+
+    def _direction(self, cell, neighbour):
+        difference = neighbour - cell
+        return DIRECTIONS[0 if difference == -self.cols else 1 if difference == 1 else
+                          2 if difference == self.cols else 3]
+
+    def _follow_plan(self, head):
+        cell = self.plan.pop()
+        self.plan_head = cell
+        return self._direction(head, cell)
+
+    def _passable(self, cell, counts, open_cells, blocked):
+        return (counts[cell] == 0 or (counts[cell] == 1 and cell in open_cells)) and cell not in blocked
+
+    def _obstacle_lookahead(self, engine):
+        """Cells moving obstacles will step into next"""
+        blocked = set()
+        width, height = engine.width, engine.height
+        for obstacle in engine.obstacle_manager.obstacles:
+            if obstacle.type == "moving":
+                x = obstacle.x + obstacle.direction[0] * SNAKE_BLOCK
+                y = obstacle.y + obstacle.direction[1] * SNAKE_BLOCK
+                if 0 <= x < width and 0 <= y < height:
+                    blocked.add(self._cell((x, y)))
+        return blocked
+
+    def _search(self, start, target, counts, open_cells, blocked):
+        """A* from start towards target; returns (path, whether target was reached).
+
+        The path lists the cells after start, last step first. When the budget
+        runs out the path to the closest cell seen is returned instead, with
+        found False; with nowhere to go the path is empty.
+        """
+        generation = self._next_generation()
+        seen, cost, parent = self.seen, self.cost, self.parent
+        cols = self.cols
+        target_col, target_row = target % cols, target // cols
+        budget = self.max_expansions
+
+        start_h = abs(start % cols - target_col) + abs(start // cols - target_row)
+        heap = [(start_h, start_h, start)]
+        seen[start] = generation
+        cost[start] = 0
+        best_cell, best_h = None, None
+        expanded = 0
+        while heap and expanded < budget:
+            f, h, cell = heapq.heappop(heap)
+            if cell == target:
+                self.expanded += expanded
+                return self._path(start, cell), True
+            g = f - h
+            if g > cost[cell]:
+                continue  # Stale entry, the cell was reached by a shorter path since
+            if cell != start and (best_h is None or h < best_h):
+                best_cell, best_h = cell, h
+            expanded += 1
+            for move, neighbour in self._neighbours(cell):
+                if seen[neighbour] == generation and cost[neighbour] <= g + 1:
+                    continue
+                if not self._passable(neighbour, counts, open_cells, blocked):
+                    continue
+                seen[neighbour] = generation
+                cost[neighbour] = g + 1
+                parent[neighbour] = cell
+                nh = abs(neighbour % cols - target_col) + abs(neighbour // cols - target_row)
+                heapq.heappush(heap, (g + 1 + nh, nh, neighbour))
+
+        self.expanded += expanded
+        if best_cell is None:
+            return [], False
+        return self._path(start, best_cell), False
+
+    def _path(self, start, end):
+        path = []
+        parent = self.parent
+        while end != start:
+            path.append(end)
+            end = parent[end]
+        return path
+
+    def _room(self, start, tail, limit, counts, open_cells, blocked):
+        """Flood fill from start; returns (cells reached, whether the tail was reached).
+
+        Stops as soon as the tail is reached or `limit` cells (capped by the
+        budget) were counted, since either means there is room enough.
+        """
+        generation = self._next_generation()
+        seen, queue = self.seen, self.queue
+        limit = min(limit, self.max_expansions)
+        seen[start] = generation
+        queue[0] = start
+        read, write = 0, 1
+        while read < write:
+            cell = queue[read]
+            read += 1
+            for _, neighbour in self._neighbours(cell):
+                if seen[neighbour] == generation:
+                    continue
+                seen[neighbour] = generation
+                if neighbour == tail:
+                    self.expanded += read
+                    return write, True
+                if self._passable(neighbour, counts, open_cells, blocked):
+                    queue[write] = neighbour
+                    write += 1
+                    if write >= limit:
+                        self.expanded += read
+                        return write, False
+        self.expanded += read
+        return write, False
+
+    def _has_room(self, cell, tail, length, counts, open_cells, blocked):
+        room, reaches_tail = self._room(cell, tail, length, counts, open_cells, blocked)
+        return reaches_tail or room >= min(length, self.max_expansions)
+
+
+def main(argv=None):
+    """Let the autopilot play headless games: python src/autopilot.py --games 10"""
+    parser = argparse.ArgumentParser(description='Run autopilot games headlessly, e.g. for load testing')
+    parser.add_argument('--games', type=int, default=5)
+    parser.add_argument('--board', default=f'{BOARD_COLS}x{BOARD_ROWS}', metavar='COLSxROWS')
+    parser.add_argument('--speed', choices=('easy', 'medium', 'hard'), default='hard')
+    parser.add_argument('--mode', choices=('classic', 'time_attack', 'challenge'), default='classic')
+    parser.add_argument('--seed', type=int, help='seed of the first game; the next ones count up from it')
+    parser.add_argument('--max-ticks', type=int, default=20000, help='stop a game after this many ticks')
+    args = parser.parse_args(argv)
+
+    cols, rows = (int(part) for part in args.board.lower().split('x'))
+    speed = {'easy': EASY, 'medium': MEDIUM, 'hard': HARD}[args.speed]
+    mode = {'classic': CLASSIC_MODE, 'time_attack': TIME_ATTACK_MODE, 'challenge': CHALLENGE_MODE}[args.mode]
+    autopilot = Autopilot()
+
+    decision_times = []
+    total_ticks = 0
+    start = time.perf_counter()
+    for game in range(args.games):
+        seed = args.seed + game if args.seed is not None else None
+        engine = SnakeEngine(cols * SNAKE_BLOCK, rows * SNAKE_BLOCK, speed, mode, seed=seed)
+        while not engine.game_over and engine.ticks < args.max_ticks:
+            decision_start = time.perf_counter()
+            action = autopilot.act(engine)
+            if action is not None:
+                decision_times.append(time.perf_counter() - decision_start)
+            engine.step(action)
+        total_ticks += engine.ticks
+        print(f"game {game + 1}: seed {engine.seed}, score {engine.score}, length {len(engine.snake.positions)}, "
+              f"{engine.ticks} ticks, {engine.death_cause or 'tick limit'}")
+    elapsed = time.perf_counter() - start
+
+    decision_times.sort()
+    if decision_times:
+        mean = sum(decision_times) / len(decision_times) * 1e6
+        p99 = decision_times[int(0.99 * (len(decision_times) - 1))] * 1e6
+        print(f"{len(decision_times)} decisions: mean {mean:.0f} us, p99 {p99:.0f} us, "
+              f"max {decision_times[-1] * 1e6:.0f} us")
+    print(f"{total_ticks / elapsed:,.0f} ticks/s ({total_ticks / TICK_RATE / elapsed:.0f}x real time)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
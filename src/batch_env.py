@@ -0,0 +1,296 @@
+import time
+import numpy as np
+from constants import *
+
+# Directions are indices into these tables: up, right, down, left
+DIRECTION_ROW = np.array([-1, 0, 1, 0], dtype=np.int32)
+DIRECTION_COL = np.array([0, 1, 0, -1], dtype=np.int32)
+UP, RIGHT, DOWN, LEFT = 0, 1, 2, 3
+
+# Points per food type, indexed by the *_FOOD constants
+FOOD_POINTS = np.array([10, 25, 50, 15, 20, 30, 40], dtype=np.int64)
+
+# Columns of SnakeBatchEnv.timers, mirroring the Snake power-up timers
+TIMER_BOOST = 0
+TIMER_MULTIPLIER = 1
+TIMER_SHRINK = 2
+TIMER_SLOWMO = 3
+TIMER_DOUBLE_SCORE = 4
+TIMER_GHOST = 5
+
+# Food.spawn roll table: upper bound of the roll, food type, special timer
+_SPECIAL_ROLLS = [
+    (0.3, SPECIAL_FOOD, 300),
+    (0.5, SUPER_FOOD, 150),
+    (0.65, SHRINK_FOOD, 200),
+    (0.75, SLOWMO_FOOD, 250),
+    (0.85, DOUBLE_SCORE_FOOD, 300),
+    (0.95, GHOST_FOOD, 200),
+]
+
+# Snake.apply_powerup: which timer each food type starts and for how long
+_POWERUP_TIMERS = [
+    (SPECIAL_FOOD, TIMER_BOOST, 300),
+    (SUPER_FOOD, TIMER_MULTIPLIER, 300),
+    (SHRINK_FOOD, TIMER_SHRINK, SHRINK_DURATION),
+    (SLOWMO_FOOD, TIMER_SLOWMO, SLOWMO_DURATION),
+    (DOUBLE_SCORE_FOOD, TIMER_DOUBLE_SCORE, DOUBLE_SCORE_DURATION),
+    (GHOST_FOOD, TIMER_GHOST, GHOST_DURATION),
+]
+
+# Challenge layout from ObstacleManager, in cells (moving obstacles stay put here)
+_CHALLENGE_CELLS = [(200, 200), (400, 300), (600, 200), (300, 400), (500, 450)]
+
+
+class SnakeBatchEnv:
+    """Many snake games stored as NumPy arrays and advanced in lockstep.
+
+    Unlike SnakeEngine, one step() is one snake *move* for every game; the
+    tick based timers (special food, time attack) advance by the movement
+    threshold of that move. Actions are direction indices (UP, RIGHT, DOWN,
+    LEFT) or -1 to keep going straight. Finished games are reset in place.
+    Obstacles are static cells; moving challenge obstacles do not move.
+    """
+
+    def __init__(self, num_envs, cols=SCREEN_WIDTH // SNAKE_BLOCK, rows=SCREEN_HEIGHT // SNAKE_BLOCK,
+                 speed=MEDIUM, game_mode=CLASSIC_MODE, seed=None):
+        self.num_envs = num_envs
+        self.cols = cols
+        self.rows = rows
+        self.cells = cols * rows
+        self.speed = speed
+        self.game_mode = game_mode
+        self.rng = np.random.default_rng(seed)
+        self.base_threshold = max(TICK_RATE - speed * 2, 1)
+
+        n = num_envs
+        # Ghost mode lets the body overlap itself, so the ring buffer is roomier than the board
+        self.capacity = self.cells * 2
+        self.grid = np.zeros((n, self.cells), dtype=np.uint8)       # body segments per cell
+        self.obstacles = np.zeros((n, self.cells), dtype=bool)
+        self.body = np.zeros((n, self.capacity), dtype=np.int32)    # ring buffer of cell indices
+        self.head_ptr = np.zeros(n, dtype=np.int64)
+        self.length = np.zeros(n, dtype=np.int64)
+        self.direction = np.full(n, RIGHT, dtype=np.int64)
+        self.grow_flag = np.zeros(n, dtype=bool)
+        self.timers = np.zeros((n, 6), dtype=np.int32)
+
+        self.food = np.zeros(n, dtype=np.int64)
+        self.food_type = np.zeros(n, dtype=np.int64)
+        self.special_timer = np.zeros(n, dtype=np.int32)
+        self.special_counter = np.zeros(n, dtype=np.int32)
+        self.obstacle_count = np.zeros(n, dtype=np.int32)
+
+        self.score = np.zeros(n, dtype=np.int64)
+        self.ticks = np.zeros(n, dtype=np.int64)
+        self.time_remaining = np.zeros(n, dtype=np.int64)
+
+        # Results of the games that finished during the last step
+        self.final_score = np.zeros(n, dtype=np.int64)
+        self.board_full = np.zeros(n, dtype=bool)
+        self.episodes_finished = 0
+
+        self._rows = np.arange(n)
+        self._challenge = np.array([(y // SNAKE_BLOCK) * cols + x // SNAKE_BLOCK
+                                    for x, y in _CHALLENGE_CELLS
+                                    if x < cols * SNAKE_BLOCK - SNAKE_BLOCK and y < rows * SNAKE_BLOCK - SNAKE_BLOCK],
+                                   dtype=np.int64)
+        self.reset()
+
+    def reset(self, mask=None):
+        """Reset every game, or only those selected by the boolean mask"""
+        idx = self._rows if mask is None else np.flatnonzero(mask)
+        if len(idx) == 0:
+            return
+
+        self.grid[idx] = 0
+        self.obstacles[idx] = False
+        if self.game_mode == CHALLENGE_MODE:
+            self.obstacles[idx[:, None], self._challenge] = True
+        self.obstacle_count[idx] = self.obstacles[idx].sum(axis=1)
+
+        # Same start as Snake.reset: three segments heading right from (100, 100)
+        row, col = 100 // SNAKE_BLOCK, 100 // SNAKE_BLOCK
+        start = row * self.cols + np.array([col - 2, col - 1, col])
+        self.body[idx, :3] = start
+        self.grid[idx[:, None], start] = 1
+        self.head_ptr[idx] = 2
+        self.length[idx] = 3
+        self.direction[idx] = RIGHT
+        self.grow_flag[idx] = False
+        self.timers[idx] = 0
+
+        self.score[idx] = 0
+        self.ticks[idx] = 0
+        self.time_remaining[idx] = TIME_ATTACK_DURATION * TICK_RATE if self.game_mode == TIME_ATTACK_MODE else 0
+        # Food.__init__ and SnakeEngine.reset both spawn, so the first food of a game is the second spawn
+        self.special_counter[idx] = 1
+        self.food_type[idx] = NORMAL_FOOD
+        self.special_timer[idx] = 0
+        self._spawn_food(idx)
+
+    def head(self):
+        """Cell index of every snake head"""
+        return self.body[self._rows, self.head_ptr]
+
+    def step(self, actions):
+        """Move every snake once. Returns (rewards, dones) arrays."""
+        n = self.num_envs
+        rows = self._rows
+        cells = self.cells
+
+        # Turn, refusing 180 degree reversals
+        actions = np.asarray(actions, dtype=np.int64)
+        turn = (actions >= 0) & (actions != (self.direction + 2) % 4)
+        self.direction = np.where(turn, actions, self.direction)
+
+        threshold = np.where(self.timers[:, TIMER_SLOWMO] > 0, self.base_threshold * 2, self.base_threshold)
+        self.ticks += threshold
+
+        head = self.body[rows, self.head_ptr]
+        new_row = head // self.cols + DIRECTION_ROW[self.direction]
+        new_col = head % self.cols + DIRECTION_COL[self.direction]
+        hit_wall = (new_row < 0) | (new_row >= self.rows) | (new_col < 0) | (new_col >= self.cols)
+        new_head = np.where(hit_wall, head, new_row * self.cols + new_col)
+
+        # Drop tail segments first: two while shrinking, none after eating
+        shrinking = (self.timers[:, TIMER_SHRINK] > 0) & (self.length >= 3)
+        removed = np.where(shrinking, 2, np.where(self.grow_flag, 0, 1))
+        self.grow_flag &= shrinking
+        grid_flat = self.grid.reshape(-1)
+        for k in (1, 2):
+            drop = np.flatnonzero(removed >= k)
+            tail_ptr = (self.head_ptr[drop] - self.length[drop] + 1) % self.capacity
+            grid_flat[drop * cells + self.body[drop, tail_ptr]] -= 1
+            self.length[drop] -= 1
+
+        # Timers tick once per move, as in Snake.move
+        np.subtract(self.timers, 1, out=self.timers, where=self.timers > 0)
+
+        flat_head = rows * cells + new_head
+        hit_obstacle = self.obstacles.reshape(-1)[flat_head]
+        hit_self = (grid_flat[flat_head] > 0) & (self.timers[:, TIMER_GHOST] == 0)
+        dead = hit_wall | hit_obstacle | hit_self
+
+        # Push the new head on the living snakes
+        alive = np.flatnonzero(~dead)
+        self.head_ptr[alive] = (self.head_ptr[alive] + 1) % self.capacity
+        self.body[alive, self.head_ptr[alive]] = new_head[alive]
+        grid_flat[flat_head[alive]] += 1
+        self.length[alive] += 1
+
+        rewards = np.zeros(n, dtype=np.int64)
+        eaten = alive[new_head[alive] == self.food[alive]]
+        board_full = np.zeros(n, dtype=bool)
+        if len(eaten):
+            board_full[eaten] = self._eat(eaten, rewards)
+
+        # Tick based timers advance by the ticks this move took
+        special = self.food_type != NORMAL_FOOD
+        self.special_timer -= np.where(special, threshold, 0).astype(np.int32)
+        self.food_type[special & (self.special_timer <= 0)] = NORMAL_FOOD
+
+        dones = dead | board_full
+        if self.game_mode == TIME_ATTACK_MODE:
+            self.time_remaining -= threshold
+            dones |= self.time_remaining <= 0
+
+        self.final_score = np.where(dones, self.score, 0)
+        self.board_full = board_full
+        if dones.any():
+            self.episodes_finished += int(dones.sum())
+            self.reset(dones)
+        return rewards, dones
+
+    def _eat(self, idx, rewards):
+        food_type = self.food_type[idx]
+        for kind, column, duration in _POWERUP_TIMERS:
+            self.timers[idx[food_type == kind], column] = duration
+
+        multiplier = np.where(self.timers[idx, TIMER_MULTIPLIER] > 0, 2, 1)
+        multiplier *= np.where(self.timers[idx, TIMER_DOUBLE_SCORE] > 0, 2, 1)
+        points = FOOD_POINTS[food_type] * multiplier
+        self.score[idx] += points
+        rewards[idx] = points
+        self.grow_flag[idx] |= food_type != SHRINK_FOOD
+
+        full = ~self._spawn_food(idx)
+
+        if self.game_mode == CLASSIC_MODE:
+            add = idx[(self.score[idx] % 100 == 0) & (self.obstacle_count[idx] < MAX_OBSTACLES) & ~full]
+            if len(add):
+                blocked = self.grid[add] > 0
+                blocked[np.arange(len(add)), self.food[add]] = True
+                placed, cell = self._pick_free(add, blocked)
+                self.obstacles[add[placed], cell[placed]] = True
+                self.obstacle_count[add[placed]] += 1
+        return full
+
+    def _spawn_food(self, idx):
+        """Place food for the given games; returns False where the board is full"""
+        placed, cell = self._pick_free(idx, self.grid[idx] > 0)
+        self.food[idx] = cell
+
+        # Every fifth food rolls for a special type, like Food.spawn
+        self.special_counter[idx] += 1
+        roll_idx = idx[self.special_counter[idx] >= 5]
+        self.special_counter[roll_idx] = 0
+        self.food_type[idx] = NORMAL_FOOD
+        if len(roll_idx):
+            roll = self.rng.random(len(roll_idx))
+            kinds = np.full(len(roll_idx), NORMAL_FOOD)
+            timers = np.zeros(len(roll_idx), dtype=np.int32)
+            lower = 0.0
+            for upper, kind, duration in _SPECIAL_ROLLS:
+                hit = (roll >= lower) & (roll < upper)
+                kinds[hit] = kind
+                timers[hit] = duration
+                lower = upper
+            self.food_type[roll_idx] = kinds
+            self.special_timer[roll_idx] = np.where(kinds != NORMAL_FOOD, timers, self.special_timer[roll_idx])
+        return placed
+
+    def _pick_free(self, idx, blocked):
+        """Uniform free cell per game; blocked is a (len(idx), cells) mask"""
+        free = ~(blocked | self.obstacles[idx])
+        counts = free.sum(axis=1)
+        placed = counts > 0
+        target = (self.rng.random(len(idx)) * counts).astype(np.int64)
+        cell = np.argmax(np.cumsum(free, axis=1) > target[:, None], axis=1)
+        return placed, cell
+
+
+def benchmark(num_envs=4096, steps=500, engine_ticks=200000, seed=0):
+    """Compare moves per second of the batch env and the scalar SnakeEngine"""
+    from engine import SnakeEngine
+    import random
+
+    env = SnakeBatchEnv(num_envs, seed=seed)
+    rng = np.random.default_rng(seed)
+    actions = rng.integers(-1, 4, size=(steps, num_envs))
+    start = time.perf_counter()
+    for t in range(steps):
+        env.step(actions[t])
+    batch_rate = num_envs * steps / (time.perf_counter() - start)
+
+    engine = SnakeEngine()
+    choices = [None, (0, -SNAKE_BLOCK), (SNAKE_BLOCK, 0), (0, SNAKE_BLOCK), (-SNAKE_BLOCK, 0)]
+    random.seed(seed)
+    moves = 0
+    start = time.perf_counter()
+    for _ in range(engine_ticks):
+        events = engine.step(random.choice(choices))
+        if events and events[0][0] == EVENT_MOVE:
+            moves += 1
+        if engine.game_over:
+            engine.reset()
+    engine_rate = moves / (time.perf_counter() - start)
+
+    print(f"SnakeBatchEnv x{num_envs}: {batch_rate:,.0f} moves/s")
+    print(f"SnakeEngine:      {engine_rate:,.0f} moves/s")
+    print(f"Speedup:          {batch_rate / engine_rate:.1f}x")
+    return batch_rate, engine_rate
+
+
+if __name__ == "__main__":
+    benchmark()
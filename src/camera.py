@@ -0,0 +1,72 @@
+from constants import *
+
+class Camera:
+    """Viewport onto a board that can be larger (or smaller) than the window.
+
+    (x, y) is the board pixel shown at the top-left of the window; objects are
+    drawn at their board position plus `offset`. On a board larger than the
+    window the camera keeps the snake's head centered without showing past
+    the edges; a smaller board is centered in the window.
+    """
+
+    def __init__(self, view_width, view_height, board_width, board_height, block=SNAKE_BLOCK):
+        self.view_width = view_width
+        self.view_height = view_height
+        self.board_width = board_width
+        self.board_height = board_height
+        self.block = block
+        self.x = 0
+        self.y = 0
+        self.follow((0, 0))
+
+    @property
+    def offset(self):
+        return (-self.x, -self.y)
+
+    def _axis(self, target, view, board):
+        if board <= view:
+            return -((view - board) // 2)
+        return max(0, min(target - view // 2, board - view))
+
+    def follow(self, position):
+        """Center the view on a board position; returns True if the camera moved"""
+        x = self._axis(position[0] + self.block // 2, self.view_width, self.board_width)
+        y = self._axis(position[1] + self.block // 2, self.view_height, self.board_height)
+        moved = (x, y) != (self.x, self.y)
+        self.x, self.y = x, y
+        return moved
+
+    def to_screen(self, position):
+        return (position[0] - self.x, position[1] - self.y)
+
+    def is_visible(self, position, margin=0):
+        """Whether a cell at this board position, grown by margin pixels, overlaps the view"""
+        return (self.x - self.block - margin < position[0] < self.x + self.view_width + margin and
+                self.y - self.block - margin < position[1] < self.y + self.view_height + margin)
+
+    def visible_cells(self):
+        """Board positions of every cell at least partly in view"""
+        block = self.block
+        first_col = max(0, self.x // block)
+        first_row = max(0, self.y // block)
+        last_col = min(self.board_width, self.x + self.view_width + block - 1) // block
+        last_row = min(self.board_height, self.y + self.view_height + block - 1) // block
+        return [(col * block, row * block)
+                for row in range(first_row, last_row)
+                for col in range(first_col, last_col)]
+
+    def cull(self, positions, lookup):
+        """The positions that are in view.
+
+        lookup is a dict (or set) keyed by the same positions. When there are
+        more positions than cells on screen, the visible cells are looked up in
+        it instead of testing every position, so a huge snake costs no more
+        than one that fills the screen.
+        """
+        block = self.block
+        if len(lookup) > (self.view_width // block + 2) * (self.view_height // block + 2):
+            return [position for position in self.visible_cells() if position in lookup]
+        left, right = self.x - block, self.x + self.view_width
+        top, bottom = self.y - block, self.y + self.view_height
+        return [position for position in positions
+                if left < position[0] < right and top < position[1] < bottom]
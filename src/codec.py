@@ -0,0 +1,375 @@
+import numpy as np
+from itertools import chain
+from constants import *
+
+CODEC_VERSION = 1
+# Message kinds, in the low four bits of the first byte (the version is in the high four)
+KEYFRAME = 1
+DELTA = 2       # Changes over one tick
+DELTA_SAME = 3  # Changes within the same tick, e.g. after the game ended
+
+KEYFRAME_INTERVAL = 10 * TICK_RATE  # Ticks between keyframes, so a stream can be joined
+
+# 2-bit direction codes: up, right, down, left (as autopilot.DIRECTIONS)
+DIRECTION_CODES = {(0, -1): 0, (1, 0): 1, (0, 1): 2, (-1, 0): 3}
+DIRECTION_STEPS = ((0, -1), (1, 0), (0, 1), (-1, 0))
+CAUSES = (None, DEATH_WALL, DEATH_OBSTACLE, DEATH_SELF, DEATH_TIME_UP, BOARD_FULL)
+CAUSE_CODES = {cause: code for code, cause in enumerate(CAUSES)}
+OBSTACLE_TYPES = ("static", "moving")
+OBSTACLE_TYPE_CODES = {name: code for code, name in enumerate(OBSTACLE_TYPES)}
+UNALIGNED = 8  # Obstacle byte flag: pixel coordinates follow instead of a cell
+SNAKE_TIMERS = ('boost_timer', 'multiplier_timer', 'shrink_timer', 'slowmo_timer', 'double_score_timer',
+                'ghost_timer')
+
+# Delta flags: which parts of the state follow
+MOVED = 1          # Head step and number of tail cells removed
+SCORE = 2
+FOOD = 4           # Food cell, type and timer
+FOOD_TIMER = 8     # Only the food timer
+TIMERS = 16        # Snake power-up timers that changed
+OBSTACLES = 32     # The whole obstacle list
+CLOCK = 64         # Time attack time remaining
+STATUS = 128       # Game over cause
+DIRECTION = 256    # Direction the snake will take next
+
+# Per-segment direction codes packed four to a byte, lowest bits first
+_SHIFTS = np.array([0, 2, 4, 6], dtype=np.uint8)
+_WEIGHTS = np.array([1, 4, 16, 64], dtype=np.uint8)
+
+
+def _write_varint(out, value):
+    if value < 0:
+        raise ValueError(f"cannot encode negative value {value}")
+    while value > 0x7f:
+        out.append(value & 0x7f | 0x80)
+        value >>= 7
+    out.append(value)
+
+def _read_varint(data, offset):
+    value = shift = 0
+    while True:
+        byte = data[offset]
+        offset += 1
+        value |= (byte & 0x7f) << shift
+        if byte < 0x80:
+            return value, offset
+        shift += 7
+
+def _direction_code(direction, unit=SNAKE_BLOCK):
+    return DIRECTION_CODES.get((direction[0] // unit, direction[1] // unit), 1)
+
+
+class StateEncoder:
+    """Encodes a SnakeEngine's board as a keyframe, then as one small delta per tick.
+
+    Cells are varint indices on the board padded by one cell on every side,
+    so a head that just left the board still has one. A keyframe stores the
+    snake as its head cell and length plus two bits per segment for the step
+    to the next one, built with NumPy from the body in one pass. A delta
+    stores only what changed since the previous call: usually the head step
+    and how many tail cells went (one byte), sometimes the score, food or
+    timers, so most ticks take two or three bytes. Deltas assume encode() is
+    called on every tick; after a gap, a new game or every `keyframe_interval`
+    ticks it writes a keyframe instead.
+    """
+
+    def __init__(self, keyframe_interval=KEYFRAME_INTERVAL):
+        self.keyframe_interval = keyframe_interval
+        self.engine = None
+        self.previous = None
+        self.keyframe_tick = 0
+
+    def encode(self, engine):
+        """Delta against the previous call when possible, otherwise a keyframe"""
+        previous = self.previous
+        if (previous is None or engine is not self.engine or
+                self.keyframe_interval and engine.ticks - self.keyframe_tick >= self.keyframe_interval):
+            return self.keyframe(engine)
+        tick, head, length, direction, score, food, food_timer, timers, obstacles, time_remaining, cause = previous
+        advance = engine.ticks - tick
+        if not 0 <= advance <= 1:
+            return self.keyframe(engine)
+
+        current = self._snapshot(engine)
+        out = bytearray()
+        flags = 0
+        body = bytearray()
+        new_head, new_length = current[1], current[2]
+        if new_head != head:
+            dx, dy = new_head[0] - head[0], new_head[1] - head[1]
+            removed = length + 1 - new_length
+            if abs(dx) + abs(dy) != SNAKE_BLOCK or not 0 <= removed <= 3:
+                return self.keyframe(engine)
+            flags |= MOVED
+            body.append(DIRECTION_CODES[(dx // SNAKE_BLOCK, dy // SNAKE_BLOCK)] | removed << 2)
+        elif new_length != length:
+            return self.keyframe(engine)
+        if current[3] != direction:
+            flags |= DIRECTION
+            body.append(_direction_code(current[3]))
+        if current[4] != score:
+            flags |= SCORE
+            _write_varint(body, current[4])
+        if current[5] != food:
+            flags |= FOOD
+            self._write_food(body, current[5], current[6])
+        elif current[6] != food_timer:
+            flags |= FOOD_TIMER
+            _write_varint(body, current[6])
+        if current[7] != timers:
+            flags |= TIMERS
+            mask = 0
+            for bit, (old, new) in enumerate(zip(timers, current[7])):
+                if old != new:
+                    mask |= 1 << bit
+            body.append(mask)
+            for bit, value in enumerate(current[7]):
+                if mask & 1 << bit:
+                    _write_varint(body, value)
+        if current[8] != obstacles:
+            flags |= OBSTACLES
+            self._write_obstacles(body, current[8])
+        if current[9] != time_remaining:
+            flags |= CLOCK
+            _write_varint(body, current[9])
+        if current[10] != cause:
+            flags |= STATUS
+            body.append(CAUSE_CODES[current[10]])
+
+        out.append(CODEC_VERSION << 4 | (DELTA if advance else DELTA_SAME))
+        _write_varint(out, flags)
+        out += body
+        self.previous = current
+        return bytes(out)
+
+    def keyframe(self, engine):
+        """The whole board state, decodable on its own"""
+        current = self._snapshot(engine)
+        tick, head, length, direction, score, food, food_timer, timers, obstacles, time_remaining, cause = current
+        self.engine = engine
+        self.previous = current
+        self.keyframe_tick = tick
+        self.stride = engine.width // SNAKE_BLOCK + 2
+
+        out = bytearray()
+        out.append(CODEC_VERSION << 4 | KEYFRAME)
+        for value in (engine.width // SNAKE_BLOCK, engine.height // SNAKE_BLOCK, tick, score, time_remaining):
+            _write_varint(out, value)
+        out.append(CAUSE_CODES[cause])
+        out.append(_direction_code(direction))
+        for value in timers:
+            _write_varint(out, value)
+        self._write_food(out, food, food_timer)
+        self._write_obstacles(out, obstacles)
+
+        # Snake: length, head cell, then the step from each segment to the next
+        _write_varint(out, length)
+        _write_varint(out, self._cell(head))
+        if length > 1:
+            positions = engine.snake.positions
+            body = np.fromiter(chain.from_iterable(positions), dtype=np.int32, count=2 * length)
+            body = body.reshape(-1, 2) // SNAKE_BLOCK
+            steps = body[1:] - body[:-1]
+            dx, dy = steps[:, 0], steps[:, 1]
+            if np.any(np.abs(dx) + np.abs(dy) != 1):
+                raise ValueError("snake body is not contiguous")
+            codes = np.where(dx == 0, 1 + dy, 2 - dx).astype(np.uint8)
+            padded = np.zeros(-(-len(codes) // 4) * 4, dtype=np.uint8)
+            padded[:len(codes)] = codes
+            out += (padded.reshape(-1, 4) * _WEIGHTS).sum(axis=1, dtype=np.uint8).tobytes()
+        return bytes(out)
+
+    def _snapshot(self, engine):
+        snake = engine.snake
+        food = engine.food
+        return (engine.ticks, snake.positions[0], len(snake.positions), snake.direction, engine.score,
+                (food.position, food.food_type), food.special_timer,
+                (snake.boost_timer, snake.multiplier_timer, snake.shrink_timer, snake.slowmo_timer,
+                 snake.double_score_timer, snake.ghost_timer),
+                tuple((obstacle.x, obstacle.y, obstacle.type, obstacle.direction)
+                      for obstacle in engine.obstacle_manager.obstacles),
+                engine.time_remaining, engine.death_cause)
+
+    def _cell(self, position):
+        return (position[1] // SNAKE_BLOCK + 1) * self.stride + position[0] // SNAKE_BLOCK + 1
+
+    def _write_food(self, out, food, timer):
+        position, food_type = food
+        _write_varint(out, self._cell(position) + 1 if position is not None else 0)
+        out.append(food_type)
+        _write_varint(out, max(timer, 0))
+
+    def _write_obstacles(self, out, obstacles):
+        _write_varint(out, len(obstacles))
+        for x, y, obstacle_type, direction in obstacles:
+            code = OBSTACLE_TYPE_CODES[obstacle_type] << 2 | _direction_code(direction, 1)
+            if x % SNAKE_BLOCK or y % SNAKE_BLOCK:
+                # Placed off the grid (one challenge layout is): store the pixel position
+                out.append(code | UNALIGNED)
+                _write_varint(out, x)
+                _write_varint(out, y)
+            else:
+                out.append(code)
+                _write_varint(out, self._cell((x, y)))
+
+
+class BoardState:
+    """Board state rebuilt by a StateDecoder.
+
+    The snake lives in a ring buffer of padded cell indices, head first, so a
+    delta only writes the new head and shortens the length. Use cells() or
+    positions() for arrays of the whole body.
+    """
+
+    def __init__(self, cols, rows):
+        self.cols = cols
+        self.rows = rows
+        self.stride = cols + 2
+        self.tick = 0
+        self.score = 0
+        self.time_remaining = 0
+        self.cause = None
+        self.direction = 1
+        self.timers = [0] * len(SNAKE_TIMERS)
+        self.food = None  # Padded cell, or None when the board is full
+        self.food_type = NORMAL_FOOD
+        self.food_timer = 0
+        self.obstacles = []  # (x, y, type, direction code)
+        self.ring = np.zeros(16, dtype=np.int32)
+        self.head = 0  # Ring index of the head
+        self.length = 0
+        self.steps = (-self.stride, 1, self.stride, -1)
+
+    def set_cells(self, cells):
+        self.ring = np.zeros(max(16, 2 * len(cells)), dtype=np.int32)
+        self.ring[:len(cells)] = cells
+        self.head = 0
+        self.length = len(cells)
+
+    def step_head(self, code, removed):
+        ring = self.ring
+        if self.length == len(ring):
+            self.set_cells(self.cells())
+            ring = self.ring
+        cell = ring[self.head] + self.steps[code]
+        self.head = (self.head - 1) % len(ring)
+        ring[self.head] = cell
+        self.length += 1 - removed
+
+    def cells(self):
+        """Padded cell index of every segment, head first"""
+        end = self.head + self.length
+        if end <= len(self.ring):
+            return self.ring[self.head:end].copy()
+        return np.concatenate((self.ring[self.head:], self.ring[:end - len(self.ring)]))
+
+    def positions(self):
+        """(length, 2) array of the segments' pixel positions, head first"""
+        cells = self.cells()
+        return np.stack((cells % self.stride - 1, cells // self.stride - 1), axis=1) * SNAKE_BLOCK
+
+    def position(self, cell):
+        """Pixel position of a padded cell index"""
+        return ((cell % self.stride - 1) * SNAKE_BLOCK, (cell // self.stride - 1) * SNAKE_BLOCK)
+
+
+class StateDecoder:
+    """Applies keyframes and deltas from a StateEncoder to a BoardState"""
+
+    def __init__(self):
+        self.state = None
+
+    def decode(self, data):
+        """Apply one encoded message; returns the updated BoardState"""
+        header = data[0]
+        if header >> 4 != CODEC_VERSION:
+            raise ValueError(f"unsupported codec version {header >> 4}")
+        if header & 0x0f == KEYFRAME:
+            return self._keyframe(data)
+        if header & 0x0f not in (DELTA, DELTA_SAME):
+            raise ValueError(f"unknown message kind {header & 0x0f}")
+        if self.state is None:
+            raise ValueError("delta before the first keyframe")
+        return self._delta(data)
+
+    def _keyframe(self, data):
+        offset = 1
+        values = []
+        for _ in range(5):
+            value, offset = _read_varint(data, offset)
+            values.append(value)
+        cols, rows, tick, score, time_remaining = values
+        state = BoardState(cols, rows)
+        state.tick, state.score, state.time_remaining = tick, score, time_remaining
+        state.cause = CAUSES[data[offset]]
+        state.direction = data[offset + 1]
+        offset += 2
+        for index in range(len(SNAKE_TIMERS)):
+            state.timers[index], offset = _read_varint(data, offset)
+        offset = self._read_food(data, offset, state)
+        offset = self._read_obstacles(data, offset, state)
+
+        length, offset = _read_varint(data, offset)
+        head, offset = _read_varint(data, offset)
+        packed = np.frombuffer(data, dtype=np.uint8, count=-(-(length - 1) // 4), offset=offset)
+        codes = ((packed[:, None] >> _SHIFTS) & 3).ravel()[:length - 1]
+        cells = np.empty(length, dtype=np.int32)
+        cells[0] = head
+        cells[1:] = np.array(state.steps, dtype=np.int32)[codes]
+        state.set_cells(np.cumsum(cells, dtype=np.int32))
+        self.state = state
+        return state
+
+    def _delta(self, data):
+        state = self.state
+        flags, offset = _read_varint(data, 1)
+        if data[0] & 0x0f == DELTA:
+            state.tick += 1
+        if flags & MOVED:
+            byte = data[offset]
+            offset += 1
+            state.step_head(byte & 3, byte >> 2)
+        if flags & DIRECTION:
+            state.direction = data[offset]
+            offset += 1
+        if flags & SCORE:
+            state.score, offset = _read_varint(data, offset)
+        if flags & FOOD:
+            offset = self._read_food(data, offset, state)
+        if flags & FOOD_TIMER:
+            state.food_timer, offset = _read_varint(data, offset)
+        if flags & TIMERS:
+            mask = data[offset]
+            offset += 1
+            for index in range(len(SNAKE_TIMERS)):
+                if mask & 1 << index:
+                    state.timers[index], offset = _read_varint(data, offset)
+        if flags & OBSTACLES:
+            offset = self._read_obstacles(data, offset, state)
+        if flags & CLOCK:
+            state.time_remaining, offset = _read_varint(data, offset)
+        if flags & STATUS:
+            state.cause = CAUSES[data[offset]]
+        return state
+
+    def _read_food(self, data, offset, state):
+        cell, offset = _read_varint(data, offset)
+        state.food = cell - 1 if cell else None
+        state.food_type = data[offset]
+        state.food_timer, offset = _read_varint(data, offset + 1)
+        return offset
+
+    def _read_obstacles(self, data, offset, state):
+        count, offset = _read_varint(data, offset)
+        state.obstacles = []
+        for _ in range(count):
+            byte = data[offset]
+            offset += 1
+            if byte & UNALIGNED:
+                x, offset = _read_varint(data, offset)
+                y, offset = _read_varint(data, offset)
+            else:
+                cell, offset = _read_varint(data, offset)
+                x, y = state.position(cell)
+            state.obstacles.append((x, y, OBSTACLE_TYPES[byte >> 2 & 1], byte & 3))
+        return offset
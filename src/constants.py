@@ -2,6 +2,16 @@ SCREEN_WIDTH = 800
 SCREEN_HEIGHT = 600
 SNAKE_BLOCK = 20
 
+# Board size in cells, independent of the window; larger boards scroll with the snake
+BOARD_COLS = SCREEN_WIDTH // SNAKE_BLOCK
+BOARD_ROWS = SCREEN_HEIGHT // SNAKE_BLOCK
+
+# Timing: game rules advance in fixed ticks, rendering runs at its own rate
+TICK_RATE = 30             # Rule ticks per second; every duration below is in ticks
+RENDER_FPS = 60            # Default render cap
+RENDER_FPS_OPTIONS = (30, 60, 120, 144)
+MAX_TICKS_PER_FRAME = 5    # Catch-up limit after a stall, avoids a spiral of death
+
 # Game state constants
 MENU = 0
 GAME_RUNNING = 1
@@ -10,12 +20,27 @@ GAME_OVER = 3
 SETTINGS = 4
 HIGH_SCORES = 5
 GAME_MODE_SELECT = 6
+LOADING = 7
 
 # Game modes
 CLASSIC_MODE = 0
 TIME_ATTACK_MODE = 1
 CHALLENGE_MODE = 2
 
+# Engine event types (first element of each event tuple)
+EVENT_MOVE = 0          # (EVENT_MOVE, new_head, removed_tail_positions)
+EVENT_EAT = 1           # (EVENT_EAT, food_type, points)
+EVENT_FOOD_SPAWN = 2    # (EVENT_FOOD_SPAWN, position)
+EVENT_OBSTACLE_ADD = 3  # (EVENT_OBSTACLE_ADD, position)
+EVENT_GAME_OVER = 4     # (EVENT_GAME_OVER, cause)
+
+# Game over causes
+DEATH_WALL = 'wall'
+DEATH_OBSTACLE = 'obstacle'
+DEATH_SELF = 'self'
+DEATH_TIME_UP = 'time_up'
+BOARD_FULL = 'board_full'  # Not a death: the snake filled every free cell
+
 # Difficulty settings
 EASY = 10   # Reduced from 3
 MEDIUM = 12  # Reduced from 8
@@ -46,7 +71,11 @@ ORANGE = (255, 165, 0)
 import os
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 BASE_DIR = os.path.dirname(SCRIPT_DIR)
-HIGHSCORE_FILE = os.path.join(BASE_DIR, "highscores.txt")
+HIGHSCORE_FILE = os.path.join(BASE_DIR, "highscores.txt")  # Old format, imported into the leaderboard
+LEADERBOARD_FILE = os.path.join(BASE_DIR, "leaderboard.db")
+LEADERBOARD_SIZE = 5  # Games listed per mode and difficulty
+REPLAY_DIR = os.path.join(BASE_DIR, "replays")
+LAST_REPLAY_FILE = os.path.join(REPLAY_DIR, "last.json")
 ASSET_DIR = os.path.join(BASE_DIR, "assets")
 SOUND_DIR = os.path.join(ASSET_DIR, "sounds")
 IMAGE_DIR = os.path.join(ASSET_DIR, "images")
@@ -54,7 +83,7 @@ IMAGE_DIR = os.path.join(ASSET_DIR, "images")
 # Animation constants
 ANIMATION_FRAMES = 15  # Increased from 5 to slow down animations
 
-# Power-up durations (in frames at 30 FPS)
+# Power-up durations (in ticks at TICK_RATE = 30)
 SHRINK_DURATION = 300    # 10 seconds
 SLOWMO_DURATION = 450    # 15 seconds  
 DOUBLE_SCORE_DURATION = 600  # 20 seconds
@@ -62,6 +91,7 @@ GHOST_DURATION = 450     # 15 seconds
 
 # Obstacle constants
 MAX_OBSTACLES = 5
+MAX_PARTICLES = 4096  # Size of the particle pool; bursts beyond it are dropped
 OBSTACLE_SIZE = SNAKE_BLOCK
 
 # Time attack mode duration (in seconds)
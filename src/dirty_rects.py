@@ -0,0 +1,173 @@
+import pygame
+from constants import *
+
+class DirtyRectRenderer:
+    """Redraws only the parts of the game screen that changed since the last frame.
+
+    Changed regions come from engine events (head moved, tail dropped, food
+    spawned, obstacle added) plus everything that animates on its own: the
+    head, food, moving obstacles, particles and the HUD text. Overlapping
+    regions are merged, and each one is redrawn with the screen clipped to
+    it: the cached background, then only the objects that touch it. Only
+    those rectangles are handed to pygame.display.update, so the snake body
+    is drawn without its wobble here (a segment must not change unless it
+    moved). A frame in which the camera scrolled is always redrawn in full.
+    """
+
+    def __init__(self, screen):
+        self.screen = screen
+        self.previous_rects = []
+        self.event_rects = []
+        self.needs_full_redraw = True
+        self.background_key = None
+        self.camera_position = None
+
+    def invalidate(self):
+        """Force a full redraw on the next frame"""
+        self.needs_full_redraw = True
+        self.event_rects = []
+
+    def note_events(self, events):
+        """Record the cells touched by a tick's engine events"""
+        for event in events:
+            if event[0] == EVENT_MOVE:
+                self.event_rects.append(self._cell_rect(event[1]))
+                for position in event[2]:
+                    self.event_rects.append(self._cell_rect(position))
+            elif event[0] in (EVENT_FOOD_SPAWN, EVENT_OBSTACLE_ADD):
+                if event[1] is not None:
+                    self.event_rects.append(self._cell_rect(event[1]))
+
+    def draw(self, game_manager):
+        """Draw the running game; returns the rects to update, or None after a full redraw"""
+        screen = self.screen
+        texture_manager = game_manager.texture_manager
+        texture_manager.get_background_layer(screen)  # Rebuilds it if the screen or mode changed
+        camera = game_manager.camera
+        # Regions are tracked on the board; shift them to where they are on screen
+        offset = camera.offset
+        current_rects = [rect.move(offset) for rect in self._dynamic_rects(game_manager)]
+
+        # Scrolling moves everything, so it always needs a full redraw
+        if (self.needs_full_redraw or texture_manager.background_key != self.background_key or
+                (camera.x, camera.y) != self.camera_position):
+            hud_rects = game_manager._draw_game()
+            self.previous_rects = current_rects + hud_rects
+            self.event_rects = []
+            self.needs_full_redraw = False
+            self.background_key = texture_manager.background_key
+            self.camera_position = (camera.x, camera.y)
+            return None
+
+        screen_rect = screen.get_rect()
+        event_rects = [rect.move(offset) for rect in self.event_rects]
+        # Merged so no two overlap: translucent sprites must not be drawn twice over one pixel
+        dirty = _merge_rects(rect.clip(screen_rect) for rect in self.previous_rects + current_rects + event_rects)
+
+        # Redraw each dirty region with the screen clipped to it: the background, then whatever touches it
+        profiler = game_manager.profiler
+        obstacles = game_manager.obstacle_manager.obstacles
+        obstacle_rects = [self._cell_rect(obstacle.get_position()).move(offset) for obstacle in obstacles]
+        food = game_manager.food
+        food_rects = [rect.move(offset) for rect in self._food_rects(food)]
+        snake = game_manager.snake
+        interpolation = game_manager.snake_interpolation()
+        particles = game_manager.particles
+        particle_bounds = particles.bounds()
+        with profiler.span('background'):
+            for rect in dirty:
+                screen.set_clip(rect)
+                texture_manager.draw_background(screen, camera, rect)
+                game_manager._draw_board_edges()
+        with profiler.span('obstacles'):
+            for rect in dirty:
+                hits = rect.collidelistall(obstacle_rects)
+                if hits:
+                    screen.set_clip(rect)
+                    for index in hits:
+                        obstacles[index].draw(screen, texture_manager, offset)
+        with profiler.span('food'):
+            for rect in dirty:
+                if rect.collidelist(food_rects) >= 0:
+                    screen.set_clip(rect)
+                    food.draw(screen, camera)
+        with profiler.span('snake'):
+            for rect in dirty:
+                screen.set_clip(rect)
+                snake.draw(screen, camera, interpolation, area=rect.move(camera.x, camera.y), wobble=False)
+        with profiler.span('particles'):
+            if particle_bounds is not None:
+                particle_bounds = particle_bounds.move(offset)
+                for rect in dirty:
+                    if rect.colliderect(particle_bounds):
+                        screen.set_clip(rect)
+                        particles.draw(screen, camera, game_manager.particle_alpha())
+        screen.set_clip(None)
+        profiler.count('particles', len(particles))
+        with profiler.span('ui'):
+            hud_rects = game_manager._draw_game_ui()
+        profiler.count('dirty rects', len(dirty))
+        dirty.extend(hud_rects)
+
+        self.previous_rects = current_rects + hud_rects
+        self.event_rects = []
+        return dirty
+
+    def _cell_rect(self, position):
+        return pygame.Rect(position[0], position[1], SNAKE_BLOCK, SNAKE_BLOCK)
+
+    def _food_rects(self, food):
+        """Board regions the food draws into"""
+        if food.position is None:
+            return []
+        food_x, food_y = food.position
+        # Bounce, pulse scaling, glow pixels and the timer bar above the food
+        rects = [pygame.Rect(food_x - 8, food_y - 8, SNAKE_BLOCK + 16, SNAKE_BLOCK + 16)]
+        if food.spawn_animation > 0:
+            radius = (30 - food.spawn_animation) * 2 + 2
+            center_x = food_x + SNAKE_BLOCK // 2
+            center_y = food_y + SNAKE_BLOCK // 2
+            rects.append(pygame.Rect(center_x - radius, center_y - radius, radius * 2, radius * 2))
+        return rects
+
+    def _dynamic_rects(self, game_manager):
+        """Board regions that can change every frame even without engine events"""
+        rects = []
+
+        # Head, eating animation and the power-up indicator above it
+        head_x, head_y = game_manager.snake.get_head_position()
+        rects.append(pygame.Rect(head_x - 8, head_y - 20, SNAKE_BLOCK + 16, SNAKE_BLOCK + 28))
+        # While interpolating, the head slides out of the neck and the tail from the cell it left into the last one
+        interpolation = game_manager.snake_interpolation()
+        if interpolation is not None:
+            rects.append(self._cell_rect(interpolation[0]))
+            if interpolation[1] is not None:
+                rects.append(self._cell_rect(interpolation[1]))
+                rects.append(self._cell_rect(game_manager.snake.positions[-1]))
+
+        # Moving obstacles pulse and move; static ones only appear, which is an engine event
+        for obstacle in game_manager.obstacle_manager.obstacles:
+            if obstacle.type == "moving":
+                rects.append(self._cell_rect(obstacle.get_position()))
+
+        rects.extend(self._food_rects(game_manager.food))
+
+        # Particles, as one box around all of them
+        particle_bounds = game_manager.particles.bounds()
+        if particle_bounds is not None:
+            rects.append(particle_bounds)
+        return rects
+
+
+def _merge_rects(rects):
+    """Replace overlapping rects by their union until none overlap; empty rects are dropped"""
+    merged = []
+    for rect in rects:
+        if not (rect.width and rect.height):
+            continue
+        index = rect.collidelist(merged)
+        while index >= 0:
+            rect = rect.union(merged.pop(index))
+            index = rect.collidelist(merged)
+        merged.append(rect)
+    return merged
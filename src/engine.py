@@ -0,0 +1,149 @@
+import random
+from constants import *
+from snake import Snake
+from food import Food
+from obstacles import ObstacleManager
+from free_cells import FreeCellIndex
+
+class SnakeEngine:
+    """Headless game rules: one call to step() advances the game by one tick.
+
+    The engine never initializes or calls into pygame, so it can run without a
+    display or mixer. Everything a front end needs to react to (sounds, effects,
+    high scores) is reported through the list of event tuples step() returns.
+
+    Every random draw of the rules comes from one generator seeded per game, so
+    the same seed and the same actions on the same ticks always play out the
+    same way (see replay.py). Cosmetic randomness stays on other generators.
+    """
+
+    def __init__(self, width=SCREEN_WIDTH, height=SCREEN_HEIGHT, speed=MEDIUM, game_mode=CLASSIC_MODE,
+                 seed=None):
+        self.width = width
+        self.height = height
+        self.speed = speed
+        self.game_mode = game_mode
+        self.reset(seed)
+
+    def reset(self, seed=None):
+        """Start a fresh game and return the events of the initial spawn"""
+        # A new game without a given seed still gets one, so it can be replayed
+        self.seed = seed if seed is not None else random.getrandbits(32)
+        self.rng = random.Random(self.seed)
+
+        # Every object keeps the free-cell index in sync as it moves
+        self.free_cells = FreeCellIndex(self.width, self.height)
+        self.snake = Snake(free_cells=self.free_cells)
+        self.obstacle_manager = ObstacleManager(self.width, self.height, self.game_mode, self.free_cells, self.rng)
+        self.food = Food(self.width, self.height, free_cells=self.free_cells, rng=self.rng)
+
+        self.score = 0
+        self.ticks = 0
+        self.frame_counter = 0
+        self.game_over = False
+        self.death_cause = None
+        self.won = False
+
+        # Setup time attack mode
+        self.time_remaining = 0
+        if self.game_mode == TIME_ATTACK_MODE:
+            self.time_remaining = TIME_ATTACK_DURATION * TICK_RATE  # Convert to ticks
+
+        # Spawn initial food (the free-cell index already knows the snake and obstacles)
+        self.food.spawn()
+        return [(EVENT_FOOD_SPAWN, self.food.get_position())]
+
+    def get_movement_threshold(self):
+        """Number of ticks between two snake moves"""
+        base_threshold = max(TICK_RATE - self.speed * 2, 1)
+        if self.snake.is_slowmo_active():
+            return base_threshold * 2  # Slow down during slowmo
+        return base_threshold
+
+    def will_move(self):
+        """Whether the next step() moves the snake, and so is the one whose action counts"""
+        return not self.game_over and self.frame_counter + 1 >= self.get_movement_threshold()
+
+    def step(self, action=None):
+        """Advance the game by one tick.
+
+        action is an optional new direction, e.g. (0, -SNAKE_BLOCK) for up.
+        Returns the list of events that happened during this tick.
+        """
+        events = []
+        if self.game_over:
+            return events
+
+        if action is not None:
+            self.snake.change_direction(action)
+
+        self.ticks += 1
+        self.frame_counter += 1
+
+        # Move snake
+        if self.frame_counter >= self.get_movement_threshold():
+            removed = self.snake.move()
+            self.frame_counter = 0
+            events.append((EVENT_MOVE, self.snake.get_head_position(), removed))
+
+            # Check collision (the obstacle cell map gives constant time membership tests)
+            cause = self.snake.get_collision_cause(self.width, self.height, self.obstacle_manager.cells)
+            if cause is not None:
+                self._end_game(cause, events)
+                return events
+
+        # Check food collision
+        if self.snake.get_head_position() == self.food.get_position():
+            self._eat_food(events)
+            if self.game_over:
+                return events
+
+        # Update time attack mode
+        if self.game_mode == TIME_ATTACK_MODE:
+            self.time_remaining -= 1
+            if self.time_remaining <= 0:
+                self._end_game(DEATH_TIME_UP, events)
+                return events
+
+        # Update game objects
+        self.food.update()
+        self.obstacle_manager.update()
+        return events
+
+    def _eat_food(self, events):
+        food_type = self.food.get_food_type()
+
+        # Apply food effects
+        if food_type != NORMAL_FOOD:
+            self.snake.apply_powerup(food_type)
+
+        # Update score
+        points = self.food.get_points() * self.snake.get_score_multiplier()
+        self.score += points
+        events.append((EVENT_EAT, food_type, points))
+
+        # Grow snake (except for shrink food)
+        if food_type != SHRINK_FOOD:
+            self.snake.grow()
+
+        # Spawn new food; no free cell left means the board is won
+        if self.food.spawn() is None:
+            self.won = True
+            self._end_game(BOARD_FULL, events)
+            return
+        events.append((EVENT_FOOD_SPAWN, self.food.get_position()))
+
+        # Add obstacles occasionally in classic mode
+        if self.game_mode == CLASSIC_MODE and self.score % 100 == 0:
+            obstacle_count = len(self.obstacle_manager.obstacles)
+            self.obstacle_manager.add_random_obstacle(
+                self.snake.occupancy,
+                self.food.get_position()
+            )
+            if len(self.obstacle_manager.obstacles) > obstacle_count:
+                events.append((EVENT_OBSTACLE_ADD, self.obstacle_manager.obstacles[-1].get_position()))
+
+    def _end_game(self, cause, events):
+        self.game_over = True
+        self.death_cause = cause
+        events.append((EVENT_GAME_OVER, cause))
@@ -1,11 +1,26 @@
-import pygame
 import random
 import os
 import math
 from constants import *
 
+# pygame is only imported by the drawing code, so the rules (SnakeEngine) run without it
+
+# Fallback color of each food type, also used for its particles
+FOOD_COLORS = {
+    NORMAL_FOOD: RED,
+    SPECIAL_FOOD: PURPLE,
+    SUPER_FOOD: GOLD,
+    SHRINK_FOOD: BLUE,
+    SLOWMO_FOOD: (0, 255, 255),
+    DOUBLE_SCORE_FOOD: (255, 215, 0),
+    GHOST_FOOD: (200, 200, 255),
+}
+
+# How far the spawn ring can reach from the food, in pixels
+EFFECT_MARGIN = 64
+
 class Food:
-    def __init__(self, screen_width, screen_height, texture_manager=None):
+    def __init__(self, screen_width, screen_height, texture_manager=None, free_cells=None, rng=random):
         self.screen_width = screen_width
         self.screen_height = screen_height
         self.position = None
@@ -17,51 +32,36 @@ class Food:
         self.texture_manager = texture_manager
         self.rotation_angle = 0
         self.spawn_animation = 0  # Animation when food appears
-        self.spawn_particles = []  # Particles when food spawns
+        self.free_cells = free_cells  # Optional FreeCellIndex, makes spawning O(1)
+        self.rng = rng  # Gameplay randomness; the engine passes its seeded generator
         self.spawn()
 
     def spawn(self, snake_positions=None, obstacle_positions=None):
-        # Make food spawn aligned with the snake grid (SNAKE_BLOCK)
-        valid_position = False
-        
-        while not valid_position:
-            x = random.randint(0, (self.screen_width // SNAKE_BLOCK) - 1) * SNAKE_BLOCK
-            y = random.randint(0, (self.screen_height // SNAKE_BLOCK) - 1) * SNAKE_BLOCK
-            new_position = (x, y)
-            
-            # Ensure food doesn't spawn on snake or obstacles
-            if ((snake_positions and new_position in snake_positions) or 
-                (obstacle_positions and new_position in obstacle_positions)):
-                continue
-            else:
-                valid_position = True
+        """Move the food to a free cell; returns None when the board is full"""
+        if self.free_cells is not None:
+            # The index already knows about the snake and obstacles
+            if self.position is not None:
+                self.free_cells.release(self.position)
+            new_position = self.free_cells.choice(self.rng)
+            if new_position is not None:
+                self.free_cells.occupy(new_position)
+        else:
+            new_position = self._find_free_position(snake_positions, obstacle_positions)
                 
         self.position = new_position
+        if new_position is None:
+            return None
         
-        # Start spawn animation
+        # Start spawn animation (the particle burst comes from the game's ParticleSystem)
         self.spawn_animation = 30  # 1 second at 30 FPS
         
-        # Create spawn particles
-        self.spawn_particles = []
-        for _ in range(8):
-            angle = random.random() * 2 * math.pi
-            speed = random.uniform(2, 5)
-            self.spawn_particles.append({
-                'x': new_position[0] + SNAKE_BLOCK // 2,
-                'y': new_position[1] + SNAKE_BLOCK // 2,
-                'vx': math.cos(angle) * speed,
-                'vy': math.sin(angle) * speed,
-                'life': 20,
-                'max_life': 20
-            })
-        
         # Random chance for special food
         self.special_counter += 1
         
         # Every 5 regular foods, spawn a special food
         if self.special_counter >= 5:
             self.special_counter = 0
-            rand_val = random.random()
+            rand_val = self.rng.random()
             if rand_val < 0.3:  # 30% chance for special food
                 self.food_type = SPECIAL_FOOD
                 self.special_timer = 300  # 10 seconds at 30 FPS
@@ -87,27 +87,31 @@ class Food:
             
         return self.position
 
+    def _find_free_position(self, snake_positions, obstacle_positions):
+        # Make food spawn aligned with the snake grid (SNAKE_BLOCK)
+        def is_free(position):
+            # Ensure food doesn't spawn on snake or obstacles
+            return not ((snake_positions and position in snake_positions) or
+                        (obstacle_positions and position in obstacle_positions))
+        
+        cols = self.screen_width // SNAKE_BLOCK
+        rows = self.screen_height // SNAKE_BLOCK
+        for _ in range(100):
+            x = self.rng.randint(0, cols - 1) * SNAKE_BLOCK
+            y = self.rng.randint(0, rows - 1) * SNAKE_BLOCK
+            if is_free((x, y)):
+                return (x, y)
+        
+        # Board is nearly full, pick from the remaining cells directly
+        free = [(x * SNAKE_BLOCK, y * SNAKE_BLOCK) for y in range(rows) for x in range(cols)
+                if is_free((x * SNAKE_BLOCK, y * SNAKE_BLOCK))]
+        return self.rng.choice(free) if free else None
+
     def update(self):
         # Update spawn animation
         if self.spawn_animation > 0:
             self.spawn_animation -= 1
         
-        # Update spawn particles
-        for particle in self.spawn_particles[:]:
-            if isinstance(particle, Particle):
-                # Particle class instances are updated in the draw method
-                continue
-            else:
-                # Dictionary-based particles
-                particle['x'] += particle['vx']
-                particle['y'] += particle['vy']
-                particle['life'] -= 1
-                particle['vx'] *= 0.95  # Slow down
-                particle['vy'] *= 0.95
-                
-                if particle['life'] <= 0:
-                    self.spawn_particles.remove(particle)
-        
         # Update special food timer
         if self.food_type != NORMAL_FOOD:
             self.special_timer -= 1
@@ -124,7 +128,7 @@ class Food:
         if self.food_type != NORMAL_FOOD:
             # Special food rotates faster
             self.rotation_angle = (self.rotation_angle + (2 if self.food_type == SPECIAL_FOOD else 4)) % 360
-
+    
     def get_position(self):
         return self.position
         
@@ -148,7 +152,20 @@ class Food:
             return 40
         return 10
     
-    def draw(self, screen):
+    def draw(self, screen, camera=None):
+        import pygame
+        if self.position is None:
+            return
+        
+        # Skip the food and its effects entirely when they are out of view
+        offset_x, offset_y = 0, 0
+        if camera is not None:
+            if not camera.is_visible(self.position, EFFECT_MARGIN):
+                return
+            offset_x, offset_y = camera.offset
+        food_x = self.position[0] + offset_x
+        food_y = self.position[1] + offset_y
+        
         use_textures = self.texture_manager and self.texture_manager.use_textures
         
         # Calculate animation size offset
@@ -213,8 +230,8 @@ class Food:
                     scaled_food = pygame.transform.scale(pulse_surface, (int(food_size), int(food_size)))
                     
                     rect = scaled_food.get_rect(center=(
-                        self.position[0] + SNAKE_BLOCK/2, 
-                        self.position[1] + SNAKE_BLOCK/2
+                        food_x + SNAKE_BLOCK/2, 
+                        food_y + SNAKE_BLOCK/2
                     ))
                     screen.blit(scaled_food, rect)
                     
@@ -223,8 +240,8 @@ class Food:
                     for i in range(6):
                         angle = i * math.pi / 3 + pygame.time.get_ticks() * 0.005
                         distance = 4 + math.sin(pygame.time.get_ticks() * 0.01) * 2
-                        px = self.position[0] + SNAKE_BLOCK/2 + math.cos(angle) * distance
-                        py = self.position[1] + SNAKE_BLOCK/2 + math.sin(angle) * distance
+                        px = food_x + SNAKE_BLOCK/2 + math.cos(angle) * distance
+                        py = food_y + SNAKE_BLOCK/2 + math.sin(angle) * distance
                         
                         pygame.draw.rect(screen, YELLOW, 
                                         (px, py, pixel_size, pixel_size))
@@ -235,8 +252,8 @@ class Food:
                     scaled_food = pygame.transform.scale(rotated_food, (int(food_size), int(food_size)))
                     
                     rect = scaled_food.get_rect(center=(
-                        self.position[0] + SNAKE_BLOCK/2, 
-                        self.position[1] + SNAKE_BLOCK/2
+                        food_x + SNAKE_BLOCK/2, 
+                        food_y + SNAKE_BLOCK/2
                     ))
                     screen.blit(scaled_food, rect)
                     
@@ -244,8 +261,8 @@ class Food:
                     if random.random() > 0.8:
                         pixel_size = 2
                         # Random sparkle position near the food
-                        spark_x = self.position[0] + random.randint(0, SNAKE_BLOCK)
-                        spark_y = self.position[1] + random.randint(0, SNAKE_BLOCK)
+                        spark_x = food_x + random.randint(0, SNAKE_BLOCK)
+                        spark_y = food_y + random.randint(0, SNAKE_BLOCK)
                         
                         pygame.draw.rect(screen, WHITE, 
                                         (spark_x, spark_y, pixel_size, pixel_size))
@@ -256,30 +273,30 @@ class Food:
                     
                     # Add a "floating" effect
                     screen.blit(food_texture, (
-                        self.position[0], 
-                        self.position[1] + bounce_offset
+                        food_x, 
+                        food_y + bounce_offset
                     ))
                     
                     # Occasionally add a shine pixel
                     if random.random() > 0.95:
                         pygame.draw.rect(screen, WHITE, (
-                            self.position[0] + SNAKE_BLOCK//3, 
-                            self.position[1] + SNAKE_BLOCK//3, 
+                            food_x + SNAKE_BLOCK//3, 
+                            food_y + SNAKE_BLOCK//3, 
                             2, 2
                         ))
             else:
                 # Fallback to colored rectangle if texture not available
                 pygame.draw.rect(screen, color, (
-                    self.position[0] - position_offset, 
-                    self.position[1] - position_offset, 
+                    food_x - position_offset, 
+                    food_y - position_offset, 
                     food_size, 
                     food_size
                 ))
         else:
             # Draw food with solid color if not using textures
             pygame.draw.rect(screen, color, (
-                self.position[0] - position_offset, 
-                self.position[1] - position_offset, 
+                food_x - position_offset, 
+                food_y - position_offset, 
                 food_size, 
                 food_size
             ))
@@ -289,13 +306,13 @@ class Food:
             # Draw a pixel art timer bar above the food
             timer_width = SNAKE_BLOCK
             timer_height = 3
-            timer_y = self.position[1] - 6
+            timer_y = food_y - 6
             timer_progress = min(1.0, self.special_timer / (300.0 if self.food_type == SPECIAL_FOOD else 150.0))
             
             # Draw pixel-by-pixel for timer background
             for x in range(0, timer_width, 2):
                 pygame.draw.rect(screen, GRAY, (
-                    self.position[0] + x,
+                    food_x + x,
                     timer_y,
                     2,
                     timer_height
@@ -306,13 +323,13 @@ class Food:
             progress_width = int(timer_width * timer_progress)
             for x in range(0, progress_width, 2):
                 pygame.draw.rect(screen, color, (
-                    self.position[0] + x,
+                    food_x + x,
                     timer_y,
                     2,
                     timer_height
                 ))
         
-        # Draw spawn animation and particles
+        # Draw spawn animation
         if self.spawn_animation > 0:
             # Draw expanding circle effect
             alpha = int((self.spawn_animation / 30) * 100)
@@ -322,54 +339,6 @@ class Food:
             circle_surface = pygame.Surface((radius * 2, radius * 2), pygame.SRCALPHA)
             pygame.draw.circle(circle_surface, (255, 255, 255, alpha), (radius, radius), radius, 2)
             
-            circle_x = self.position[0] + SNAKE_BLOCK // 2 - radius
-            circle_y = self.position[1] + SNAKE_BLOCK // 2 - radius
+            circle_x = food_x + SNAKE_BLOCK // 2 - radius
+            circle_y = food_y + SNAKE_BLOCK // 2 - radius
             screen.blit(circle_surface, (circle_x, circle_y))
-        
-        # Draw spawn particles
-        for particle in self.spawn_particles:
-            if isinstance(particle, Particle):
-                # Particle class instances
-                particle.update()
-                particle.draw(screen)
-                
-                # Remove old particles
-                if particle.lifetime <= 0:
-                    self.spawn_particles.remove(particle)
-            else:
-                # Dictionary-based particles
-                alpha = int((particle['life'] / particle['max_life']) * 255)
-                particle_size = max(1, int((particle['life'] / particle['max_life']) * 3))
-                
-                # Create particle surface with alpha
-                particle_surface = pygame.Surface((particle_size, particle_size), pygame.SRCALPHA)
-                particle_surface.fill((255, 255, 255, alpha))
-                screen.blit(particle_surface, (int(particle['x']), int(particle['y'])))
-        
-        # Create new particles
-        if random.random() < 0.3:  # 30% chance to create a particle
-            self.spawn_particles.append(Particle(
-                self.position[0] + random.randint(0, SNAKE_BLOCK),
-                self.position[1] + random.randint(0, SNAKE_BLOCK),
-                color
-            ))
-        
-class Particle:
-    def __init__(self, x, y, color):
-        self.position = [x, y]
-        self.velocity = [random.uniform(-1, 1), random.uniform(-1, 1)]
-        self.lifetime = 30  # Lifetime in frames
-        self.color = color
-        
-    def update(self):
-        # Update position and lifetime
-        self.position[0] += self.velocity[0]
-        self.position[1] += self.velocity[1]
-        self.lifetime -= 1
-        
-    def draw(self, screen):
-        # Draw the particle
-        pygame.draw.circle(screen, self.color, (
-            int(self.position[0]), 
-            int(self.position[1])
-        ), 2)
\ No newline at end of file
@@ -0,0 +1,72 @@
+import random
+from array import array
+from constants import *
+
+class FreeCellIndex:
+    """Tracks which board cells are free so a random one can be picked in O(1).
+
+    Free cells are kept at the front of a cell array; `slot` maps a cell to its
+    place in that array, so occupying or releasing a cell is a single swap.
+    Cells are reference counted because things can overlap (a ghost snake
+    crossing itself, the head on the food, a moving obstacle on the body).
+    Positions outside the board are ignored.
+    """
+
+    def __init__(self, width, height, block=SNAKE_BLOCK):
+        self.block = block
+        self.cols = width // block
+        self.rows = height // block
+        size = self.cols * self.rows
+        self.cells = array('i', range(size))
+        self.slot = array('i', range(size))
+        self.counts = array('i', bytes(4 * size))
+        self.free_count = size
+
+    def __len__(self):
+        return self.free_count
+
+    def _index(self, position):
+        col = position[0] // self.block
+        row = position[1] // self.block
+        if 0 <= col < self.cols and 0 <= row < self.rows:
+            return row * self.cols + col
+        return None
+
+    def _swap(self, cell, target_slot):
+        other = self.cells[target_slot]
+        cell_slot = self.slot[cell]
+        self.cells[target_slot] = cell
+        self.cells[cell_slot] = other
+        self.slot[cell] = target_slot
+        self.slot[other] = cell_slot
+
+    def occupy(self, position):
+        cell = self._index(position)
+        if cell is None:
+            return
+        self.counts[cell] += 1
+        if self.counts[cell] == 1:
+            # Move the cell to the end of the free block and shrink the block
+            self.free_count -= 1
+            self._swap(cell, self.free_count)
+
+    def release(self, position):
+        cell = self._index(position)
+        if cell is None or self.counts[cell] == 0:
+            return
+        self.counts[cell] -= 1
+        if self.counts[cell] == 0:
+            # Grow the free block by one and move the cell into it
+            self._swap(cell, self.free_count)
+            self.free_count += 1
+
+    def is_free(self, position):
+        cell = self._index(position)
+        return cell is not None and self.counts[cell] == 0
+
+    def choice(self, rng=random):
+        """Uniformly random free position, or None when the board is full"""
+        if self.free_count == 0:
+            return None
+        cell = self.cells[rng.randrange(self.free_count)]
+        return ((cell % self.cols) * self.block, (cell // self.cols) * self.block)
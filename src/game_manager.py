@@ -1,49 +1,105 @@
 import pygame
 import sys
 import math
+import time
 from constants import *
-from snake import Snake
-from food import Food
-from obstacles import ObstacleManager
+from engine import SnakeEngine
+from food import FOOD_COLORS
+from particles import ParticleSystem
+from loader import AssetLoader
 from sounds import SoundManager
 from textures import TextureManager
-from highscore import HighScore
+from leaderboard import Leaderboard
+from text_cache import TextCache
+from dirty_rects import DirtyRectRenderer
+from profiler import FrameProfiler
+from camera import Camera
+from replay import Replay, ACTIONS, ACTION_CODES
+from autopilot import Autopilot
+from input_queue import InputQueue
 
 DIFFICULTY_SPEED = {'easy': EASY, 'medium': MEDIUM, 'hard': HARD}
+GAME_MODE_NAMES = ["Classic Mode", "Time Attack", "Challenge Mode"]
+
+DEMO_IDLE_TICKS = 20 * TICK_RATE    # Menu idle time before the autopilot demo starts
+DEMO_RESTART_TICKS = 3 * TICK_RATE  # Game over screen time between demo games
+
+KEY_DIRECTIONS = {
+    pygame.K_UP: (0, -SNAKE_BLOCK),
+    pygame.K_DOWN: (0, SNAKE_BLOCK),
+    pygame.K_LEFT: (-SNAKE_BLOCK, 0),
+    pygame.K_RIGHT: (SNAKE_BLOCK, 0),
+}
 
 class GameManager:
-    def __init__(self, screen, clock):
+    def __init__(self, screen, clock, dirty_rects=False, profiler=None, board_size=(BOARD_COLS, BOARD_ROWS),
+                 seed=None, network=None):
         self.screen = screen
         self.clock = clock
-        self.game_state = MENU
+        self.game_state = LOADING
         self.selected_difficulty = 'medium'
         self.selected_game_mode = CLASSIC_MODE
         self.menu_selection = 0
         self.settings_selection = 0
         
         # Game components
+        self.engine = None
         self.snake = None
         self.food = None
         self.obstacle_manager = None
-        self.highscore = HighScore()
-        self.sound_manager = SoundManager()
-        self.texture_manager = TextureManager()
+        self.board_size = board_size  # In cells; the camera scrolls boards larger than the window
+        self.camera = None
+        self.seed = seed  # Seed of the first game, for reproducing a recorded one
+        self.replay = None  # Seed and inputs of the current game
+        self.leaderboard = Leaderboard()
+        self.leaderboard.start()  # Loads the best scores in the background while assets load
+        self.high_score_mode = CLASSIC_MODE  # Mode shown on the high scores screen
+        self.new_high_score = False
+        # Optional NetClient: games then come from the server, which we only mirror
+        self.network = network
+        self.network_player = False  # Whether our inputs steer the server's snake
+        self.awaiting_sync = False
+        # Sounds and textures load on a worker thread while the loading screen is drawn
+        self.loader = AssetLoader()
+        self.sound_manager = SoundManager(self.loader)
+        self.texture_manager = TextureManager(self.loader)
+        self.loader.start()
+        self.text_cache = TextCache()
+        self.particles = ParticleSystem()
+        # Optional renderer that only redraws and updates the changed regions
+        self.dirty_renderer = DirtyRectRenderer(screen) if dirty_rects else None
+        # Frame timing overlay, toggled with F3; F4 exports a trace of recent frames
+        self.profiler = profiler if profiler is not None else FrameProfiler()
         
         # Game variables
-        self.score = 0
-        self.current_speed = 0
-        self.frame_counter = 0
-        self.time_remaining = 0  # For time attack mode
+        self.input_queue = InputQueue()  # Turns waiting for the snake's next moves
+        self.autopilot = Autopilot()
+        self.demo = False  # Attract mode: the autopilot plays until a key is pressed
+        self.idle_ticks = 0
         self.paused = False
         
         # Animation variables
         self.menu_animation_timer = 0
+        self.render_alpha = 1.0  # Fraction of a tick elapsed since the last update
+        self.slide = None  # (head before, tail cell left) when the last tick moved the snake
         self.transition_alpha = 0
         self.transitioning = False
         
     def handle_event(self, event):
         if event.type == pygame.KEYDOWN:
-            if self.game_state == MENU:
+            if event.key == pygame.K_F3:
+                self.profiler.toggle()
+                if self.dirty_renderer:
+                    self.dirty_renderer.invalidate()  # Clear the overlay off the screen
+            elif event.key == pygame.K_F4:
+                self._export_trace()
+            elif self.game_state == LOADING:
+                pass
+            elif self.network is not None:
+                self._handle_network_input(event.key)
+            elif self.demo:
+                self.stop_demo()
+            elif self.game_state == MENU:
                 self._handle_menu_input(event.key)
             elif self.game_state == GAME_MODE_SELECT:
                 self._handle_game_mode_input(event.key)
@@ -58,7 +114,19 @@ class GameManager:
             elif self.game_state == GAME_OVER:
                 self._handle_game_over_input(event.key)
     
+    def start_demo(self):
+        """Start a game played by the autopilot"""
+        self.wait_for_assets()
+        self._start_new_game()
+        self.demo = True
+    
+    def stop_demo(self):
+        self.demo = False
+        self.idle_ticks = 0
+        self.game_state = MENU
+    
     def _handle_menu_input(self, key):
+        self.idle_ticks = 0
         menu_options = 6  # Start, Game Mode, High Scores, Settings, About, Quit
         
         if key == pygame.K_UP:
@@ -74,6 +142,7 @@ class GameManager:
             elif self.menu_selection == 1:  # Game Mode
                 self.game_state = GAME_MODE_SELECT
             elif self.menu_selection == 2:  # High Scores
+                self.high_score_mode = self.selected_game_mode
                 self.game_state = HIGH_SCORES
             elif self.menu_selection == 3:  # Settings
                 self.game_state = SETTINGS
@@ -126,17 +195,16 @@ class GameManager:
     def _handle_high_scores_input(self, key):
         if key == pygame.K_ESCAPE or key == pygame.K_RETURN:
             self.game_state = MENU
+        elif key == pygame.K_LEFT or key == pygame.K_RIGHT:
+            step = 1 if key == pygame.K_RIGHT else -1
+            self.high_score_mode = (self.high_score_mode + step) % len(GAME_MODE_NAMES)
+            self.sound_manager.play_sound('menu_change')
     
     def _handle_game_input(self, key):
-        if key == pygame.K_UP and self.snake.direction != (0, SNAKE_BLOCK):
-            self.snake.change_direction((0, -SNAKE_BLOCK))
-        elif key == pygame.K_DOWN and self.snake.direction != (0, -SNAKE_BLOCK):
-            self.snake.change_direction((0, SNAKE_BLOCK))
-        elif key == pygame.K_LEFT and self.snake.direction != (SNAKE_BLOCK, 0):
-            self.snake.change_direction((-SNAKE_BLOCK, 0))
-        elif key == pygame.K_RIGHT and self.snake.direction != (-SNAKE_BLOCK, 0):
-            self.snake.change_direction((SNAKE_BLOCK, 0))
+        if key in KEY_DIRECTIONS:
+            self.input_queue.push(KEY_DIRECTIONS[key], self.snake.direction)
         elif key == pygame.K_ESCAPE or key == pygame.K_p:
+            self.input_queue.clear()  # Turns from before the pause would be a surprise after it
             self.game_state = GAME_PAUSED
             self.sound_manager.play_sound('pause')
     
@@ -154,124 +222,257 @@ class GameManager:
     
     def _start_new_game(self):
         self.game_state = GAME_RUNNING
-        self.score = 0
-        self.current_speed = DIFFICULTY_SPEED[self.selected_difficulty]
-        self.frame_counter = 0
-        
-        # Initialize game objects
-        self.snake = Snake(self.texture_manager)
-        self.food = Food(SCREEN_WIDTH, SCREEN_HEIGHT, self.texture_manager)
-        self.obstacle_manager = ObstacleManager(SCREEN_WIDTH, SCREEN_HEIGHT, self.selected_game_mode)
-        
-        # Setup time attack mode
-        if self.selected_game_mode == TIME_ATTACK_MODE:
-            self.time_remaining = TIME_ATTACK_DURATION * 30  # Convert to frames
-        
-        # Spawn initial food
-        self.food.spawn(self.snake.get_all_positions(), self.obstacle_manager.get_obstacle_positions())
+        self.input_queue.clear()
+        self.demo = False
+        self.idle_ticks = 0
+        self.new_high_score = False
+        
+        # The engine owns the rules; we only keep references for drawing
+        cols, rows = self.board_size
+        self.engine = SnakeEngine(cols * SNAKE_BLOCK, rows * SNAKE_BLOCK,
+                                  DIFFICULTY_SPEED[self.selected_difficulty],
+                                  self.selected_game_mode, seed=self.seed)
+        self.seed = None  # Later games get fresh seeds
+        self.replay = Replay.start(self.engine)
+        self._attach_engine()
+    
+    def _attach_engine(self):
+        """Point the drawing code at a freshly started self.engine"""
+        self.camera = Camera(self.screen.get_width(), self.screen.get_height(),
+                             self.engine.width, self.engine.height)
+        self.snake = self.engine.snake
+        self.food = self.engine.food
+        self.obstacle_manager = self.engine.obstacle_manager
+        self.snake.texture_manager = self.texture_manager
+        self.food.texture_manager = self.texture_manager
+        self.particles.clear()
+        self._emit_food_burst(self.food.get_position())
+    
+    def wait_for_assets(self):
+        """Block until the assets are loaded and leave the loading screen"""
+        self.loader.wait()
+        if self.game_state == LOADING and self.network is None:
+            self.game_state = MENU
+    
+    def _handle_network_input(self, key):
+        if key in KEY_DIRECTIONS and self.game_state == GAME_RUNNING and self.network_player:
+            self.network.send({'type': 'input', 'action': ACTION_CODES[KEY_DIRECTIONS[key]]})
+        elif (key == pygame.K_RETURN or key == pygame.K_SPACE) and self.game_state == GAME_OVER:
+            self.network.send({'type': 'restart'})
+        elif key == pygame.K_ESCAPE:
+            self._leave_network()
+    
+    def _leave_network(self, reason=None):
+        if reason:
+            print(reason)
+        self.network.close()
+        self.network = None
+        self.game_state = MENU
+    
+    def _update_network(self):
+        """Mirror the server's game: snapshots start it, tick frames step it"""
+        for message in self.network.messages():
+            if message is None:
+                self._leave_network("Lost the connection to the server")
+                return
+            kind = message.get('type')
+            if kind == 'game':
+                self._start_network_game(message)
+            elif kind == 'tick' and self.engine is not None and not self.awaiting_sync:
+                self._network_tick(message)
+        if self.engine is not None and self.game_state in (GAME_RUNNING, GAME_OVER):
+            self._update_effects()
+    
+    def _start_network_game(self, message):
+        self.replay = Replay.from_dict(message['replay'])
+        self.engine = self.replay.play()  # Catch up with the ticks played before we joined
+        self.network_player = message['player']
+        self.awaiting_sync = False
+        self.selected_game_mode = self.engine.game_mode
+        for difficulty, speed in DIFFICULTY_SPEED.items():
+            if speed == self.engine.speed:
+                self.selected_difficulty = difficulty
+        self.game_state = GAME_OVER if self.engine.game_over else GAME_RUNNING
+        self.input_queue.clear()
+        self.demo = False
+        self.new_high_score = False
+        self._attach_engine()
+        if self.dirty_renderer:
+            self.dirty_renderer.invalidate()
+    
+    def _network_tick(self, message):
+        if message['tick'] <= self.engine.ticks:
+            return  # Already part of the snapshot
+        action = ACTIONS[message['action']]
+        if message['tick'] == self.engine.ticks + 1 and not self.engine.game_over:
+            with self.profiler.span('engine'):
+                self.replay.record(action)
+                events = self.engine.step(action)
+            if self.dirty_renderer:
+                self.dirty_renderer.note_events(events)
+            self._handle_engine_events(events)
+            if (self.engine.score == message['score'] and
+                    list(self.snake.get_head_position()) == message['head']):
+                return
+        # Missed a frame or drifted from the server: ask for a fresh snapshot
+        self.awaiting_sync = True
+        self.network.send({'type': 'sync'})
+    
+    def shutdown(self):
+        """Finish background work before the game exits"""
+        if self.network is not None:
+            self.network.close()
+        self.leaderboard.close()
     
     def _show_about(self):
         # Simple about dialog - could be expanded
         pass
     
     def update(self):
-        if self.game_state == MENU:
+        self.slide = None  # Set again by a move in this tick's events
+        if self.game_state == LOADING and not self.loader.poll():
+            return
+        if self.network is not None:
+            self._update_network()
+        elif self.game_state == LOADING:
+            self.game_state = MENU
+        elif self.game_state == MENU:
             self._update_menu()
         elif self.game_state == GAME_RUNNING:
             self._update_game()
         elif self.game_state == GAME_PAUSED:
             self._update_pause()
+        elif self.game_state == GAME_OVER:
+            self._update_effects()  # Let the death explosion play out
+            if self.demo:
+                self.idle_ticks += 1
+                if self.idle_ticks >= DEMO_RESTART_TICKS:
+                    self.start_demo()
     
     def _update_menu(self):
         self.menu_animation_timer += 1
+        self.idle_ticks += 1
+        if self.idle_ticks >= DEMO_IDLE_TICKS:
+            self.start_demo()
+            return
         # Update background music
         if not self.sound_manager.music_playing:
             self.sound_manager.play_music()
     
+    def _export_trace(self):
+        if not self.profiler.trace:
+            return
+        path = time.strftime('trace_%Y%m%d_%H%M%S.json')
+        count = self.profiler.export_chrome_trace(path)
+        print(f"Wrote {count} trace events to {path}")
+    
     def _update_game(self):
-        # Update frame counter
-        self.frame_counter += 1
-        
-        # Calculate movement threshold based on speed and slowmo
-        base_threshold = max(30 - self.current_speed * 2, 1)
-        if self.snake and self.snake.is_slowmo_active():
-            movement_threshold = base_threshold * 2  # Slow down during slowmo
-        else:
-            movement_threshold = base_threshold
-        
-        # Move snake
-        if self.frame_counter >= movement_threshold:
-            self.snake.move()
-            self.frame_counter = 0
-            
-            # Check collision
-            if self.snake.check_collision(SCREEN_WIDTH, SCREEN_HEIGHT, 
-                                        self.obstacle_manager.get_obstacle_positions()):
-                self._game_over()
-                return
-        
-        # Check food collision
-        if self.snake.get_head_position() == self.food.get_position():
-            self.sound_manager.play_sound('eat')
-            food_type = self.food.get_food_type()
-            
-            # Apply food effects
-            if food_type != NORMAL_FOOD:
-                self.snake.apply_powerup(food_type)
+        input_queue = self.input_queue
+        action = None
+        if self.demo:
+            with self.profiler.span('autopilot'):
+                action = self.autopilot.act(self.engine)
+        elif self.engine.will_move():
+            action = input_queue.pop()  # At most one turn per move
+        self.profiler.count('turns applied', input_queue.applied)
+        self.profiler.count('turns rejected', input_queue.rejected)
+        self.profiler.count('input latency ms', round(input_queue.latency_ms, 1))
+        with self.profiler.span('engine'):
+            self.replay.record(action)
+            events = self.engine.step(action)
+        with self.profiler.span('effects'):
+            self._update_effects()
+        if self.dirty_renderer:
+            self.dirty_renderer.note_events(events)
+        self._handle_engine_events(events)
+    
+    def _update_effects(self):
+        """Advance cosmetic particles by one tick"""
+        self.particles.update()
+        
+        # Food gives off a sparkle now and then
+        position = self.food.get_position()
+        if self.game_state == GAME_RUNNING and position is not None and self.particles.rng.random() < 0.3:
+            center = (position[0] + SNAKE_BLOCK // 2, position[1] + SNAKE_BLOCK // 2)
+            self.particles.emit([center], 1, speed=(0.3, 1.4), life=30, color=FOOD_COLORS[self.food.get_food_type()],
+                                size=4, fade=False, jitter=SNAKE_BLOCK // 2)
+    
+    def _emit_food_burst(self, position):
+        if position is not None:
+            center = (position[0] + SNAKE_BLOCK // 2, position[1] + SNAKE_BLOCK // 2)
+            self.particles.emit([center], 8, speed=(2, 5), life=20, size=3, drag=0.95)
+    
+    def _handle_engine_events(self, events):
+        """Turn engine events into sounds, particles and state changes"""
+        for event in events:
+            if event[0] == EVENT_MOVE:
+                positions = self.snake.positions
+                removed = event[2]
+                self.slide = (positions[1] if len(positions) > 1 else event[1],
+                              removed[0] if len(removed) == 1 else None)
+            elif event[0] == EVENT_FOOD_SPAWN:
+                self._emit_food_burst(event[1])
+            elif event[0] == EVENT_EAT:
+                food_type = event[1]
+                head_x, head_y = self.snake.get_head_position()
+                self.particles.emit([(head_x + SNAKE_BLOCK // 2, head_y + SNAKE_BLOCK // 2)], 6, speed=(1, 2.5),
+                                    life=10, color=YELLOW, size=3, jitter=SNAKE_BLOCK // 2)
+                self.sound_manager.play_sound('eat')
                 if food_type == SPECIAL_FOOD:
                     self.sound_manager.play_sound('special')
                 elif food_type == SUPER_FOOD:
                     self.sound_manager.play_sound('super')
-            
-            # Update score
-            points = self.food.get_points() * self.snake.get_score_multiplier()
-            self.score += points
-            
-            # Grow snake (except for shrink food)
-            if food_type != SHRINK_FOOD:
-                self.snake.grow()
-            
-            # Spawn new food
-            self.food.spawn(self.snake.get_all_positions(), 
-                          self.obstacle_manager.get_obstacle_positions())
-            
-            # Add obstacles occasionally in classic mode
-            if self.selected_game_mode == CLASSIC_MODE and self.score % 100 == 0:
-                self.obstacle_manager.add_random_obstacle(
-                    self.snake.get_all_positions(), 
-                    self.food.get_position()
-                )
-        
-        # Update time attack mode
-        if self.selected_game_mode == TIME_ATTACK_MODE:
-            self.time_remaining -= 1
-            if self.time_remaining <= 0:
-                self._game_over()
-                return
-        
-        # Update game objects
-        self.food.update()
-        self.obstacle_manager.update()
+            elif event[0] == EVENT_GAME_OVER:
+                self._game_over(event[1])
 
     def _update_pause(self):
         # Nothing to update during pause
         pass
 
-    def _game_over(self):
+    def _game_over(self, cause=None):
         self.game_state = GAME_OVER
-        self.sound_manager.play_sound('crash')
+        self.sound_manager.play_sound('super' if cause == BOARD_FULL else 'crash')
 
-        # Update and save high score
-        if self.score > self.highscore.scores.get(self.selected_difficulty, 0):
-            self.highscore.scores[self.selected_difficulty] = self.score
-            self.highscore.save_scores()
+        # Queue the score for the leaderboard, keeping the replay of every high score for
+        # auditing (autopilot demo games don't count)
+        self.replay.finish(self.engine)
+        if not self.demo and self.network is None:
+            # Replays are written on the leaderboard's writer thread, never in the frame
+            self.leaderboard.save_replay(self.replay, LAST_REPLAY_FILE)
+            self.new_high_score = self.leaderboard.submit(
+                self.selected_game_mode, self.selected_difficulty, self.engine.score,
+                len(self.snake.get_all_positions()), self.engine.ticks, self.engine.seed)
+            if self.new_high_score:
+                self.leaderboard.save_replay(self.replay, self.leaderboard.high_score_replay_path(
+                    self.selected_game_mode, self.selected_difficulty))
 
-        # Start death animation
-        if self.snake:
+        # Start death animation, with an explosion along (a sample of) the body
+        if self.snake and cause != BOARD_FULL:
             self.snake.start_death_animation()
+            positions = list(self.snake.get_all_positions())
+            step = max(1, len(positions) // 256)
+            centers = [(x + SNAKE_BLOCK // 2, y + SNAKE_BLOCK // 2) for x, y in positions[::step]]
+            self.particles.emit(centers, 3, speed=(0.5, 2), life=30, color=YELLOW, size=4, drag=0.9, jitter=10)
     
-    def draw(self):
-        if self.game_state == MENU:
+    def draw(self, alpha=1.0):
+        """Draw the current state; returns the changed rects, or None if the whole screen changed.
+        
+        alpha is how far we are between the last tick and the next one (0..1).
+        Rendering faster than TICK_RATE, the snake's last move, the camera
+        following it and the particles are drawn that far along, so motion is
+        smooth at any frame rate instead of stepping at the tick rate.
+        """
+        self.render_alpha = alpha
+        if self.camera is not None:
+            self.camera.follow(self.snake.interpolated_head(self.snake_interpolation()))
+        if self.dirty_renderer:
+            if self.game_state == GAME_RUNNING:
+                return self.dirty_renderer.draw(self)
+            self.dirty_renderer.invalidate()
+        
+        if self.game_state == LOADING:
+            self._draw_loading()
+        elif self.game_state == MENU:
             self._draw_menu()
         elif self.game_state == GAME_MODE_SELECT:
             self._draw_game_mode_select()
@@ -285,12 +486,42 @@ class GameManager:
             self._draw_pause()
         elif self.game_state == GAME_OVER:
             self._draw_game_over()
+        return None
+    
+    def draw_profiler(self, dirty_rects=None):
+        """Draw the frame-time overlay on top of the frame, adding its area to dirty_rects"""
+        overlay_rect = self.profiler.draw(self.screen, self.text_cache)
+        if overlay_rect is None:
+            return
+        if dirty_rects is not None:
+            dirty_rects.append(overlay_rect)
+        if self.dirty_renderer and self.game_state == GAME_RUNNING:
+            # Restore the game underneath before the overlay is drawn again
+            self.dirty_renderer.previous_rects.append(overlay_rect)
+    
+    def _draw_loading(self):
+        self.screen.fill(BLACK)
+        self._draw_text("PIXEL SNAKE", 72, SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 - 80, YELLOW)
+        
+        # Progress bar
+        bar = pygame.Rect(0, 0, SCREEN_WIDTH // 2, 20)
+        bar.center = (SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 + 10)
+        filled = bar.copy()
+        filled.width = int(bar.width * self.loader.progress)
+        pygame.draw.rect(self.screen, GREEN, filled)
+        pygame.draw.rect(self.screen, WHITE, bar, 2)
+        
+        current = self.loader.current
+        label = f"Loading {current.split('.')[0]}..." if current else "Loading..."
+        if self.loader.finished:
+            label = "Waiting for the server..."
+        self._draw_text(label, 24, SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 + 50, GRAY)
     
     def _draw_menu(self):
         self.screen.fill(BLACK)
         
         # Draw animated title
-        title_y = 100 + math.sin(self.menu_animation_timer * 0.1) * 10
+        title_y = 100 + math.sin((self.menu_animation_timer + self.render_alpha) * 0.1) * 10
         self._draw_text("PIXEL SNAKE", 72, SCREEN_WIDTH // 2, int(title_y), YELLOW)
         
         # Draw menu options
@@ -318,12 +549,6 @@ class GameManager:
         
         self._draw_text("SELECT GAME MODE", 48, SCREEN_WIDTH // 2, 100, YELLOW)
         
-        game_modes = [
-            "Classic Mode",
-            "Time Attack", 
-            "Challenge Mode"
-        ]
-        
         descriptions = [
             "Traditional snake game with growing obstacles",
             "Score as much as possible in 2 minutes",
@@ -331,7 +556,7 @@ class GameManager:
         ]
         
         start_y = 200
-        for i, (mode, desc) in enumerate(zip(game_modes, descriptions)):
+        for i, (mode, desc) in enumerate(zip(GAME_MODE_NAMES, descriptions)):
             color = WHITE if i == self.selected_game_mode else GRAY
             if i == self.selected_game_mode:
                 self._draw_text(">", 36, SCREEN_WIDTH // 2 - 150, start_y + i * 80, YELLOW)
@@ -366,31 +591,79 @@ class GameManager:
         
         self._draw_text("HIGH SCORES", 48, SCREEN_WIDTH // 2, 100, YELLOW)
         
-        difficulties = ["EASY", "MEDIUM", "HARD"]
+        self._draw_text(f"< {GAME_MODE_NAMES[self.high_score_mode]} >", 32, SCREEN_WIDTH // 2, 160, WHITE)
+        
+        # One column per difficulty with its best games, queried when first shown
+        difficulties = ["easy", "medium", "hard"]
         colors = [GREEN, YELLOW, RED]
         
-        start_y = 200
-        for i, (diff_name, diff_value, color) in enumerate(zip(difficulties, [EASY, MEDIUM, HARD], colors)):
-            score = self.highscore.get_high_score(diff_value)
-            self._draw_text(f"{diff_name}: {score}", 32, SCREEN_WIDTH // 2, start_y + i * 60, color)
+        for i, (difficulty, color) in enumerate(zip(difficulties, colors)):
+            x = SCREEN_WIDTH // 2 + (i - 1) * 220
+            self._draw_text(difficulty.upper(), 32, x, 220, color)
+            rows = self.leaderboard.top(self.high_score_mode, difficulty)
+            for rank, (score, *_) in enumerate(rows):
+                self._draw_text(f"{rank + 1}. {score}", 28, x, 265 + rank * 35, WHITE)
+            if not rows:
+                self._draw_text("-", 28, x, 265, GRAY)
         
-        self._draw_text("Press ESC or ENTER to go back", 24, SCREEN_WIDTH // 2, 450, WHITE)
+        self._draw_text("LEFT/RIGHT to change mode, ESC or ENTER to go back", 24, SCREEN_WIDTH // 2, 500, WHITE)
+    
+    def snake_interpolation(self):
+        """(head before, tail cell left, alpha) while drawing between a move tick and the next tick"""
+        if self.slide is None or self.game_state != GAME_RUNNING:
+            return None
+        return self.slide + (self.render_alpha,)
+    
+    def particle_alpha(self):
+        """How far along their velocity to draw particles: only while ticks advance them"""
+        return self.render_alpha if self.game_state in (GAME_RUNNING, GAME_OVER) else 0.0
     
     def _draw_game(self):
+        profiler = self.profiler
+        
         # Draw background
-        self.texture_manager.draw_background(self.screen)
+        with profiler.span('background'):
+            self.texture_manager.draw_background(self.screen, self.camera)
+            self._draw_board_edges()
         
         # Draw obstacles
-        self.obstacle_manager.draw(self.screen, self.texture_manager)
+        with profiler.span('obstacles'):
+            self.obstacle_manager.draw(self.screen, self.texture_manager, self.camera)
         
         # Draw food
-        self.food.draw(self.screen)
+        with profiler.span('food'):
+            self.food.draw(self.screen, self.camera)
         
         # Draw snake
-        self.snake.draw(self.screen)
+        with profiler.span('snake'):
+            # Dirty-rect mode only redraws changed regions, so the body must not shimmer elsewhere
+            self.snake.draw(self.screen, self.camera, self.snake_interpolation(), wobble=self.dirty_renderer is None)
+        
+        # Draw particles
+        with profiler.span('particles'):
+            self.particles.draw(self.screen, self.camera, self.particle_alpha())
+        profiler.count('particles', len(self.particles))
         
         # Draw UI
-        self._draw_game_ui()
+        with profiler.span('ui'):
+            return self._draw_game_ui()
+    
+    def _draw_board_edges(self):
+        """Black out the window outside a board that doesn't fill it and outline the board"""
+        screen_rect = self.screen.get_rect()
+        board = pygame.Rect(self.camera.to_screen((0, 0)), (self.engine.width, self.engine.height))
+        if board.contains(screen_rect):
+            return
+        outside = [
+            pygame.Rect(0, 0, screen_rect.width, board.top),
+            pygame.Rect(0, board.bottom, screen_rect.width, screen_rect.height - board.bottom),
+            pygame.Rect(0, board.top, board.left, board.height),
+            pygame.Rect(board.right, board.top, screen_rect.width - board.right, board.height),
+        ]
+        for rect in outside:
+            if rect.width > 0 and rect.height > 0:
+                self.screen.fill(BLACK, rect)
+        pygame.draw.rect(self.screen, GRAY, board.inflate(2, 2), 1)
     
     def _draw_pause(self):
         # Draw game state with overlay
@@ -422,12 +695,15 @@ class GameManager:
         self.screen.blit(overlay, (0, 0))
         
         # Draw game over text
-        self._draw_text("GAME OVER", 72, SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 - 100, RED)
-        self._draw_text(f"Final Score: {self.score}", 48, SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 - 40, WHITE)
+        if self.engine.won:
+            self._draw_text("BOARD CLEARED!", 72, SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 - 100, GOLD)
+        else:
+            self._draw_text("GAME OVER", 72, SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 - 100, RED)
+        self._draw_text(f"Final Score: {self.engine.score}", 48, SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 - 40, WHITE)
         
         # Show high score if achieved
-        high_score = self.highscore.get_high_score(self.selected_difficulty)
-        if self.score >= high_score:
+        high_score = self.leaderboard.best(self.selected_game_mode, self.selected_difficulty)
+        if self.new_high_score:
             self._draw_text("NEW HIGH SCORE!", 36, SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 + 10, GOLD)
         else:
             self._draw_text(f"High Score: {high_score}", 32, SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 + 10, GRAY)
@@ -436,42 +712,50 @@ class GameManager:
         self._draw_text("Press ESC for main menu", 32, SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 + 100, WHITE)
     
     def _draw_game_ui(self):
+        """Draw the HUD and return the rects it covered"""
+        rects = []
+        
         # Draw score
-        self._draw_text(f"Score: {self.score}", 32, 100, 30, WHITE)
+        rects.append(self._draw_text(f"Score: {self.engine.score}", 32, 100, 30, WHITE))
+        if self.demo:
+            rects.append(self._draw_text("DEMO - press any key", 28, SCREEN_WIDTH // 2, 30, YELLOW))
+        elif self.network is not None and not self.network_player:
+            rects.append(self._draw_text("WATCHING - ESC to leave", 28, SCREEN_WIDTH // 2, 30, YELLOW))
         
         # Draw multiplier if active
         if self.snake.get_score_multiplier() > 1:
-            self._draw_text(f"Multiplier: x{self.snake.get_score_multiplier()}", 24, 100, 65, GOLD)
+            rects.append(self._draw_text(f"Multiplier: x{self.snake.get_score_multiplier()}", 24, 100, 65, GOLD))
         
         # Draw active power-ups
         power_up_y = 100
         if self.snake.boost_timer > 0:
-            self._draw_text("SPEED BOOST", 20, 100, power_up_y, PURPLE)
+            rects.append(self._draw_text("SPEED BOOST", 20, 100, power_up_y, PURPLE))
             power_up_y += 25
         
         if self.snake.is_ghost_mode():
-            self._draw_text("GHOST MODE", 20, 100, power_up_y, (200, 200, 255))
+            rects.append(self._draw_text("GHOST MODE", 20, 100, power_up_y, (200, 200, 255)))
             power_up_y += 25
         
         if self.snake.is_slowmo_active():
-            self._draw_text("SLOW MOTION", 20, 100, power_up_y, (0, 255, 255))
+            rects.append(self._draw_text("SLOW MOTION", 20, 100, power_up_y, (0, 255, 255)))
             power_up_y += 25
         
         if self.snake.double_score_timer > 0:
-            self._draw_text("DOUBLE SCORE", 20, 100, power_up_y, (255, 215, 0))
+            rects.append(self._draw_text("DOUBLE SCORE", 20, 100, power_up_y, (255, 215, 0)))
             power_up_y += 25
         
         # Draw time remaining for time attack
         if self.selected_game_mode == TIME_ATTACK_MODE:
-            time_seconds = self.time_remaining // 30
+            time_seconds = self.engine.time_remaining // TICK_RATE
             minutes = time_seconds // 60
             seconds = time_seconds % 60
             time_color = RED if time_seconds < 30 else WHITE
-            self._draw_text(f"Time: {minutes:02d}:{seconds:02d}", 32, SCREEN_WIDTH - 120, 30, time_color)
+            rects.append(self._draw_text(f"Time: {minutes:02d}:{seconds:02d}", 32, SCREEN_WIDTH - 120, 30, time_color))
+        return rects
     
     def _draw_text(self, text, size, x, y, color=WHITE):
-        font = pygame.font.SysFont(None, size)
-        text_surface = font.render(text, True, color)
+        text_surface = self.text_cache.render(text, size, color)
         text_rect = text_surface.get_rect()
         text_rect.center = (x, y)
         self.screen.blit(text_surface, text_rect)
+        return text_rect
@@ -0,0 +1,61 @@
+import time
+from constants import *
+
+INPUT_QUEUE_SIZE = 3  # Turns held ahead of the snake; a longer buffer starts to feel like lag
+
+class InputQueue:
+    """Ring buffer of turns waiting for the snake's next moves.
+
+    The snake turns at most once per move, but keys arrive whenever they are
+    pressed, so two quick turns (UP then LEFT) can land between two moves.
+    push() keeps each turn with the time it was pressed and the game pops
+    one per move, so neither is lost. A turn that repeats or reverses the
+    direction the snake will have when it comes up is dropped on push, as
+    is any turn once the buffer is full.
+
+    applied and rejected count turns over the whole run, and latency_ms is
+    the smoothed time from key press to the move that applied it.
+    """
+
+    def __init__(self, size=INPUT_QUEUE_SIZE):
+        self.size = size
+        self.directions = [None] * size
+        self.times = [0.0] * size
+        self.start = 0
+        self.length = 0
+        self.applied = 0
+        self.rejected = 0
+        self.latency_ms = 0.0
+
+    def __len__(self):
+        return self.length
+
+    def clear(self):
+        self.start = 0
+        self.length = 0
+
+    def push(self, direction, current, now=None):
+        """Queue a turn after `current`, the direction the snake moves in; returns whether it was kept"""
+        previous = self.directions[(self.start + self.length - 1) % self.size] if self.length else current
+        if direction == previous:
+            return False
+        if self.length == self.size or (-direction[0], -direction[1]) == previous:
+            self.rejected += 1
+            return False
+        index = (self.start + self.length) % self.size
+        self.directions[index] = direction
+        self.times[index] = time.perf_counter() if now is None else now
+        self.length += 1
+        return True
+
+    def pop(self, now=None):
+        """The oldest turn, or None if there is none"""
+        if not self.length:
+            return None
+        direction = self.directions[self.start]
+        latency = ((time.perf_counter() if now is None else now) - self.times[self.start]) * 1000
+        self.start = (self.start + 1) % self.size
+        self.length -= 1
+        self.applied += 1
+        self.latency_ms = latency if self.applied == 1 else self.latency_ms * 0.8 + latency * 0.2
+        return direction
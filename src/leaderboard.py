@@ -0,0 +1,184 @@
+import os
+import time
+import queue
+import sqlite3
+import threading
+from functools import partial
+from constants import *
+from replay import save_replay_data
+
+SCHEMA_VERSION = 1
+DIFFICULTY_NAMES = ('easy', 'medium', 'hard')
+MODE_NAMES = ('classic', 'time_attack', 'challenge')  # By game mode, for file names
+
+class Leaderboard:
+    """Every finished game's score, kept in SQLite and written off the main thread.
+
+    submit() only queues the row; a background thread inserts it in its own
+    transaction, so a crash can lose at most that game and never corrupts
+    the scores already stored (the database runs in WAL mode). The same
+    thread writes replay files queued with save_replay().
+
+    The main thread never waits for a write. The writer loads the best score
+    per mode and difficulty when it opens the database, and submit() keeps
+    them up to date in memory. The top list is queried through an index on
+    (mode, difficulty, score) when the high scores screen asks for it and is
+    merged with the games still waiting to be written. start() opens the
+    database in the background; otherwise the first call does. Scores from
+    the old highscores.txt are imported the first time the database is
+    created.
+    """
+
+    def __init__(self, path=LEADERBOARD_FILE, legacy_path=HIGHSCORE_FILE, size=LEADERBOARD_SIZE):
+        self.path = path
+        self.legacy_path = legacy_path
+        self.size = size
+        self.pending = queue.Queue()
+        self.ready = threading.Event()  # Set once the writer has created the schema and loaded the bests
+        self.unsaved = []  # Submitted rows the writer has not committed yet
+        self.writer = None
+        self.connection = None  # Reader connection, main thread only
+        self.best_scores = {}   # (mode, difficulty) -> best score
+        self.top_scores = {}    # (mode, difficulty) -> top rows, loaded on demand
+
+    def start(self):
+        """Open the database and load the best scores on the writer thread"""
+        if self.writer is None:
+            self.writer = threading.Thread(target=self._write_loop, name='leaderboard-writer', daemon=True)
+            self.writer.start()
+
+    def _write_loop(self):
+        connection = None
+        try:
+            connection = sqlite3.connect(self.path)
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=NORMAL')
+            self._create_schema(connection)
+            for mode, difficulty, score in connection.execute(
+                    'SELECT mode, difficulty, MAX(score) FROM scores GROUP BY mode, difficulty'):
+                self.best_scores[(mode, difficulty)] = score
+        except (sqlite3.Error, OSError) as e:
+            print(f"Error opening leaderboard: {e}")
+            connection = None
+        finally:
+            self.ready.set()
+
+        while True:
+            job = self.pending.get()
+            if job is None:
+                break
+            job(connection)
+        if connection is not None:
+            connection.close()
+
+    def _insert(self, row, connection):
+        try:
+            if connection is not None:
+                with connection:  # One transaction per game
+                    connection.execute(
+                        'INSERT INTO scores (mode, difficulty, score, length, ticks, seed, played_at) '
+                        'VALUES (?, ?, ?, ?, ?, ?, ?)', row)
+        except sqlite3.Error as e:
+            print(f"Error saving score: {e}")
+        finally:
+            self.unsaved.remove(row)  # Only once committed, so top() always sees it in one place or both
+
+    def _write_replay(self, data, path, connection):
+        try:
+            save_replay_data(data, path)
+        except OSError as e:
+            print(f"Error saving replay: {e}")
+
+    def _create_schema(self, connection):
+        if connection.execute('PRAGMA user_version').fetchone()[0] >= SCHEMA_VERSION:
+            return
+        with connection:
+            connection.execute('CREATE TABLE IF NOT EXISTS scores ('
+                               'id INTEGER PRIMARY KEY, mode INTEGER NOT NULL, difficulty TEXT NOT NULL, '
+                               'score INTEGER NOT NULL, length INTEGER, ticks INTEGER, seed INTEGER, '
+                               'played_at REAL NOT NULL)')
+            connection.execute('CREATE INDEX IF NOT EXISTS scores_top ON scores (mode, difficulty, score DESC)')
+            connection.executemany(
+                'INSERT INTO scores (mode, difficulty, score, played_at) VALUES (?, ?, ?, ?)',
+                self._legacy_scores())
+            connection.execute(f'PRAGMA user_version = {SCHEMA_VERSION}')
+
+    def _legacy_scores(self):
+        """Rows for the scores in highscores.txt, which only knew classic mode"""
+        rows = []
+        try:
+            if os.path.exists(self.legacy_path):
+                played_at = os.path.getmtime(self.legacy_path)
+                with open(self.legacy_path) as file:
+                    for line in file:
+                        difficulty, _, score = line.strip().partition(':')
+                        if difficulty in DIFFICULTY_NAMES and score.isdigit() and int(score) > 0:
+                            rows.append((CLASSIC_MODE, difficulty, int(score), played_at))
+        except OSError as e:
+            print(f"Error importing high scores: {e}")
+        return rows
+
+    def _query(self, sql, parameters):
+        """Run a read on the main thread's connection; returns [] if the database is unavailable"""
+        self.start()
+        self.ready.wait()
+        try:
+            if self.connection is None:
+                self.connection = sqlite3.connect(self.path)
+            return self.connection.execute(sql, parameters).fetchall()
+        except sqlite3.Error as e:
+            print(f"Error reading leaderboard: {e}")
+            return []
+
+    def best(self, mode, difficulty):
+        """Best score so far for this mode and difficulty (0 if none)"""
+        self.start()
+        self.ready.wait()  # Only waits if asked before the writer has opened the database
+        return self.best_scores.get((mode, difficulty), 0)
+
+    def top(self, mode, difficulty):
+        """The best `size` games as (score, length, ticks, played_at) rows, best first"""
+        key = (mode, difficulty)
+        if key not in self.top_scores:
+            unsaved = list(self.unsaved)  # Taken before the query: rows only leave it once committed
+            rows = self._query(
+                'SELECT score, length, ticks, played_at FROM scores WHERE mode = ? AND difficulty = ? '
+                'ORDER BY score DESC LIMIT ?', key + (self.size,))
+            stored = {row[3] for row in rows}
+            rows += [(score, length, ticks, played_at)
+                     for row_mode, row_difficulty, score, length, ticks, seed, played_at in unsaved
+                     if (row_mode, row_difficulty) == key and played_at not in stored]
+            rows.sort(key=lambda row: row[0], reverse=True)
+            self.top_scores[key] = rows[:self.size]
+        return self.top_scores[key]
+
+    def submit(self, mode, difficulty, score, length=None, ticks=None, seed=None):
+        """Queue a finished game for saving; returns True if it beat the best score"""
+        key = (mode, difficulty)
+        new_best = score > self.best(mode, difficulty)
+        if new_best:
+            self.best_scores[key] = score
+        self.top_scores.pop(key, None)
+        row = (mode, difficulty, score, length, ticks, seed, time.time())
+        self.unsaved.append(row)
+        self.pending.put(partial(self._insert, row))
+        return new_best
+
+    def save_replay(self, replay, path):
+        """Queue a replay to be written to path on the writer thread"""
+        self.start()
+        self.pending.put(partial(self._write_replay, replay.to_dict(), path))
+
+    def high_score_replay_path(self, mode, difficulty):
+        """Where the replay of the best game per mode and difficulty is kept"""
+        return os.path.join(REPLAY_DIR, f"highscore_{MODE_NAMES[mode]}_{difficulty}.json")
+
+    def close(self):
+        """Finish the queued writes and stop the writer thread"""
+        if self.writer is not None:
+            self.pending.put(None)
+            self.writer.join(timeout=5)
+            self.writer = None
+        if self.connection is not None:
+            self.connection.close()
+            self.connection = None
@@ -0,0 +1,102 @@
+import threading
+
+class AssetLoader:
+    """Runs asset loading jobs in dependency order, optionally on a worker thread.
+
+    Jobs are plain callables registered with add(); a job runs only after the
+    jobs named in `after` have finished, and if one of those failed it is
+    skipped too. Work that must happen on the main thread (converting
+    surfaces to the display format) is registered with on_main() and runs
+    from poll() once every job is done, so the main loop can keep drawing a
+    progress bar in the meantime. run() does everything in the calling
+    thread instead.
+    """
+
+    def __init__(self):
+        self.jobs = {}         # name -> (function, dependencies, weight)
+        self.finalizers = []   # Main thread work, in registration order
+        self.failed = set()
+        self.completed_weight = 0
+        self.total_weight = 0
+        self.current = None    # Name of the job running now, for the progress screen
+        self.worker = None
+        self.jobs_done = False  # Set by the job runner when the last job returned
+        self.finished = False   # Set once the main thread work ran too
+
+    def add(self, name, function, after=(), weight=1):
+        """Register a job; weight is its rough share of the loading time"""
+        if name in self.jobs:
+            raise ValueError(f"duplicate asset job '{name}'")
+        self.jobs[name] = (function, tuple(after), weight)
+        self.total_weight += weight
+
+    def on_main(self, function):
+        self.finalizers.append(function)
+
+    def _order(self):
+        """Job names so that every job comes after its dependencies"""
+        order, state = [], {}
+        def visit(name, path):
+            if state.get(name) == 'done':
+                return
+            if state.get(name) == 'visiting':
+                raise ValueError(f"asset jobs depend on each other: {' -> '.join(path + [name])}")
+            if name not in self.jobs:
+                raise ValueError(f"unknown asset job '{name}' needed by '{path[-1]}'")
+            state[name] = 'visiting'
+            for dependency in self.jobs[name][1]:
+                visit(dependency, path + [name])
+            state[name] = 'done'
+            order.append(name)
+        for name in self.jobs:
+            visit(name, [])
+        return order
+
+    def _run_jobs(self, order):
+        for name in order:
+            function, dependencies, weight = self.jobs[name]
+            self.current = name
+            if self.failed.intersection(dependencies):
+                self.failed.add(name)
+            else:
+                try:
+                    function()
+                except Exception as e:
+                    print(f"Error loading {name}: {e}")
+                    self.failed.add(name)
+            self.completed_weight += weight
+        self.current = None
+        self.jobs_done = True
+
+    def start(self):
+        """Start loading on a worker thread; call poll() every frame until it returns True"""
+        order = self._order()  # Raise about bad dependencies here, not in the thread
+        self.worker = threading.Thread(target=self._run_jobs, args=(order,), name='asset-loader', daemon=True)
+        self.worker.start()
+
+    @property
+    def progress(self):
+        """Fraction of the work done, 0..1"""
+        return self.completed_weight / self.total_weight if self.total_weight else 1.0
+
+    def poll(self):
+        """Run the main thread work once the jobs are done; returns whether loading finished"""
+        if self.finished:
+            return True
+        if not self.jobs_done:
+            return False
+        for finalize in self.finalizers:
+            finalize()
+        self.finished = True
+        return True
+
+    def wait(self):
+        """Block until everything is loaded"""
+        if self.worker is not None:
+            self.worker.join()
+        self.poll()
+
+    def run(self):
+        """Load everything in the calling thread"""
+        self._run_jobs(self._order())
+        self.poll()
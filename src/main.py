@@ -1,9 +1,71 @@
 import pygame
 import sys
+import argparse
 from game_manager import GameManager
+from timestep import FixedTimestep
+from profiler import FrameProfiler
+from net_client import NetClient
+from recorder import FrameRecorder, GIF_FPS
+import protocol
 from constants import *
 
+def board_size(text):
+    """Parse a board size like '100x80' (columns x rows)"""
+    try:
+        cols, rows = (int(part) for part in text.lower().split('x'))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected COLSxROWS, got '{text}'")
+    if cols < 10 or rows < 10:
+        raise argparse.ArgumentTypeError('the board must be at least 10x10 cells')
+    return cols, rows
+
+def server_address(text):
+    """Parse HOST or HOST:PORT"""
+    host, _, port = text.rpartition(':') if ':' in text else (text, '', '')
+    try:
+        return host, int(port) if port else protocol.DEFAULT_PORT
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected HOST[:PORT], got '{text}'")
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Pixel Snake Game - Enhanced Edition')
+    parser.add_argument('--dirty-rects', action='store_true',
+                        help='only redraw and update the screen regions that changed')
+    parser.add_argument('--fps', type=int, default=RENDER_FPS,
+                        help=f'render frame cap, e.g. {", ".join(map(str, RENDER_FPS_OPTIONS))} '
+                             f'(0 = uncapped); game speed stays at {TICK_RATE} ticks per second')
+    parser.add_argument('--board', type=board_size, default=(BOARD_COLS, BOARD_ROWS), metavar='COLSxROWS',
+                        help=f'board size in cells (default {BOARD_COLS}x{BOARD_ROWS}); '
+                             'larger boards scroll to follow the snake')
+    parser.add_argument('--profile', action='store_true',
+                        help='start with the frame-time overlay shown (toggle with F3, export a trace with F4)')
+    parser.add_argument('--trace', metavar='FILE',
+                        help='write a Chrome trace of the last recorded frames to FILE on exit')
+    parser.add_argument('--demo', action='store_true',
+                        help='start straight into the autopilot demo (it also starts after 20 idle seconds)')
+    parser.add_argument('--seed', type=int,
+                        help='random seed of the first game, e.g. the seed of a recorded replay')
+    parser.add_argument('--connect', type=server_address, metavar='HOST[:PORT]',
+                        help='play online in a room of a snake server (see server.py)')
+    parser.add_argument('--room', default='lobby', help='room to join with --connect')
+    parser.add_argument('--spectate', action='store_true', help='only watch the room\'s game')
+    parser.add_argument('--record', metavar='PATH',
+                        help='record the screen to a .gif, a video (.mp4 etc., needs ffmpeg) '
+                             'or a directory of PNG frames')
+    parser.add_argument('--record-fps', type=int, metavar='N',
+                        help=f'frames per second to record (default {RENDER_FPS}, {GIF_FPS} for GIFs)')
+    return parser.parse_args(argv)
+
 def main():
+    args = parse_args()
+    network = None
+    if args.connect:
+        try:
+            network = NetClient(*args.connect, room=args.room, spectate=args.spectate)
+        except (OSError, ValueError) as e:
+            print(f"Cannot connect to {args.connect[0]}:{args.connect[1]}: {e}")
+            sys.exit(1)
+    
     # Initialize Pygame
     pygame.init()
     screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
@@ -11,28 +73,58 @@ def main():
     clock = pygame.time.Clock()
     
     # Initialize game manager
-    game_manager = GameManager(screen, clock)
+    profiler = FrameProfiler(enabled=args.profile or bool(args.trace),
+                             budget_ms=1000 / (args.fps or RENDER_FPS))
+    game_manager = GameManager(screen, clock, dirty_rects=args.dirty_rects, profiler=profiler,
+                               board_size=args.board, seed=args.seed, network=network)
+    if args.demo:
+        game_manager.start_demo()
+    recorder = FrameRecorder(args.record, screen, fps=args.record_fps) if args.record else None
     
-    # Main game loop
+    # Main game loop: rules run at a fixed TICK_RATE, rendering at up to args.fps
+    timestep = FixedTimestep()
+    text_misses = 0
     running = True
     while running:
+        profiler.begin_frame()
+        
         # Handle events
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                running = False
-            else:
-                game_manager.handle_event(event)
+        with profiler.span('events'):
+            for event in pygame.event.get():
+                if event.type == pygame.QUIT:
+                    running = False
+                else:
+                    game_manager.handle_event(event)
         
-        # Update game
-        game_manager.update()
+        # Update game, once per elapsed tick
+        with profiler.span('update'):
+            for _ in range(timestep.advance()):
+                game_manager.update()
         
         # Draw everything
-        game_manager.draw()
+        with profiler.span('draw'):
+            dirty_rects = game_manager.draw(timestep.alpha)
+        profiler.count('text renders', game_manager.text_cache.misses - text_misses)
+        text_misses = game_manager.text_cache.misses
+        game_manager.draw_profiler(dirty_rects)
         
         # Update display
-        pygame.display.flip()
-        clock.tick(30)  # 30 FPS
+        with profiler.span('flip'):
+            if dirty_rects is None:
+                pygame.display.flip()
+            else:
+                pygame.display.update(dirty_rects)
+        if recorder:
+            with profiler.span('record'):
+                recorder.capture(screen)
+            profiler.count('frames dropped', recorder.dropped)
+        clock.tick(args.fps)
     
+    if args.trace:
+        profiler.export_chrome_trace(args.trace)
+    if recorder:
+        recorder.close()
+    game_manager.shutdown()
     pygame.quit()
     sys.exit()
 
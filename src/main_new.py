@@ -33,6 +33,7 @@ def main():
         pygame.display.flip()
         clock.tick(30)  # 30 FPS
     
+    game_manager.shutdown()
     pygame.quit()
     sys.exit()
 
@@ -0,0 +1,67 @@
+import queue
+import socket
+import threading
+import protocol
+
+class NetClient:
+    """Blocking connection to a snake server, read on a background thread.
+
+    The main loop never waits on the network: messages pile up in a queue
+    that messages() drains once per tick, and sends are small writes.
+    """
+
+    def __init__(self, host, port=protocol.DEFAULT_PORT, room='lobby', spectate=False, difficulty='medium',
+                 mode='classic', timeout=5):
+        join = {'type': 'join', 'room': room, 'spectate': spectate, 'difficulty': difficulty, 'mode': mode}
+        self.host = host
+        self.inbox = queue.Queue()
+        self.closed = False
+        while True:
+            self.sock = socket.create_connection((host, port), timeout=timeout)
+            self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            self.send(join)
+            message = protocol.recv_message(self.sock)
+            if message is None:
+                raise ConnectionError(f"{host}:{port} closed the connection")
+            if message.get('type') != 'redirect':
+                break
+            # The room lives on another shard
+            self.sock.close()
+            port = message['port']
+        self.port = port
+        self.sock.settimeout(None)
+        self.inbox.put(message)
+        self.reader = threading.Thread(target=self._read_loop, name='net-client', daemon=True)
+        self.reader.start()
+
+    def _read_loop(self):
+        try:
+            while True:
+                message = protocol.recv_message(self.sock)
+                if message is None:
+                    break
+                self.inbox.put(message)
+        except (OSError, ValueError):
+            pass
+        self.inbox.put(None)  # Tells the game the connection is gone
+
+    def messages(self):
+        """Every message received since the last call; None marks a lost connection"""
+        while True:
+            try:
+                yield self.inbox.get_nowait()
+            except queue.Empty:
+                return
+
+    def send(self, message):
+        if self.closed:
+            return
+        try:
+            self.sock.sendall(protocol.encode(message))
+        except OSError:
+            self.close()
+
+    def close(self):
+        if not self.closed:
+            self.closed = True
+            self.sock.close()
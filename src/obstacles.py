@@ -1,14 +1,16 @@
-import pygame
 import random
 import math
 from constants import *
 
+# pygame is only imported by the drawing code, so the rules (SnakeEngine) run without it
+
 class Obstacle:
-    def __init__(self, x, y, obstacle_type="static"):
+    def __init__(self, x, y, obstacle_type="static", rng=random):
         self.x = x
         self.y = y
         self.type = obstacle_type  # "static" or "moving"
-        self.direction = random.choice([(0, 1), (0, -1), (1, 0), (-1, 0)]) if obstacle_type == "moving" else (0, 0)
+        self.rng = rng  # Gameplay randomness, shared with the manager
+        self.direction = rng.choice([(0, 1), (0, -1), (1, 0), (-1, 0)]) if obstacle_type == "moving" else (0, 0)
         self.move_counter = 0
         self.move_delay = 60  # Move every 2 seconds at 30 FPS
         self.animation_frame = 0
@@ -26,7 +28,7 @@ class Obstacle:
                 # Check boundaries and change direction if needed
                 if new_x < 0 or new_x >= screen_width or new_y < 0 or new_y >= screen_height:
                     # Change direction
-                    self.direction = random.choice([(0, 1), (0, -1), (1, 0), (-1, 0)])
+                    self.direction = self.rng.choice([(0, 1), (0, -1), (1, 0), (-1, 0)])
                 else:
                     self.x = new_x
                     self.y = new_y
@@ -37,13 +39,16 @@ class Obstacle:
     def get_position(self):
         return (self.x, self.y)
     
-    def draw(self, screen, texture_manager=None):
+    def draw(self, screen, texture_manager=None, offset=(0, 0)):
+        import pygame
         use_textures = texture_manager and texture_manager.use_textures
+        x = self.x + offset[0]
+        y = self.y + offset[1]
         
         if use_textures:
-            # Use textured obstacle
-            obstacle_surface = self._create_obstacle_texture()
-            screen.blit(obstacle_surface, (self.x, self.y))
+            # Use textured obstacle, pre-rendered in the shared sprite sheet
+            sheet, areas = get_obstacle_sprite_sheet()
+            screen.blit(sheet, (x, y), areas[self.type][self.animation_frame])
         else:
             # Simple colored rectangle
             color = (100, 100, 100) if self.type == "static" else (150, 100, 50)
@@ -53,68 +58,103 @@ class Obstacle:
                 pulse = abs(math.sin(self.animation_frame * 0.2)) * 50
                 color = (min(255, color[0] + pulse), color[1], color[2])
             
-            pygame.draw.rect(screen, color, (self.x, self.y, OBSTACLE_SIZE, OBSTACLE_SIZE))
-            pygame.draw.rect(screen, WHITE, (self.x, self.y, OBSTACLE_SIZE, OBSTACLE_SIZE), 2)
+            pygame.draw.rect(screen, color, (x, y, OBSTACLE_SIZE, OBSTACLE_SIZE))
+            pygame.draw.rect(screen, WHITE, (x, y, OBSTACLE_SIZE, OBSTACLE_SIZE), 2)
+
+
+# Sprite sheet shared by all obstacles: one row per type, one column per animation frame
+_sprite_sheet = None
+_sprite_areas = None
+
+def get_obstacle_sprite_sheet():
+    """Return the obstacle sprite sheet and {type: [area rect per animation frame]}"""
+    global _sprite_sheet, _sprite_areas
+    import pygame
+    if _sprite_sheet is None:
+        frame_count = ANIMATION_FRAMES * 2
+        types = ["static", "moving"]
+        sheet = pygame.Surface((frame_count * SNAKE_BLOCK, len(types) * SNAKE_BLOCK))
+        areas = {}
+        for row, obstacle_type in enumerate(types):
+            areas[obstacle_type] = []
+            for frame in range(frame_count):
+                if obstacle_type == "static" and frame > 0:
+                    # Static obstacles never change, every frame shares the first cell
+                    areas[obstacle_type].append(areas[obstacle_type][0])
+                    continue
+                area = pygame.Rect(frame * SNAKE_BLOCK, row * SNAKE_BLOCK, SNAKE_BLOCK, SNAKE_BLOCK)
+                sheet.blit(_create_obstacle_texture(obstacle_type, frame), area)
+                areas[obstacle_type].append(area)
+        
+        if pygame.display.get_surface() is not None:
+            sheet = sheet.convert()
+        _sprite_sheet = sheet
+        _sprite_areas = areas
+    return _sprite_sheet, _sprite_areas
+
+def _create_obstacle_texture(obstacle_type, animation_frame):
+    """Create pixel art texture for obstacles"""
+    import pygame
+    surface = pygame.Surface((SNAKE_BLOCK, SNAKE_BLOCK))
     
-    def _create_obstacle_texture(self):
-        """Create pixel art texture for obstacles"""
-        surface = pygame.Surface((SNAKE_BLOCK, SNAKE_BLOCK))
-        
-        if self.type == "static":
-            # Static obstacle - stone/brick pattern
-            base_color = (80, 80, 80)
-            highlight = (120, 120, 120)
-            shadow = (40, 40, 40)
-            
-            # Fill base
-            surface.fill(base_color)
-            
-            # Add brick pattern
-            for y in range(0, SNAKE_BLOCK, 4):
-                for x in range(0, SNAKE_BLOCK, 8):
-                    if (y // 4) % 2 == 0:
-                        pygame.draw.rect(surface, highlight, (x, y, 3, 3))
-                    else:
-                        pygame.draw.rect(surface, highlight, (x + 4, y, 3, 3))
-            
-            # Add border
-            pygame.draw.rect(surface, shadow, (0, 0, SNAKE_BLOCK, SNAKE_BLOCK), 2)
-            
-        else:  # moving obstacle
-            # Moving obstacle - crystal/energy pattern
-            pulse = abs(math.sin(self.animation_frame * 0.3))
-            base_r = int(100 + pulse * 50)
-            base_g = int(50 + pulse * 30)
-            base_b = int(150 + pulse * 80)
-            
-            base_color = (base_r, base_g, base_b)
-            highlight = (min(255, base_r + 50), min(255, base_g + 50), min(255, base_b + 50))
-            
-            # Fill base
-            surface.fill(base_color)
-            
-            # Add energy pattern
-            center = SNAKE_BLOCK // 2
-            for i in range(3):
-                radius = center - i * 3
-                if radius > 0:
-                    pygame.draw.circle(surface, highlight, (center, center), radius, 1)
-            
-            # Add sparkle effect
-            for _ in range(3):
-                x = random.randint(2, SNAKE_BLOCK - 3)
-                y = random.randint(2, SNAKE_BLOCK - 3)
-                pygame.draw.rect(surface, (255, 255, 255), (x, y, 1, 1))
+    if obstacle_type == "static":
+        # Static obstacle - stone/brick pattern
+        base_color = (80, 80, 80)
+        highlight = (120, 120, 120)
+        shadow = (40, 40, 40)
+        
+        # Fill base
+        surface.fill(base_color)
         
-        return surface
+        # Add brick pattern
+        for y in range(0, SNAKE_BLOCK, 4):
+            for x in range(0, SNAKE_BLOCK, 8):
+                if (y // 4) % 2 == 0:
+                    pygame.draw.rect(surface, highlight, (x, y, 3, 3))
+                else:
+                    pygame.draw.rect(surface, highlight, (x + 4, y, 3, 3))
+        
+        # Add border
+        pygame.draw.rect(surface, shadow, (0, 0, SNAKE_BLOCK, SNAKE_BLOCK), 2)
+        
+    else:  # moving obstacle
+        # Moving obstacle - crystal/energy pattern
+        pulse = abs(math.sin(animation_frame * 0.3))
+        base_r = int(100 + pulse * 50)
+        base_g = int(50 + pulse * 30)
+        base_b = int(150 + pulse * 80)
+        
+        base_color = (base_r, base_g, base_b)
+        highlight = (min(255, base_r + 50), min(255, base_g + 50), min(255, base_b + 50))
+        
+        # Fill base
+        surface.fill(base_color)
+        
+        # Add energy pattern
+        center = SNAKE_BLOCK // 2
+        for i in range(3):
+            radius = center - i * 3
+            if radius > 0:
+                pygame.draw.circle(surface, highlight, (center, center), radius, 1)
+        
+        # Add sparkle effect (fixed per frame once baked into the sheet)
+        for _ in range(3):
+            x = random.randint(2, SNAKE_BLOCK - 3)
+            y = random.randint(2, SNAKE_BLOCK - 3)
+            pygame.draw.rect(surface, (255, 255, 255), (x, y, 1, 1))
+    
+    return surface
 
 
 class ObstacleManager:
-    def __init__(self, screen_width, screen_height, game_mode=CLASSIC_MODE):
+    def __init__(self, screen_width, screen_height, game_mode=CLASSIC_MODE, free_cells=None, rng=random):
         self.screen_width = screen_width
         self.screen_height = screen_height
         self.obstacles = []
+        self.cells = {}  # Position -> obstacles there, for culling and collision lookups
         self.game_mode = game_mode
+        self.free_cells = free_cells  # Optional FreeCellIndex kept in sync with obstacles
+        self.rng = rng  # Gameplay randomness; the engine passes its seeded generator
         
         if game_mode == CHALLENGE_MODE:
             self._create_challenge_obstacles()
@@ -132,26 +172,51 @@ class ObstacleManager:
         
         for x, y, obs_type in obstacles_positions:
             if x < self.screen_width - SNAKE_BLOCK and y < self.screen_height - SNAKE_BLOCK:
-                self.obstacles.append(Obstacle(x, y, obs_type))
+                self._add_obstacle(Obstacle(x, y, obs_type, self.rng))
+    
+    def _add_obstacle(self, obstacle):
+        self.obstacles.append(obstacle)
+        self._place(obstacle, obstacle.get_position())
+    
+    def _place(self, obstacle, position):
+        self.cells.setdefault(position, []).append(obstacle)
+        if self.free_cells is not None:
+            self.free_cells.occupy(position)
+    
+    def _unplace(self, obstacle, position):
+        here = self.cells[position]
+        here.remove(obstacle)
+        if not here:
+            del self.cells[position]
+        if self.free_cells is not None:
+            self.free_cells.release(position)
     
     def add_random_obstacle(self, snake_positions, food_position):
         """Add a random obstacle that doesn't conflict with snake or food"""
         if len(self.obstacles) >= MAX_OBSTACLES:
             return
         
+        if self.free_cells is not None:
+            # Snake, food and obstacles are all in the index already
+            position = self.free_cells.choice(self.rng)
+            if position is not None:
+                obstacle_type = "moving" if self.rng.random() < 0.3 else "static"
+                self._add_obstacle(Obstacle(position[0], position[1], obstacle_type, self.rng))
+            return
+        
         attempts = 50  # Prevent infinite loop
         while attempts > 0:
-            x = random.randint(0, (self.screen_width // SNAKE_BLOCK) - 1) * SNAKE_BLOCK
-            y = random.randint(0, (self.screen_height // SNAKE_BLOCK) - 1) * SNAKE_BLOCK
+            x = self.rng.randint(0, (self.screen_width // SNAKE_BLOCK) - 1) * SNAKE_BLOCK
+            y = self.rng.randint(0, (self.screen_height // SNAKE_BLOCK) - 1) * SNAKE_BLOCK
             
             # Check if position conflicts with snake, food, or existing obstacles
             position = (x, y)
             if (position not in snake_positions and 
                 position != food_position and
-                not any(obs.get_position() == position for obs in self.obstacles)):
+                position not in self.cells):
                 
-                obstacle_type = "moving" if random.random() < 0.3 else "static"
-                self.obstacles.append(Obstacle(x, y, obstacle_type))
+                obstacle_type = "moving" if self.rng.random() < 0.3 else "static"
+                self._add_obstacle(Obstacle(x, y, obstacle_type, self.rng))
                 break
             
             attempts -= 1
@@ -159,16 +224,26 @@ class ObstacleManager:
     def update(self):
         """Update all obstacles"""
         for obstacle in self.obstacles:
+            old_position = obstacle.get_position()
             obstacle.update(self.screen_width, self.screen_height)
+            if obstacle.get_position() != old_position:
+                self._unplace(obstacle, old_position)
+                self._place(obstacle, obstacle.get_position())
     
-    def draw(self, screen, texture_manager=None):
-        """Draw all obstacles"""
-        for obstacle in self.obstacles:
-            obstacle.draw(screen, texture_manager)
+    def draw(self, screen, texture_manager=None, camera=None):
+        """Draw all obstacles, or only those in view of the camera"""
+        if camera is None:
+            for obstacle in self.obstacles:
+                obstacle.draw(screen, texture_manager)
+            return
+        offset = camera.offset
+        for position in camera.cull(self.cells, self.cells):
+            for obstacle in self.cells[position]:
+                obstacle.draw(screen, texture_manager, offset)
     
     def check_collision(self, position):
         """Check if position collides with any obstacle"""
-        return any(obstacle.get_position() == position for obstacle in self.obstacles)
+        return position in self.cells
     
     def get_obstacle_positions(self):
         """Get all obstacle positions"""
@@ -176,4 +251,8 @@ class ObstacleManager:
     
     def clear(self):
         """Clear all obstacles"""
+        if self.free_cells is not None:
+            for obstacle in self.obstacles:
+                self.free_cells.release(obstacle.get_position())
         self.obstacles.clear()
+        self.cells.clear()
@@ -0,0 +1,192 @@
+import numpy as np
+import pygame
+from constants import *
+
+SPRITE_BATCH_LIMIT = 256  # Below this many particles draw() blits cached sprites instead of writing pixels
+ALPHA_STEPS = 8           # Transparency levels of the cached sprites
+
+class ParticleSystem:
+    """Fixed-size pool of particles kept as NumPy arrays, one array per field.
+
+    Slots are handed out from a free-slot stack and pushed back when their
+    life runs out, so bursts never allocate and nothing is removed from a
+    list. update() moves every particle with a few whole-array operations and
+    draw() submits them all at once: one blits() call of cached squares for
+    everyday counts, one surfarray pixel write for big bursts. Emissions that
+    don't fit in the pool are dropped and counted in `dropped`.
+
+    The stack hands out recycled slots first and fresh ones in ascending
+    order, so live particles stay below `high_water` and the per-tick work
+    only touches that prefix of the arrays.
+
+    Positions are board pixels; draw() takes the camera to shift them on screen.
+    """
+
+    def __init__(self, capacity=MAX_PARTICLES, seed=None):
+        self.capacity = capacity
+        self.position = np.zeros((capacity, 2), np.float32)
+        self.velocity = np.zeros((capacity, 2), np.float32)
+        self.drag = np.ones(capacity, np.float32)       # Velocity multiplier per tick
+        self.life = np.zeros(capacity, np.int16)        # Ticks left, 0 means the slot is free
+        self.max_life = np.ones(capacity, np.int16)
+        self.color = np.zeros((capacity, 3), np.uint8)
+        self.size = np.zeros(capacity, np.int16)        # Square size in pixels
+        self.fade = np.zeros(capacity, bool)            # Shrink and fade out over the lifetime
+        self.free_slots = np.arange(capacity - 1, -1, -1, dtype=np.intp)
+        self.free_count = capacity
+        self.high_water = 0  # Every live slot is below this index
+        self.dropped = 0
+        self.sprites = {}  # (color, size, alpha step) -> square Surface for the blits() path
+        # Particles are cosmetic, so they have their own generator instead of the game's
+        self.rng = np.random.default_rng(seed)
+
+    def __len__(self):
+        return self.capacity - self.free_count
+
+    def emit(self, positions, count, speed=(0.5, 1.5), life=20, color=WHITE, size=3,
+             drag=1.0, fade=True, jitter=0):
+        """Emit `count` particles from each (x, y) in positions, in random directions.
+
+        Each particle starts up to `jitter` pixels away from its position with
+        a speed picked from the `speed` range. Returns how many were emitted.
+        """
+        origins = np.asarray(positions, np.float32).reshape(-1, 2)
+        wanted = len(origins) * count
+        n = min(wanted, self.free_count)
+        self.dropped += wanted - n
+        if n == 0:
+            return 0
+
+        slots = self.free_slots[self.free_count - n:self.free_count]
+        self.free_count -= n
+        self.high_water = max(self.high_water, int(slots.max()) + 1)
+
+        rng = self.rng
+        angle = rng.uniform(0, 2 * np.pi, n)
+        velocity = rng.uniform(speed[0], speed[1], n)
+        self.position[slots] = np.repeat(origins, count, axis=0)[:n]
+        if jitter:
+            self.position[slots] += rng.uniform(-jitter, jitter, (n, 2))
+        self.velocity[slots, 0] = np.cos(angle) * velocity
+        self.velocity[slots, 1] = np.sin(angle) * velocity
+        self.drag[slots] = drag
+        self.life[slots] = life
+        self.max_life[slots] = life
+        self.color[slots] = color
+        self.size[slots] = size
+        self.fade[slots] = fade
+        return n
+
+    def update(self):
+        """Advance every particle by one tick and recycle the ones that expired"""
+        if self.free_count == self.capacity:
+            return
+        # Free slots below the high water mark move too, harmless and cheaper than masking them out
+        end = self.high_water
+        self.position[:end] += self.velocity[:end]
+        self.velocity[:end] *= self.drag[:end, None]
+        life = self.life[:end]
+        expiring = np.flatnonzero(life == 1)
+        np.subtract(life, 1, out=life, where=life > 0)
+        if expiring.size:
+            self.free_slots[self.free_count:self.free_count + expiring.size] = expiring
+            self.free_count += expiring.size
+            if self.free_count == self.capacity:
+                self.clear()
+
+    def clear(self):
+        """Free every slot and hand out fresh slots from the start again"""
+        self.life[:self.high_water] = 0
+        self.free_slots[:] = np.arange(self.capacity - 1, -1, -1)
+        self.free_count = self.capacity
+        self.high_water = 0
+
+    def bounds(self):
+        """Board rect around every live particle, or None when there are none"""
+        if self.free_count == self.capacity:
+            return None
+        live = np.flatnonzero(self.life[:self.high_water])
+        # Covers the next tick's positions too, where draw() may show them
+        x = self.position[live, 0]
+        y = self.position[live, 1]
+        next_x = x + self.velocity[live, 0]
+        next_y = y + self.velocity[live, 1]
+        left, top = int(min(x.min(), next_x.min())), int(min(y.min(), next_y.min()))
+        reach = int(self.size.max()) + 2
+        return pygame.Rect(left, top, int(max(x.max(), next_x.max())) - left + reach,
+                           int(max(y.max(), next_y.max())) - top + reach)
+
+    def draw(self, screen, camera=None, alpha=0.0):
+        """Draw every live particle in one batched call.
+
+        alpha is the fraction of the next tick already elapsed; particles are
+        drawn that far along their velocity, so they move smoothly when
+        frames come faster than ticks.
+        """
+        live = np.flatnonzero(self.life[:self.high_water])
+        if live.size == 0:
+            return
+        offset = camera.offset if camera is not None else (0, 0)
+        position = self.position[live]
+        if alpha:
+            position = position + self.velocity[live] * alpha
+        # Locking the screen for a pixel write only pays off for big bursts
+        if live.size < SPRITE_BATCH_LIMIT:
+            self._blit_sprites(screen, live, position, offset)
+        else:
+            self._write_pixels(screen, live, position, offset)
+
+    def _blit_sprites(self, screen, live, position, offset):
+        """One Surface.blits() call with cached squares per (color, size, alpha step)"""
+        offset_x, offset_y = offset
+        sprites = self.sprites
+        blits = []
+        for (x, y), life, max_life, size, fade, rgb in zip(
+                position.tolist(), self.life[live].tolist(), self.max_life[live].tolist(),
+                self.size[live].tolist(), self.fade[live].tolist(), map(tuple, self.color[live].tolist())):
+            level = ALPHA_STEPS
+            if fade:
+                # Fading particles shrink and turn transparent as their life runs out
+                size = max(1, size * life // max_life)
+                level = round(ALPHA_STEPS * life / max_life)
+            key = (rgb, size, level)
+            sprite = sprites.get(key)
+            if sprite is None:
+                sprite = pygame.Surface((size, size), pygame.SRCALPHA)
+                sprite.fill(rgb + (255 * level // ALPHA_STEPS,))
+                sprites[key] = sprite
+            blits.append((sprite, (int(x) + offset_x, int(y) + offset_y)))
+        screen.blits(blits, doreturn=False)
+
+    def _write_pixels(self, screen, live, position, offset):
+        """Alpha-blend all particles straight into the screen pixels with one array write"""
+        # Fading particles shrink and turn transparent as their life runs out
+        fraction = self.life[live] / self.max_life[live]
+        fade = self.fade[live]
+        alpha = np.where(fade, fraction, 1.0)
+        size = self.size[live]
+        size = np.where(fade, np.maximum(1, (fraction * size).astype(np.int16)), size)
+        x = position[:, 0].astype(np.intp) + offset[0]
+        y = position[:, 1].astype(np.intp) + offset[1]
+        color = self.color[live]
+
+        # Expand each particle into its square of pixels and keep those on screen
+        largest = int(size.max())
+        square_x = np.tile(np.arange(largest), largest)
+        square_y = np.repeat(np.arange(largest), largest)
+        x = x[:, None] + square_x
+        y = y[:, None] + square_y
+        clip = screen.get_clip()  # Writing the pixels directly bypasses the clip, so apply it here
+        inside = ((square_x < size[:, None]) & (square_y < size[:, None]) &
+                  (x >= clip.left) & (x < clip.right) & (y >= clip.top) & (y < clip.bottom))
+        particle = np.nonzero(inside)[0]
+        if particle.size == 0:
+            return
+        x = x[inside]
+        y = y[inside]
+        color = color[particle]
+        alpha = alpha[particle][:, None]
+
+        pixels = pygame.surfarray.pixels3d(screen)
+        pixels[x, y] = (pixels[x, y] * (1 - alpha) + color * alpha).astype(np.uint8)
+        del pixels  # Unlock the screen
@@ -0,0 +1,160 @@
+import json
+import time
+from collections import deque
+import pygame
+from constants import *
+
+class _Span:
+    """Context manager that records one named span into the profiler"""
+    __slots__ = ('profiler', 'name', 'start')
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        self.profiler._add_span(self.name, self.start, time.perf_counter())
+        return False
+
+
+class _NullSpan:
+    """Shared do-nothing span used while profiling is off"""
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class FrameProfiler:
+    """Times the phases of each frame and shows them in an on-screen overlay.
+
+    Wrap work in `with profiler.span('name'):`; spans nest, so the draw phase
+    can contain background, food, snake and so on. While disabled span() hands
+    back a shared no-op object and nothing is recorded. The last
+    `trace_frames` frames of spans are kept for export as a Chrome trace
+    (open it in chrome://tracing or https://ui.perfetto.dev).
+    """
+
+    def __init__(self, enabled=False, history=240, trace_frames=1800, budget_ms=1000 / RENDER_FPS):
+        self.enabled = enabled
+        self.frame_times = deque(maxlen=history)  # Milliseconds between frame starts
+        self.trace = deque(maxlen=trace_frames)   # Per frame: (frame start, spans, counters)
+        self.averages = {}                        # Smoothed milliseconds per span name
+        self.budget_ms = budget_ms
+        self.origin = time.perf_counter()
+        self.frame_start = None
+        self.spans = []
+        self.counters = {}
+
+    def toggle(self):
+        self.enabled = not self.enabled
+        self.frame_start = None
+        self.spans = []
+        self.counters = {}
+        return self.enabled
+
+    def span(self, name):
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, name)
+
+    def count(self, name, value):
+        """Record a per-frame counter such as the number of live particles"""
+        if self.enabled:
+            self.counters[name] = value
+
+    def begin_frame(self):
+        """Close the previous frame and start timing a new one"""
+        if not self.enabled:
+            return
+        now = time.perf_counter()
+        if self.frame_start is not None:
+            self.frame_times.append((now - self.frame_start) * 1000)
+            self.trace.append((self.frame_start, self.spans, self.counters))
+        self.frame_start = now
+        self.spans = []
+        self.counters = {}
+
+    def _add_span(self, name, start, end):
+        self.spans.append((name, start, end))
+        duration = (end - start) * 1000
+        average = self.averages.get(name)
+        self.averages[name] = duration if average is None else average * 0.95 + duration * 0.05
+
+    def percentiles(self, quantiles=(0.5, 0.95, 0.99)):
+        """Frame time percentiles in milliseconds over the rolling history"""
+        if not self.frame_times:
+            return [0.0] * len(quantiles)
+        ordered = sorted(self.frame_times)
+        last = len(ordered) - 1
+        return [ordered[round(q * last)] for q in quantiles]
+
+    def draw(self, screen, text_cache):
+        """Draw the frame-time graph and stats; returns the rect covered, or None when off"""
+        if not self.enabled:
+            return None
+
+        width, graph_height = self.frame_times.maxlen, 80
+        names = sorted(self.averages)
+        line_height = 14
+        panel = pygame.Rect(0, 0, width + 16, graph_height + 44 + line_height * (len(names) + len(self.counters)))
+        panel.bottomright = (screen.get_width() - 8, screen.get_height() - 8)
+
+        overlay = pygame.Surface(panel.size)
+        overlay.set_alpha(200)
+        overlay.fill(BLACK)
+        screen.blit(overlay, panel)
+
+        # One bar per frame, scaled so twice the budget fills the graph
+        graph_left = panel.left + 8
+        graph_bottom = panel.top + 8 + graph_height
+        scale = graph_height / (self.budget_ms * 2)
+        offset = width - len(self.frame_times)
+        for i, frame_ms in enumerate(self.frame_times):
+            height = min(graph_height, max(1, int(frame_ms * scale)))
+            color = GREEN if frame_ms <= self.budget_ms * 1.1 else (YELLOW if frame_ms <= self.budget_ms * 2 else RED)
+            x = graph_left + offset + i
+            pygame.draw.line(screen, color, (x, graph_bottom), (x, graph_bottom - height))
+        budget_y = graph_bottom - int(self.budget_ms * scale)
+        pygame.draw.line(screen, GRAY, (graph_left, budget_y), (graph_left + width, budget_y))
+
+        p50, p95, p99 = self.percentiles()
+        y = graph_bottom + 14
+        self._draw_line(screen, text_cache, f"p50 {p50:.1f}  p95 {p95:.1f}  p99 {p99:.1f} ms", graph_left, y, WHITE)
+        for name in names:
+            y += line_height
+            self._draw_line(screen, text_cache, f"{name}: {self.averages[name]:.2f} ms", graph_left, y, GRAY)
+        for name, value in sorted(self.counters.items()):
+            y += line_height
+            self._draw_line(screen, text_cache, f"{name}: {value}", graph_left, y, GRAY)
+        return panel
+
+    def _draw_line(self, screen, text_cache, text, x, y, color):
+        surface = text_cache.render(text, 18, color)
+        screen.blit(surface, surface.get_rect(midleft=(x, y)))
+
+    def export_chrome_trace(self, path):
+        """Write the recorded frames in Chrome's trace event format; returns the event count"""
+        events = []
+        for frame_index, (frame_start, spans, counters) in enumerate(self.trace):
+            ts = (frame_start - self.origin) * 1e6
+            events.append({'name': 'frame', 'ph': 'i', 's': 't', 'ts': ts, 'pid': 1, 'tid': 1,
+                           'args': {'index': frame_index}})
+            for name, start, end in spans:
+                events.append({'name': name, 'ph': 'X', 'ts': (start - self.origin) * 1e6,
+                               'dur': (end - start) * 1e6, 'pid': 1, 'tid': 1})
+            for name, value in counters.items():
+                events.append({'name': name, 'ph': 'C', 'ts': ts, 'pid': 1, 'args': {name: value}})
+        with open(path, 'w') as f:
+            json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, f)
+        return len(events)
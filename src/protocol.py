@@ -0,0 +1,43 @@
+import json
+import struct
+
+DEFAULT_PORT = 8765
+
+# Every message is a JSON object sent as one frame: a 4 byte big-endian length, then the UTF-8 payload
+HEADER = struct.Struct('>I')
+MAX_FRAME = 16 * 1024 * 1024  # A join snapshot carries the whole input history, so allow long games
+
+def encode(message):
+    """One message as a frame, ready to write to any number of clients"""
+    payload = json.dumps(message, separators=(',', ':')).encode()
+    return HEADER.pack(len(payload)) + payload
+
+def decode(payload):
+    return json.loads(payload)
+
+def _check_length(length):
+    if length > MAX_FRAME:
+        raise ValueError(f"frame of {length} bytes is too large")
+    return length
+
+async def read_message(reader):
+    """Next message from an asyncio StreamReader; raises IncompleteReadError at the end of the stream"""
+    length = _check_length(HEADER.unpack(await reader.readexactly(HEADER.size))[0])
+    return decode(await reader.readexactly(length))
+
+def recv_message(sock):
+    """Next message from a blocking socket, or None once the connection is closed"""
+    header = _recv_exactly(sock, HEADER.size)
+    if header is None:
+        return None
+    payload = _recv_exactly(sock, _check_length(HEADER.unpack(header)[0]))
+    return decode(payload) if payload is not None else None
+
+def _recv_exactly(sock, size):
+    data = bytearray()
+    while len(data) < size:
+        chunk = sock.recv(size - len(data))
+        if not chunk:
+            return None
+        data += chunk
+    return bytes(data)
@@ -0,0 +1,254 @@
+import os
+import sys
+import time
+import queue
+import ctypes
+import shutil
+import struct
+import subprocess
+import multiprocessing
+import numpy as np
+import pygame
+from constants import *
+
+RECORD_QUEUE_FRAMES = 32  # Frames waiting for the writer; about 60 MB at 800x600
+GIF_FPS = 25              # GIF frame delays are whole centiseconds, and viewers cap the rate
+VIDEO_EXTENSIONS = ('.mp4', '.mkv', '.webm', '.mov', '.avi')
+GIF_CLEAR_EVERY = 252     # Pixels between clear codes, so every LZW code stays 9 bits wide
+
+def record_format(path):
+    """'gif', 'video' or 'png' (a directory of numbered frames) for an output path"""
+    extension = os.path.splitext(path)[1].lower()
+    if extension == '.gif':
+        return 'gif'
+    if extension in VIDEO_EXTENSIONS:
+        return 'video'
+    return 'png'
+
+
+class FrameRecorder:
+    """Records the displayed frames to a GIF, a video or a PNG sequence.
+
+    capture() copies the screen's pixels into one of a fixed number of
+    shared memory slots and returns; a separate writer process turns them
+    into RGB and encodes them (a process, not a thread, because PNG and GIF
+    encoding hold the GIL). When every slot is still waiting to be written
+    the frame is dropped and counted, so the game never waits on the disk.
+
+    Frames are sampled at `fps` and numbered by their capture time: videos
+    repeat the previous frame over a gap, GIFs show it for longer, and PNG
+    sequences skip the numbers of frames that were dropped. Videos are piped
+    to ffmpeg as raw frames; without ffmpeg on the PATH a PNG sequence is
+    written instead.
+    """
+
+    def __init__(self, path, surface, fps=None, slots=RECORD_QUEUE_FRAMES):
+        self.format = record_format(path)
+        self.ffmpeg = shutil.which('ffmpeg')
+        if self.format == 'video' and not self.ffmpeg:
+            print(f"ffmpeg not found, recording PNG frames instead of {path}")
+            path = os.path.splitext(path)[0]
+            self.format = 'png'
+        self.path = path
+        self.fps = fps or (GIF_FPS if self.format == 'gif' else RENDER_FPS)
+        self.frames = 0
+        self.dropped = 0
+        self.start_time = None
+        self.last_number = -1
+
+        self.slot_size = surface.get_pitch() * surface.get_height()
+        context = multiprocessing.get_context('spawn')  # Forking would copy the display and asset threads
+        self.memory = context.RawArray(ctypes.c_uint8, slots * self.slot_size)
+        self.slots = np.frombuffer(self.memory, dtype=np.uint8).reshape(slots, self.slot_size)
+        self.free = context.Queue()
+        self.filled = context.Queue()
+        for slot in range(slots):
+            self.free.put(slot)
+        layout = (surface.get_size(), surface.get_pitch(), surface.get_bytesize(), surface.get_shifts()[:3])
+        self.writer = context.Process(target=_write_frames,
+                                      args=(self.format, path, self.fps, self.ffmpeg, layout, self.memory,
+                                            slots, self.free, self.filled),
+                                      name='frame-writer', daemon=True)
+        self.writer.start()
+
+    def capture(self, surface):
+        """Queue the surface's current pixels; returns False if the frame was skipped or dropped"""
+        now = time.perf_counter()
+        if self.start_time is None:
+            self.start_time = now
+        number = int((now - self.start_time) * self.fps)
+        if number <= self.last_number:
+            return False  # Not due yet at the recording frame rate
+        self.last_number = number
+        try:
+            slot = self.free.get_nowait()
+        except queue.Empty:
+            self.dropped += 1
+            return False
+        self.slots[slot] = np.frombuffer(surface.get_buffer(), dtype=np.uint8)
+        self.filled.put((slot, number))
+        self.frames += 1
+        return True
+
+    def close(self, timeout=30):
+        """Let the writer finish the queued frames, then stop it"""
+        if self.writer is None:
+            return
+        self.filled.put(None)
+        self.writer.join(timeout)
+        if self.writer.is_alive():
+            print("Frame writer did not finish, stopping it")
+            self.writer.terminate()
+            self.writer.join()
+        self.writer = None
+        print(f"Recorded {self.frames} frames to {self.path} ({self.dropped} dropped)")
+
+
+def _write_frames(format, path, fps, ffmpeg, layout, memory, slot_count, free, filled):
+    """Writer process: encode each filled slot in order, then hand the slot back"""
+    (width, height), pitch, bytesize, shifts = layout
+    if sys.byteorder == 'little':
+        channels = [shift // 8 for shift in shifts]
+    else:
+        channels = [bytesize - 1 - shift // 8 for shift in shifts]
+    slots = np.frombuffer(memory, dtype=np.uint8).reshape(slot_count, height, pitch)
+
+    writer = {'png': PngSequenceWriter, 'gif': GifWriter, 'video': VideoWriter}[format]
+    try:
+        writer = writer(path, (width, height), fps, ffmpeg)
+    except OSError as e:
+        print(f"Error starting recording: {e}")
+        return
+    try:
+        while True:
+            item = filled.get()
+            if item is None:
+                break
+            slot, number = item
+            pixels = slots[slot, :, :width * bytesize].reshape(height, width, bytesize)
+            rgb = pixels[:, :, channels]  # Fancy indexing copies, so the slot is free again
+            free.put(slot)
+            writer.write(rgb, number)
+    except OSError as e:
+        print(f"Error writing recording: {e}")
+    finally:
+        writer.close()
+
+
+class PngSequenceWriter:
+    """frame_000000.png, frame_000001.png, ... in a directory; dropped frames leave gaps"""
+
+    def __init__(self, path, size, fps, ffmpeg=None):
+        os.makedirs(path, exist_ok=True)
+        self.path = path
+        self.size = size
+
+    def write(self, rgb, number):
+        image = pygame.image.frombuffer(rgb.tobytes(), self.size, 'RGB')
+        pygame.image.save(image, os.path.join(self.path, f"frame_{number:06d}.png"))
+
+    def close(self):
+        pass
+
+
+class VideoWriter:
+    """Raw RGB frames piped into ffmpeg at a constant frame rate"""
+
+    def __init__(self, path, size, fps, ffmpeg):
+        self.process = subprocess.Popen(
+            [ffmpeg, '-loglevel', 'error', '-y', '-f', 'rawvideo', '-pix_fmt', 'rgb24',
+             '-s', f'{size[0]}x{size[1]}', '-r', str(fps), '-i', '-', '-pix_fmt', 'yuv420p', path],
+            stdin=subprocess.PIPE)
+        self.last = None
+        self.last_number = 0
+
+    def write(self, rgb, number):
+        data = rgb.tobytes()
+        if self.last is not None:
+            for _ in range(number - self.last_number - 1):
+                self.process.stdin.write(self.last)  # Hold the previous frame over dropped ones
+        self.process.stdin.write(data)
+        self.last = data
+        self.last_number = number
+
+    def close(self):
+        try:
+            self.process.stdin.close()
+        except OSError:
+            pass
+        self.process.wait()
+
+
+class GifWriter:
+    """Looping animated GIF with a fixed 3-3-2 bit palette.
+
+    Only the rectangle that changed since the previous frame is stored, and
+    a frame is written once the next one arrives, since that fixes its
+    delay. The pixels are LZW coded without building a dictionary (a clear
+    code every GIF_CLEAR_EVERY pixels keeps the codes 9 bits wide), which
+    numpy can pack in a few milliseconds; files are about a byte per changed
+    pixel.
+    """
+
+    def __init__(self, path, size, fps, ffmpeg=None):
+        self.file = open(path, 'wb')
+        self.size = size
+        self.fps = fps
+        self.previous = None  # Indexed pixels of the last frame
+        self.pending = None   # (rect, indexed pixels, frame number) not written yet
+        self.time_cs = 0      # Centiseconds of frames written so far
+
+        levels = np.arange(256)
+        palette = np.stack([(levels >> 5) * 255 // 7, (levels >> 2 & 7) * 255 // 7, (levels & 3) * 255 // 3], 1)
+        self.file.write(b'GIF89a' + struct.pack('<HHBBB', size[0], size[1], 0xF7, 0, 0))
+        self.file.write(palette.astype(np.uint8).tobytes())
+        self.file.write(b'!\xff\x0bNETSCAPE2.0\x03\x01\x00\x00\x00')  # Loop forever
+
+    def write(self, rgb, number):
+        indexed = (rgb[:, :, 0] & 0xE0) | (rgb[:, :, 1] >> 5 << 2) | (rgb[:, :, 2] >> 6)
+        if self.previous is None:
+            rect = (0, 0, self.size[0], self.size[1])
+        else:
+            changed = indexed != self.previous
+            rows = np.flatnonzero(changed.any(axis=1))
+            if not len(rows):
+                return  # Nothing changed: the pending frame just stays up longer
+            cols = np.flatnonzero(changed.any(axis=0))
+            rect = (int(cols[0]), int(rows[0]), int(cols[-1] - cols[0] + 1), int(rows[-1] - rows[0] + 1))
+        self.previous = indexed
+        self._flush(number)
+        x, y, width, height = rect
+        self.pending = (rect, indexed[y:y + height, x:x + width], number)
+
+    def _flush(self, next_number):
+        """Write the pending frame, shown until frame `next_number`"""
+        if self.pending is None:
+            return
+        (x, y, width, height), pixels, number = self.pending
+        end_cs = round(next_number * 100 / self.fps)
+        delay = max(end_cs - self.time_cs, 2)
+        self.time_cs += delay
+        self.file.write(b'!\xf9\x04\x04' + struct.pack('<H', delay) + b'\x00\x00')  # Keep the previous frame
+        self.file.write(b',' + struct.pack('<HHHHB', x, y, width, height, 0) + b'\x08')
+        data = _lzw_uncompressed(pixels.ravel())
+        for start in range(0, len(data), 255):
+            block = data[start:start + 255]
+            self.file.write(bytes((len(block),)) + block)
+        self.file.write(b'\x00')
+        self.pending = None
+
+    def close(self):
+        if self.pending is not None:
+            self._flush(self.pending[2] + 1)
+        self.file.write(b';')
+        self.file.close()
+
+
+def _lzw_uncompressed(pixels):
+    """GIF LZW data for 8-bit pixels, using only literal and clear codes"""
+    chunks = -(-len(pixels) // GIF_CLEAR_EVERY)
+    codes = np.full((chunks, GIF_CLEAR_EVERY + 1), 256, dtype=np.uint16)  # Column 0: clear code
+    codes[:, 1:].flat[:len(pixels)] = pixels
+    codes = np.append(codes.ravel()[:len(pixels) + chunks], 257)  # Drop the padding, add the end code
+    bits = (codes[:, None] >> np.arange(9, dtype=np.uint16)) & 1
+    return np.packbits(bits.astype(np.uint8).ravel(), bitorder='little').tobytes()
@@ -0,0 +1,146 @@
+import os
+import json
+import sys
+import time
+import argparse
+from constants import *
+from engine import SnakeEngine
+
+REPLAY_VERSION = 1
+
+# Action codes stored in replays; 0 is a tick without input
+ACTIONS = (None, (0, -SNAKE_BLOCK), (SNAKE_BLOCK, 0), (0, SNAKE_BLOCK), (-SNAKE_BLOCK, 0))
+ACTION_CODES = {action: code for code, action in enumerate(ACTIONS)}
+
+class Replay:
+    """One game stored as its seed and settings plus the inputs given on each tick.
+
+    Only ticks with an input are kept, as [ticks since the previous input,
+    action code] pairs, so a few minutes of play take a few hundred bytes.
+    The engine draws every random number of the rules from a generator seeded
+    with `seed`, so feeding the same actions to a fresh SnakeEngine replays the
+    game exactly. `result` holds the score, tick count and cause the game
+    ended with, for verify() to check against.
+    """
+
+    def __init__(self, seed, width, height, speed, game_mode, inputs=None, ticks=0, result=None):
+        self.seed = seed
+        self.width = width
+        self.height = height
+        self.speed = speed
+        self.game_mode = game_mode
+        self.inputs = inputs if inputs is not None else []
+        self.ticks = ticks
+        self.last_input_tick = sum(delta for delta, _ in self.inputs)
+        self.result = result
+
+    @classmethod
+    def start(cls, engine):
+        """Empty replay for the game the engine just started"""
+        return cls(engine.seed, engine.width, engine.height, engine.speed, engine.game_mode)
+
+    def record(self, action):
+        """Log the action passed to the next engine.step() call (None for no input)"""
+        self.ticks += 1
+        if action is not None:
+            self.inputs.append([self.ticks - self.last_input_tick, ACTION_CODES[action]])
+            self.last_input_tick = self.ticks
+
+    def finish(self, engine):
+        self.result = {'score': engine.score, 'ticks': engine.ticks, 'cause': engine.death_cause}
+
+    def actions(self):
+        """The action of every recorded tick, in order"""
+        tick = 0
+        for delta, code in self.inputs:
+            for _ in range(delta - 1):
+                yield None
+            yield ACTIONS[code]
+            tick += delta
+        for _ in range(self.ticks - tick):
+            yield None
+
+    def play(self):
+        """Re-simulate the game headlessly; returns the engine in its final state"""
+        engine = SnakeEngine(self.width, self.height, self.speed, self.game_mode, seed=self.seed)
+        step = engine.step
+        for action in self.actions():
+            step(action)
+        return engine
+
+    def verify(self):
+        """Replay the game and return the result fields that came out differently"""
+        engine = self.play()
+        replayed = {'score': engine.score, 'ticks': engine.ticks, 'cause': engine.death_cause}
+        expected = self.result or {}
+        return {key: (expected.get(key), value) for key, value in replayed.items()
+                if expected.get(key) != value}
+
+    def to_dict(self):
+        return {
+            'version': REPLAY_VERSION,
+            'seed': self.seed,
+            'board': [self.width, self.height],
+            'speed': self.speed,
+            'game_mode': self.game_mode,
+            'ticks': self.ticks,
+            'inputs': self.inputs,
+            'result': self.result,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        if data.get('version') != REPLAY_VERSION:
+            raise ValueError(f"unsupported replay version {data.get('version')}")
+        width, height = data['board']
+        return cls(data['seed'], width, height, data['speed'], data['game_mode'],
+                   data['inputs'], data['ticks'], data['result'])
+
+    def save(self, path):
+        save_replay_data(self.to_dict(), path)
+
+    @classmethod
+    def load(cls, path):
+        with open(path) as f:
+            return cls.from_dict(json.load(f))
+
+
+def save_replay_data(data, path):
+    """Write a replay dict to path through a temporary file, so a crash never leaves half a replay"""
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    temp_path = path + '.tmp'
+    with open(temp_path, 'w') as f:
+        json.dump(data, f, separators=(',', ':'))
+    os.replace(temp_path, path)
+
+
+def main(argv=None):
+    """Verify replay files headlessly: python src/replay.py FILE..."""
+    parser = argparse.ArgumentParser(description='Re-simulate recorded games and check their results')
+    parser.add_argument('files', nargs='+', metavar='FILE')
+    args = parser.parse_args(argv)
+
+    failures = 0
+    for path in args.files:
+        try:
+            replay = Replay.load(path)
+        except (OSError, ValueError, KeyError) as e:
+            print(f"{path}: cannot load ({e})")
+            failures += 1
+            continue
+        start = time.perf_counter()
+        mismatches = replay.verify()
+        elapsed = max(time.perf_counter() - start, 1e-9)
+        speedup = replay.ticks / TICK_RATE / elapsed
+        if mismatches:
+            failures += 1
+            details = ', '.join(f"{key} {expected} != {actual}" for key, (expected, actual) in mismatches.items())
+            print(f"{path}: MISMATCH ({details})")
+        else:
+            print(f"{path}: ok, score {replay.result['score']} in {replay.ticks} ticks "
+                  f"({elapsed * 1000:.0f} ms, {speedup:.0f}x real time)")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,188 @@
+import os
+import sys
+import json
+import math
+import time
+import random
+import argparse
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from constants import *
+from engine import SnakeEngine
+from autopilot import Autopilot
+
+DIFFICULTIES = {'easy': EASY, 'medium': MEDIUM, 'hard': HARD}
+MODES = {'classic': CLASSIC_MODE, 'time_attack': TIME_ATTACK_MODE, 'challenge': CHALLENGE_MODE}
+FOOD_NAMES = ('normal', 'special', 'super', 'shrink', 'slowmo', 'double_score', 'ghost')
+TURNS = ((0, -SNAKE_BLOCK), (SNAKE_BLOCK, 0), (0, SNAKE_BLOCK), (-SNAKE_BLOCK, 0))
+
+# One autopilot per worker process, so its search buffers are reused across games
+_autopilot = None
+
+def play_game(seed, speed, game_mode, cols, rows, max_ticks, policy):
+    """Play one game to the end; returns its summary tuple.
+
+    (seed, score, length, cause, ticks, foods eaten per type). The cause is
+    None when the game hit max_ticks. The 'random' policy turns at random
+    every few moves, drawing from its own generator so the game stays
+    reproducible from the seed alone.
+    """
+    global _autopilot
+    engine = SnakeEngine(cols * SNAKE_BLOCK, rows * SNAKE_BLOCK, speed, game_mode, seed=seed)
+    eaten = [0] * len(FOOD_NAMES)
+    step = engine.step
+    if policy == 'autopilot':
+        if _autopilot is None:
+            _autopilot = Autopilot()
+        act = _autopilot.act
+    else:
+        turns = random.Random(seed ^ 0x5EED)
+        act = lambda engine: turns.choice(TURNS) if turns.random() < 0.1 else None
+
+    while not engine.game_over and engine.ticks < max_ticks:
+        for event in step(act(engine)):
+            if event[0] == EVENT_EAT:
+                eaten[event[1]] += 1
+    return (seed, engine.score, len(engine.snake.positions), engine.death_cause, engine.ticks, tuple(eaten))
+
+def play_chunk(difficulty, mode, first_seed, count, cols, rows, max_ticks, policy):
+    """Worker entry point: play `count` games with consecutive seeds"""
+    speed = DIFFICULTIES[difficulty]
+    game_mode = MODES[mode]
+    summaries = [play_game(seed, speed, game_mode, cols, rows, max_ticks, policy)
+                 for seed in range(first_seed, first_seed + count)]
+    return difficulty, mode, summaries
+
+
+class Aggregate:
+    """Running statistics over the game summaries of one configuration"""
+
+    def __init__(self):
+        self.games = 0
+        self.score_mean = 0.0
+        self.score_m2 = 0.0  # Welford's sum of squared differences, for the deviation
+        self.score_min = None
+        self.score_max = None
+        self.length_total = 0
+        self.ticks_total = 0
+        self.causes = Counter()
+        self.eaten = [0] * len(FOOD_NAMES)
+
+    def add(self, summary):
+        seed, score, length, cause, ticks, eaten = summary
+        self.games += 1
+        delta = score - self.score_mean
+        self.score_mean += delta / self.games
+        self.score_m2 += delta * (score - self.score_mean)
+        self.score_min = score if self.score_min is None else min(self.score_min, score)
+        self.score_max = score if self.score_max is None else max(self.score_max, score)
+        self.length_total += length
+        self.ticks_total += ticks
+        self.causes[cause or 'tick_limit'] += 1
+        for food_type, count in enumerate(eaten):
+            self.eaten[food_type] += count
+
+    def score_stdev(self):
+        return math.sqrt(self.score_m2 / (self.games - 1)) if self.games > 1 else 0.0
+
+    def to_dict(self):
+        games = max(self.games, 1)
+        return {
+            'games': self.games,
+            'score': {'mean': self.score_mean, 'stdev': self.score_stdev(),
+                      'min': self.score_min, 'max': self.score_max},
+            'length_mean': self.length_total / games,
+            'ticks_mean': self.ticks_total / games,
+            'causes': {cause: count / games for cause, count in self.causes.items()},
+            'eaten_per_game': {name: count / games for name, count in zip(FOOD_NAMES, self.eaten)},
+        }
+
+
+def positive_int(text):
+    """Parse a count that must be at least 1"""
+    try:
+        value = int(text)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected a whole number, got '{text}'")
+    if value < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {value}")
+    return value
+
+
+def main(argv=None):
+    """Play many headless games across processes: python src/selfplay.py --games 10000"""
+    parser = argparse.ArgumentParser(description='Mass self-play for tuning food and obstacle settings')
+    parser.add_argument('--games', type=positive_int, default=1000, help='games per difficulty and mode')
+    parser.add_argument('--difficulty', action='append', choices=DIFFICULTIES, dest='difficulties',
+                        help='difficulty to play (repeatable, default all)')
+    parser.add_argument('--mode', action='append', choices=MODES, dest='modes',
+                        help='game mode to play (repeatable, default all)')
+    parser.add_argument('--policy', choices=('autopilot', 'random'), default='autopilot')
+    parser.add_argument('--board', default=f'{BOARD_COLS}x{BOARD_ROWS}', metavar='COLSxROWS')
+    parser.add_argument('--max-ticks', type=int, default=TIME_ATTACK_DURATION * TICK_RATE * 3,
+                        help='end a game after this many ticks')
+    parser.add_argument('--seed', type=int, default=0, help='seed of the first game of each configuration')
+    parser.add_argument('--workers', type=positive_int, default=os.cpu_count(), help='worker processes')
+    parser.add_argument('--chunk-size', type=positive_int, default=25, help='games per work unit')
+    parser.add_argument('--summaries', metavar='FILE', help='write one JSON line per game to FILE')
+    parser.add_argument('--output', metavar='FILE', help='write the aggregated results as JSON to FILE')
+    args = parser.parse_args(argv)
+
+    cols, rows = (int(part) for part in args.board.lower().split('x'))
+    configs = [(difficulty, mode) for difficulty in args.difficulties or DIFFICULTIES
+               for mode in args.modes or MODES]
+    aggregates = {config: Aggregate() for config in configs}
+    total = args.games * len(configs)
+    summaries_file = open(args.summaries, 'w') if args.summaries else None
+
+    done = 0
+    ticks = 0
+    start = time.perf_counter()
+    last_report = start
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        # Seeds depend only on the game index, not on the worker, so results don't
+        # change with --workers or --chunk-size and any game can be replayed
+        end = args.seed + args.games
+        futures = [pool.submit(play_chunk, difficulty, mode, first, min(args.chunk_size, end - first),
+                               cols, rows, args.max_ticks, args.policy)
+                   for difficulty, mode in configs
+                   for first in range(args.seed, end, args.chunk_size)]
+        for future in as_completed(futures):
+            difficulty, mode, summaries = future.result()
+            aggregate = aggregates[(difficulty, mode)]
+            for summary in summaries:
+                aggregate.add(summary)
+                ticks += summary[4]
+                if summaries_file:
+                    seed, score, length, cause, game_ticks, eaten = summary
+                    summaries_file.write(json.dumps({
+                        'difficulty': difficulty, 'mode': mode, 'seed': seed, 'score': score, 'length': length,
+                        'cause': cause, 'ticks': game_ticks, 'eaten': dict(zip(FOOD_NAMES, eaten))}) + '\n')
+            done += len(summaries)
+            now = time.perf_counter()
+            if now - last_report >= 2 or done == total:
+                last_report = now
+                print(f"{done}/{total} games, {done / (now - start):.1f} games/s, "
+                      f"{ticks / (now - start):,.0f} ticks/s", flush=True)
+    if summaries_file:
+        summaries_file.close()
+
+    print()
+    print(f"{'difficulty':<10} {'mode':<12} {'games':>6} {'score':>9} {'stdev':>8} {'max':>7} "
+          f"{'length':>7} {'ticks':>7}  causes")
+    for (difficulty, mode), aggregate in aggregates.items():
+        result = aggregate.to_dict()
+        causes = ', '.join(f"{cause} {share:.0%}" for cause, share in sorted(result['causes'].items()))
+        print(f"{difficulty:<10} {mode:<12} {aggregate.games:>6} {result['score']['mean']:>9.1f} "
+              f"{result['score']['stdev']:>8.1f} {result['score']['max']:>7} {result['length_mean']:>7.1f} "
+              f"{result['ticks_mean']:>7.0f}  {causes}")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({f"{difficulty}/{mode}": aggregate.to_dict()
+                       for (difficulty, mode), aggregate in aggregates.items()}, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
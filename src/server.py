@@ -0,0 +1,370 @@
+import os
+os.environ.setdefault('PYGAME_HIDE_SUPPORT_PROMPT', '1')  # Before the game modules import pygame, also in shards
+
+import sys
+import time
+import zlib
+import random
+import asyncio
+import argparse
+import multiprocessing
+from constants import *
+from engine import SnakeEngine
+from replay import Replay, ACTIONS, ACTION_CODES
+from input_queue import InputQueue
+import protocol
+
+DIFFICULTIES = {'easy': EASY, 'medium': MEDIUM, 'hard': HARD}
+MODES = {'classic': CLASSIC_MODE, 'time_attack': TIME_ATTACK_MODE, 'challenge': CHALLENGE_MODE}
+
+MAX_BUFFERED = 256 * 1024  # Bytes a client may fall behind before it is dropped
+STATS_INTERVAL = 10        # Seconds between shard load reports
+BOT_TURN_CHANCE = 0.1      # Chance per tick that a bot sends a turn
+
+def room_shard(name, shards):
+    """Shard that owns a room; every shard computes the same answer"""
+    return zlib.crc32(name.encode()) % shards
+
+
+class Connection:
+    """One client socket, written to without waiting so no client can hold up a tick"""
+
+    def __init__(self, writer):
+        self.writer = writer
+        self.room = None
+        self.closed = False
+
+    def send(self, frame):
+        if self.closed:
+            return
+        if self.writer.transport.get_write_buffer_size() > MAX_BUFFERED:
+            # Too far behind to catch up; it can join again for a fresh snapshot
+            self.close()
+            return
+        self.writer.write(frame)
+
+    def close(self):
+        self.closed = True
+        self.writer.close()
+
+
+class Room:
+    """One authoritative game, played by one client and watched by any others.
+
+    The room only sends what clients can't work out themselves: the replay so
+    far when a game starts or someone joins, then one frame per tick with the
+    action applied on it. Clients step the same seeded SnakeEngine with those
+    actions, so they see exactly the server's game for a few bytes per tick;
+    the score and head in each frame let them notice a drift and ask for a
+    new snapshot.
+    """
+
+    def __init__(self, name, width, height, speed, game_mode):
+        self.name = name
+        self.width = width
+        self.height = height
+        self.speed = speed
+        self.game_mode = game_mode
+        self.connections = []
+        self.player = None  # The connection whose inputs steer the snake
+        self.new_game()
+
+    def new_game(self):
+        self.engine = SnakeEngine(self.width, self.height, self.speed, self.game_mode)
+        self.replay = Replay.start(self.engine)
+        self.inputs = InputQueue()  # The player's turns, one per move
+        for connection in self.connections:
+            connection.send(self.snapshot(connection))
+
+    def snapshot(self, connection):
+        return protocol.encode({'type': 'game', 'room': self.name, 'replay': self.replay.to_dict(),
+                                'player': connection is self.player})
+
+    def join(self, connection, spectate=False):
+        self.connections.append(connection)
+        connection.room = self
+        if self.player is None and not spectate:
+            self.player = connection
+        connection.send(self.snapshot(connection))
+
+    def leave(self, connection):
+        self.connections.remove(connection)
+        connection.room = None
+        if connection is self.player:
+            self.player = None  # The next client to join takes over
+
+    def input(self, connection, code):
+        if connection is self.player and isinstance(code, int) and 0 < code < len(ACTIONS):
+            self.inputs.push(ACTIONS[code], self.engine.snake.direction)
+
+    def restart(self, connection):
+        if connection is self.player and self.engine.game_over:
+            self.new_game()
+
+    def tick(self):
+        engine = self.engine
+        if engine.game_over:
+            return
+        action = self.inputs.pop() if engine.will_move() else None
+        self.replay.record(action)
+        engine.step(action)
+        frame = {'type': 'tick', 'tick': engine.ticks, 'action': ACTION_CODES[action],
+                 'score': engine.score, 'head': engine.snake.get_head_position()}
+        if engine.game_over:
+            self.replay.finish(engine)
+            frame['over'] = engine.death_cause
+        frame = protocol.encode(frame)  # Encoded once for every client
+        for connection in self.connections:
+            connection.send(frame)
+
+
+class Shard:
+    """All the rooms of one process, ticked together by a single task on one event loop.
+
+    Rooms are spread over shards by the CRC32 of their name. A client that
+    joins a room on the wrong shard gets a redirect to the port of the right
+    one, so clients only need to know the first port.
+    """
+
+    def __init__(self, index, shards, base_port, board):
+        self.index = index
+        self.shards = shards
+        self.base_port = base_port
+        self.board = board
+        self.rooms = {}
+        self.connections = 0
+        self.tick_count = 0
+        self.tick_time = 0.0  # Seconds spent ticking rooms since the last report
+        self.tick_max = 0.0
+        self.late_ticks = 0
+
+    async def handle(self, reader, writer):
+        connection = Connection(writer)
+        self.connections += 1
+        try:
+            while not connection.closed:
+                message = await protocol.read_message(reader)
+                if not isinstance(message, dict):
+                    break
+                self._dispatch(connection, message)
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+            pass
+        finally:
+            self.connections -= 1
+            self._leave(connection)
+            connection.close()
+
+    def _dispatch(self, connection, message):
+        kind = message.get('type')
+        room = connection.room
+        if kind == 'join':
+            self._join(connection, message)
+        elif room is None:
+            return
+        elif kind == 'input':
+            room.input(connection, message.get('action'))
+        elif kind == 'restart':
+            room.restart(connection)
+        elif kind == 'sync':
+            connection.send(room.snapshot(connection))
+
+    def _join(self, connection, message):
+        name = str(message.get('room', 'lobby'))[:64]
+        shard = room_shard(name, self.shards)
+        if shard != self.index:
+            connection.send(protocol.encode({'type': 'redirect', 'port': self.base_port + shard}))
+            connection.close()
+            return
+        self._leave(connection)
+        room = self.rooms.get(name)
+        if room is None:
+            cols, rows = self.board
+            room = Room(name, cols * SNAKE_BLOCK, rows * SNAKE_BLOCK,
+                        DIFFICULTIES.get(message.get('difficulty'), MEDIUM),
+                        MODES.get(message.get('mode'), CLASSIC_MODE))
+            self.rooms[name] = room
+        room.join(connection, spectate=bool(message.get('spectate')))
+
+    def _leave(self, connection):
+        room = connection.room
+        if room is not None:
+            room.leave(connection)
+            if not room.connections:
+                del self.rooms[room.name]
+
+    async def tick_loop(self):
+        loop = asyncio.get_running_loop()
+        interval = 1 / TICK_RATE
+        next_tick = loop.time()
+        while True:
+            start = time.perf_counter()
+            for room in list(self.rooms.values()):
+                room.tick()
+            elapsed = time.perf_counter() - start
+            self.tick_count += 1
+            self.tick_time += elapsed
+            self.tick_max = max(self.tick_max, elapsed)
+
+            next_tick += interval
+            delay = next_tick - loop.time()
+            if delay < 0:
+                self.late_ticks += 1
+                if delay < -interval * MAX_TICKS_PER_FRAME:
+                    next_tick = loop.time()  # Hopelessly behind: skip ticks instead of bursting
+            await asyncio.sleep(max(delay, 0))
+
+    async def report_loop(self):
+        while True:
+            await asyncio.sleep(STATS_INTERVAL)
+            ticks = max(self.tick_count, 1)
+            print(f"shard {self.index}: {len(self.rooms)} rooms, {self.connections} clients, "
+                  f"tick {self.tick_time / ticks * 1000:.2f} ms mean, {self.tick_max * 1000:.2f} ms max, "
+                  f"{self.tick_time / STATS_INTERVAL:.0%} busy, {self.late_ticks} late", flush=True)
+            self.tick_count = self.late_ticks = 0
+            self.tick_time = self.tick_max = 0.0
+
+    async def serve(self, host):
+        port = self.base_port + self.index
+        server = await asyncio.start_server(self.handle, host, port)
+        print(f"shard {self.index} listening on {host}:{port}", flush=True)
+        async with server:
+            await asyncio.gather(server.serve_forever(), self.tick_loop(), self.report_loop())
+
+
+def run_shard(host, index, shards, base_port, board):
+    """Process entry point of one shard"""
+    try:
+        asyncio.run(Shard(index, shards, base_port, board).serve(host))
+    except KeyboardInterrupt:
+        pass
+
+
+async def join_room(host, port, join):
+    """Connect and join a room, following a redirect to the shard that owns it.
+
+    Returns (reader, writer, first message).
+    """
+    while True:
+        reader, writer = await asyncio.open_connection(host, port)
+        writer.write(protocol.encode(join))
+        message = await protocol.read_message(reader)
+        if message.get('type') != 'redirect':
+            return reader, writer, message
+        writer.close()
+        port = message['port']
+
+
+class BotStats:
+    def __init__(self):
+        self.connected = 0
+        self.ticks = 0
+        self.games = 0
+        self.desyncs = 0
+        self.latencies = []  # Seconds from sending a turn to receiving the tick that applied it
+
+
+async def run_bot(index, host, port, args, stats, deadline):
+    """One client in its own room, turning at random; with verify it also mirrors the game"""
+    rng = random.Random(index)
+    join = {'type': 'join', 'room': f"bot-{index}", 'difficulty': args.difficulty, 'mode': args.mode}
+    try:
+        reader, writer, message = await join_room(host, port, join)
+    except (OSError, asyncio.IncompleteReadError) as e:
+        print(f"bot {index}: cannot join ({e})")
+        return
+    stats.connected += 1
+    engine = None
+    sent = None  # (action code, send time) of the turn not yet applied
+    loop = asyncio.get_running_loop()
+    try:
+        while loop.time() < deadline:
+            if message.get('type') == 'game':
+                sent = None
+                if args.verify:
+                    engine = Replay.from_dict(message['replay']).play()
+            elif message.get('type') == 'tick':
+                stats.ticks += 1
+                if sent is not None and message['action'] == sent[0]:
+                    stats.latencies.append(loop.time() - sent[1])
+                    sent = None
+                if engine is not None:
+                    engine.step(ACTIONS[message['action']])
+                    if engine.score != message['score'] or list(engine.snake.get_head_position()) != message['head']:
+                        stats.desyncs += 1
+                        engine = None
+                        writer.write(protocol.encode({'type': 'sync'}))
+                if 'over' in message:
+                    stats.games += 1
+                    writer.write(protocol.encode({'type': 'restart'}))
+                elif sent is None and rng.random() < BOT_TURN_CHANCE:
+                    code = rng.randrange(1, len(ACTIONS))
+                    writer.write(protocol.encode({'type': 'input', 'action': code}))
+                    sent = (code, loop.time())
+            message = await asyncio.wait_for(protocol.read_message(reader), max(deadline - loop.time(), 0.01))
+    except (asyncio.TimeoutError, asyncio.IncompleteReadError, ConnectionError):
+        pass
+    finally:
+        writer.close()
+
+
+async def run_bots(host, port, args):
+    stats = BotStats()
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+    deadline = start + args.duration
+    await asyncio.gather(*(run_bot(index, host, port, args, stats, deadline) for index in range(args.bots)))
+    elapsed = loop.time() - start
+
+    print(f"{stats.connected}/{args.bots} bots connected, {stats.games} games finished")
+    expected = stats.connected * TICK_RATE * elapsed
+    print(f"{stats.ticks / elapsed:,.0f} ticks/s received ({stats.ticks / max(expected, 1):.0%} of "
+          f"{stats.connected} rooms at {TICK_RATE} Hz)")
+    latencies = sorted(stats.latencies)
+    if latencies:
+        percentile = lambda p: latencies[int(p * (len(latencies) - 1))] * 1000
+        print(f"{len(latencies)} turns: latency p50 {percentile(0.5):.1f} ms, p99 {percentile(0.99):.1f} ms, "
+              f"max {latencies[-1] * 1000:.1f} ms")
+    if args.verify:
+        print(f"{stats.desyncs} desyncs")
+    return 1 if stats.desyncs or stats.connected < args.bots else 0
+
+
+def main(argv=None):
+    """Host multiplayer rooms: python src/server.py, or load test one with --bots 300"""
+    parser = argparse.ArgumentParser(description='Snake server running authoritative headless games')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=protocol.DEFAULT_PORT,
+                        help='port of the first shard; shard N listens on port + N')
+    parser.add_argument('--shards', type=int, default=os.cpu_count(), help='worker processes')
+    parser.add_argument('--board', default=f'{BOARD_COLS}x{BOARD_ROWS}', metavar='COLSxROWS',
+                        help='board size of new rooms')
+    parser.add_argument('--bots', type=int, metavar='N',
+                        help='instead of serving, connect N bots to a running server, one room each')
+    parser.add_argument('--duration', type=float, default=30, help='seconds the bots play')
+    parser.add_argument('--difficulty', choices=DIFFICULTIES, default='medium', help='difficulty of bot rooms')
+    parser.add_argument('--mode', choices=MODES, default='classic', help='game mode of bot rooms')
+    parser.add_argument('--verify', action='store_true',
+                        help='bots also run every game locally and check it against the server')
+    args = parser.parse_args(argv)
+
+    if args.bots:
+        return asyncio.run(run_bots(args.host, args.port, args))
+
+    board = tuple(int(part) for part in args.board.lower().split('x'))
+    shards = max(args.shards, 1)
+    workers = [multiprocessing.Process(target=run_shard, args=(args.host, index, shards, args.port, board),
+                                       name=f'shard-{index}', daemon=True)
+               for index in range(1, shards)]
+    for worker in workers:
+        worker.start()
+    try:
+        run_shard(args.host, 0, shards, args.port, board)
+    finally:
+        for worker in workers:
+            worker.terminate()
+            worker.join()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
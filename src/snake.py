@@ -1,11 +1,56 @@
-import pygame
 import math
 import random
+from collections import deque
+from itertools import islice, cycle
 from constants import *
 
+# pygame is only imported by the drawing code, so the rules (SnakeEngine) run without it
+
+# Body segments cycle through this many precomputed wobble choices
+WOBBLE_PATTERN_LENGTH = 64
+
+_solid_body_sprites = None
+
+def _get_solid_body_sprites():
+    """Plain green block used when there is no body texture, in the same form as the textured sprites"""
+    global _solid_body_sprites
+    import pygame
+    if _solid_body_sprites is None:
+        # Per-pixel alpha format like the textures: batches of small blits measured far faster than opaque
+        block = pygame.Surface((SNAKE_BLOCK, SNAKE_BLOCK), pygame.SRCALPHA)
+        block.fill(GREEN)
+        if pygame.display.get_surface() is not None:
+            block = block.convert_alpha()
+        _solid_body_sprites = [(block, 0, 0)]
+    return _solid_body_sprites
+
+def _make_wobble_pattern(variant_count):
+    """Sprite variant per segment: every other segment is occasionally drawn slightly rotated"""
+    pattern = []
+    for i in range(WOBBLE_PATTERN_LENGTH):
+        if variant_count > 1 and i % 2 == 0 and random.random() > 0.7:
+            pattern.append(random.choice([1, 2, 0]))
+        else:
+            pattern.append(0)
+    return pattern
+
+def _interpolate(start, end, alpha):
+    """Board position a fraction alpha of the way from start to end, in whole pixels"""
+    return (round(start[0] + (end[0] - start[0]) * alpha), round(start[1] + (end[1] - start[1]) * alpha))
+
 class Snake:
-    def __init__(self, texture_manager=None):
-        self.positions = [(100, 100), (80, 100), (60, 100)]
+    def __init__(self, texture_manager=None, free_cells=None):
+        # Body is a deque (head on the left) plus a count of segments per cell,
+        # so moving and self-collision checks don't depend on the snake length
+        self.positions = deque()
+        self.occupancy = {}
+        self.body_version = 0  # Bumped whenever the body changes, for the draw cache
+        self.body_blits = []
+        self.body_blits_key = None
+        self.wobble_pattern = []
+        self.wobble_sprites = None
+        self.free_cells = free_cells  # Optional FreeCellIndex kept in sync with the body
+        self.set_positions([(100, 100), (80, 100), (60, 100)])
         self.direction = (SNAKE_BLOCK, 0)
         self.grow_flag = False
         self.last_direction = self.direction
@@ -31,15 +76,20 @@ class Snake:
         
         head_x, head_y = self.positions[0]
         new_head = (head_x + self.direction[0], head_y + self.direction[1])
-        self.positions.insert(0, new_head)
+        self.positions.appendleft(new_head)
+        self.body_version += 1
+        self.occupancy[new_head] = self.occupancy.get(new_head, 0) + 1
+        if self.free_cells is not None:
+            self.free_cells.occupy(new_head)
         
         # Handle shrink effect
+        removed = []
         if self.shrink_timer > 0 and len(self.positions) > 3:
             # Remove tail segment during shrink
-            self.positions.pop()
-            self.positions.pop()  # Remove two segments for shrink effect
+            removed.append(self._pop_tail())
+            removed.append(self._pop_tail())  # Remove two segments for shrink effect
         elif not self.grow_flag:
-            self.positions.pop()
+            removed.append(self._pop_tail())
         else:
             self.grow_flag = False
             
@@ -75,6 +125,33 @@ class Snake:
         if self.death_animation > 0:
             self.death_animation -= 1
             
+        return removed
+    
+    def _pop_tail(self):
+        tail = self.positions.pop()
+        count = self.occupancy[tail] - 1
+        if count:
+            self.occupancy[tail] = count
+        else:
+            del self.occupancy[tail]
+        if self.free_cells is not None:
+            self.free_cells.release(tail)
+        return tail
+    
+    def set_positions(self, positions):
+        """Replace the whole body (head first), keeping occupancy and free cells in sync"""
+        if self.free_cells is not None:
+            for position in self.positions:
+                self.free_cells.release(position)
+        self.positions.clear()
+        self.positions.extend(positions)
+        self.body_version += 1
+        self.occupancy.clear()
+        for position in positions:
+            self.occupancy[position] = self.occupancy.get(position, 0) + 1
+            if self.free_cells is not None:
+                self.free_cells.occupy(position)
+            
     def apply_powerup(self, food_type):
         if food_type == SPECIAL_FOOD:
             # Special food gives speed boost
@@ -126,26 +203,30 @@ class Snake:
         self.death_animation = 60  # 2 seconds at 30 FPS
             
     def check_collision(self, screen_width, screen_height, obstacle_positions=None):
+        return self.get_collision_cause(screen_width, screen_height, obstacle_positions) is not None
+        
+    def get_collision_cause(self, screen_width, screen_height, obstacle_positions=None):
+        """Return what the head ran into (a DEATH_* constant), or None"""
         # Check if snake hit the wall
         head_x, head_y = self.positions[0]
         if head_x < 0 or head_x >= screen_width or head_y < 0 or head_y >= screen_height:
-            return True
+            return DEATH_WALL
             
         # Check if snake hit obstacles
         if obstacle_positions and self.positions[0] in obstacle_positions:
-            return True
+            return DEATH_OBSTACLE
             
         # Check if snake hit itself (unless in ghost mode)
-        if not self.is_ghost_mode() and self.positions[0] in self.positions[1:]:
-            return True
+        if not self.is_ghost_mode() and self.occupancy[self.positions[0]] > 1:
+            return DEATH_SELF
             
-        return False
+        return None
 
     def grow(self):
         self.grow_flag = True
 
     def reset(self):
-        self.positions = [(100, 100), (80, 100), (60, 100)]
+        self.set_positions([(100, 100), (80, 100), (60, 100)])
         self.direction = (SNAKE_BLOCK, 0)
         self.last_direction = self.direction
         self.grow_flag = False
@@ -168,61 +249,67 @@ class Snake:
         return self.positions[0]
 
     def get_body_positions(self):
-        return self.positions[1:]
+        return list(islice(self.positions, 1, None))
         
     def get_all_positions(self):
         return self.positions
     
-    def draw(self, screen):
+    def occupies(self, position):
+        """Constant time check whether any segment is on position"""
+        return position in self.occupancy
+    
+    def interpolated_head(self, interpolation=None):
+        """Board position the head is drawn at: part way out of the neck while interpolating"""
+        if interpolation is None:
+            return self.positions[0]
+        return _interpolate(interpolation[0], self.positions[0], interpolation[2])
+    
+    def draw(self, screen, camera=None, interpolation=None, area=None, wobble=True):
+        """Draw the snake.
+
+        interpolation is (head before, tail cell left, alpha) between a move
+        and the next tick. With a board rect as area only the body segments in
+        it are drawn, for redrawing a clipped region. wobble=False draws every
+        segment with the same sprite, so a segment only changes when it moves.
+        """
+        import pygame
         use_textures = self.texture_manager and self.texture_manager.use_textures
         
+        # Only segments in view are drawn; the camera shifts board positions to the screen
+        board_head = self.positions[0]
+        offset_x, offset_y = camera.offset if camera is not None else (0, 0)
+        
         # Death animation effect
         if self.is_dying and self.death_animation > 0:
             # Flash effect during death
             flash_intensity = self.death_animation % 10
             if flash_intensity < 5:
                 # Draw with red tint
-                for i, position in enumerate(self.positions):
-                    if i == 0:  # Head
+                for position in self._visible_positions(camera):
+                    if position == board_head:  # Head
                         color = (255, 100, 100)  # Red head
                     else:  # Body
                         color = (200, 50, 50)   # Dark red body
                     
-                    pygame.draw.rect(screen, color, (position[0], position[1], SNAKE_BLOCK, SNAKE_BLOCK))
-                    
-                    # Add explosion particles
-                    if self.death_animation > 30:
-                        for _ in range(3):
-                            particle_x = position[0] + random.randint(-10, 10)
-                            particle_y = position[1] + random.randint(-10, 10)
-                            particle_size = random.randint(2, 4)
-                            pygame.draw.rect(screen, (255, 255, 0), 
-                                           (particle_x, particle_y, particle_size, particle_size))
+                    x, y = position[0] + offset_x, position[1] + offset_y
+                    pygame.draw.rect(screen, color, (x, y, SNAKE_BLOCK, SNAKE_BLOCK))
                 return
         
-        # Draw body segments with pixel art style
-        for i, pos in enumerate(self.positions[1:]):
-            if use_textures:
-                # Use texture for snake body with pixel art styling
-                body_texture = self.texture_manager.get_texture('snake_body')
-                if body_texture:
-                    # Apply slight rotation to alternating segments for visual interest
-                    if i % 2 == 0 and random.random() > 0.7:
-                        # Occasionally rotate slightly for visual variety
-                        angle = random.choice([-2, 2, 0])
-                        rotated_body = pygame.transform.rotate(body_texture, angle)
-                        rect = rotated_body.get_rect(center=(pos[0] + SNAKE_BLOCK/2, pos[1] + SNAKE_BLOCK/2))
-                        screen.blit(rotated_body, rect.topleft)
-                    else:
-                        screen.blit(body_texture, (pos[0], pos[1]))
-                else:
-                    # Fallback to colored rectangle if texture not available
-                    pygame.draw.rect(screen, GREEN, (pos[0], pos[1], SNAKE_BLOCK, SNAKE_BLOCK))
-            else:
-                pygame.draw.rect(screen, GREEN, (pos[0], pos[1], SNAKE_BLOCK, SNAKE_BLOCK))
+        # The tail slides from the cell it left into its current one
+        if interpolation is not None and interpolation[1] is not None and len(self.positions) > 1:
+            tail_x, tail_y = _interpolate(interpolation[1], self.positions[-1], interpolation[2])
+            sprite, dx, dy = self._body_sprites(use_textures)[0]
+            screen.blit(sprite, (tail_x + offset_x + dx, tail_y + offset_y + dy))
+        
+        # Draw body segments with pixel art style, all in one batched blit
+        if area is None:
+            screen.blits(self._get_body_blits(camera, use_textures, wobble), doreturn=False)
+        else:
+            screen.blits(self._area_body_blits(area, camera, use_textures), doreturn=False)
             
         # Draw head with pixel art textures
-        head = self.positions[0]
+        head_x, head_y = self.interpolated_head(interpolation)
+        head = (head_x + offset_x, head_y + offset_y)
         head_size = SNAKE_BLOCK
         pos_offset = 0
         
@@ -246,17 +333,6 @@ class Snake:
                         bigger_head = pygame.transform.scale(head_texture, (int(head_size), int(head_size)))
                         rect = bigger_head.get_rect(center=(head[0] + SNAKE_BLOCK/2, head[1] + SNAKE_BLOCK/2))
                         screen.blit(bigger_head, rect)
-                        
-                        # Add "chomp" effect particles
-                        if self.eating_animation > 10:
-                            # Random small particles around the head
-                            for _ in range(3):
-                                particle_x = head[0] + random.randint(-5, SNAKE_BLOCK + 5)
-                                particle_y = head[1] + random.randint(-5, SNAKE_BLOCK + 5)
-                                particle_size = random.randint(2, 4)
-                                
-                                pygame.draw.rect(screen, YELLOW, 
-                                               (particle_x, particle_y, particle_size, particle_size))
                     else:
                         # Normal drawing
                         screen.blit(head_texture, head)
@@ -336,7 +412,59 @@ class Snake:
                                     indicator_y + py*pixel_size - 2*pixel_size, 
                                     pixel_size, pixel_size))
 
+    def _visible_positions(self, camera):
+        if camera is None:
+            return self.positions
+        return camera.cull(self.positions, self.occupancy)
+    
+    def _body_sprites(self, use_textures):
+        """(sprite, dx, dy) variants for body segments"""
+        sprites = self.texture_manager.get_snake_body_sprites() if use_textures else None
+        return sprites if sprites is not None else _get_solid_body_sprites()
+    
+    def _get_body_blits(self, camera, use_textures, wobble=True):
+        """(sprite, position) pairs for the body, rebuilt only when the body, view or textures change"""
+        sprites = self._body_sprites(use_textures)
+        offset = camera.offset if camera is not None else (0, 0)
+        key = (self.body_version, offset, id(sprites), wobble)
+        if key == self.body_blits_key:
+            return self.body_blits
+        
+        if wobble:
+            # Start the wobble pattern at a random point so the shimmer moves along the body
+            if len(self.wobble_pattern) != WOBBLE_PATTERN_LENGTH or self.wobble_sprites is not sprites:
+                self.wobble_pattern = _make_wobble_pattern(len(sprites))
+                self.wobble_sprites = sprites
+            start = random.randrange(0, WOBBLE_PATTERN_LENGTH, 2)
+            variants = [sprites[index] for index in self.wobble_pattern]
+            variants = variants[start:] + variants[:start]
+        else:
+            variants = sprites[:1]
+        
+        head = self.positions[0]
+        offset_x, offset_y = offset
+        self.body_blits = [(sprite, (x + offset_x + dx, y + offset_y + dy))
+                           for (x, y), (sprite, dx, dy) in zip(
+                               (position for position in self._visible_positions(camera) if position != head),
+                               cycle(variants))]
+        self.body_blits_key = key
+        return self.body_blits
+
+    def _area_body_blits(self, area, camera, use_textures):
+        """(sprite, position) pairs for the unwobbled body segments in a board rect"""
+        sprite, dx, dy = self._body_sprites(use_textures)[0]
+        offset_x, offset_y = camera.offset if camera is not None else (0, 0)
+        occupancy = self.occupancy
+        head = self.positions[0]
+        left = area.left - area.left % SNAKE_BLOCK
+        top = area.top - area.top % SNAKE_BLOCK
+        return [(sprite, (x + offset_x + dx, y + offset_y + dy))
+                for y in range(top, area.bottom, SNAKE_BLOCK)
+                for x in range(left, area.right, SNAKE_BLOCK)
+                if (x, y) in occupancy and (x, y) != head]
+
     def change_direction(self, direction):
-        # Prevent 180 degree turns
-        if (direction[0] * -1, direction[1] * -1) != self.direction:
+        # Prevent 180 degree turns, against the direction of the last move: checking the
+        # direction set since then would let two quick turns reverse into the neck
+        if (direction[0] * -1, direction[1] * -1) != self.last_direction:
             self.direction = direction
\ No newline at end of file
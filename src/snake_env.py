@@ -0,0 +1,225 @@
+import random
+import numpy as np
+from constants import *
+from engine import SnakeEngine
+from food import FOOD_COLORS
+
+try:
+    import gymnasium
+    from gymnasium import spaces
+except ImportError:  # Optional: without it SnakeEnv is a plain class with the same API
+    gymnasium = None
+
+# Observation planes, in channel order
+PLANES = ('body', 'head', 'food_normal', 'food_special', 'food_super', 'food_shrink', 'food_slowmo',
+          'food_double_score', 'food_ghost', 'obstacles', 'boost', 'multiplier', 'shrink', 'slowmo',
+          'double_score', 'ghost')
+BODY, HEAD, FOOD, OBSTACLES, TIMERS = 0, 1, 2, 9, 10  # FOOD + food type is that type's plane
+
+# Snake power-up timers behind the timer planes, and their full durations (a full timer reads 255)
+TIMER_ATTRIBUTES = ('boost_timer', 'multiplier_timer', 'shrink_timer', 'slowmo_timer', 'double_score_timer',
+                    'ghost_timer')
+TIMER_DURATIONS = (300, 300, SHRINK_DURATION, SLOWMO_DURATION, DOUBLE_SCORE_DURATION, GHOST_DURATION)
+
+# Actions: up, right, down, left (as batch_env); -1 or None keeps going straight
+ACTIONS = ((0, -SNAKE_BLOCK), (SNAKE_BLOCK, 0), (0, SNAKE_BLOCK), (-SNAKE_BLOCK, 0))
+
+CELL_PIXELS = 8  # rgb_array scale
+BACKGROUND_COLOR = (16, 16, 32)
+OBSTACLE_COLOR = (128, 128, 128)
+ANSI_FOOD = 'f$*-~2?'  # One character per food type
+
+
+class SnakeEnv(gymnasium.Env if gymnasium else object):
+    """Gymnasium-style environment for one SnakeEngine game.
+
+    One step() is one snake move: the action is applied and the engine ticks
+    until the snake has moved or the game ended. The reward is the score
+    gained during the step.
+
+    Observations are uint8 planes of shape (len(PLANES), rows, cols): body
+    segments per cell, head, one plane per food type, obstacles, and one
+    constant plane per power-up timer scaled to 0..255. They are kept in one
+    buffer that is updated from the engine's events each tick (the cells the
+    head, tail, food and moving obstacles left or entered), never rebuilt
+    from the position lists. step() and reset() return a read-only view of
+    that buffer, so it changes on the next step; copy it to keep it.
+    """
+
+    metadata = {'render_modes': ['rgb_array', 'ansi'], 'render_fps': TICK_RATE}
+
+    def __init__(self, cols=BOARD_COLS, rows=BOARD_ROWS, speed=MEDIUM, game_mode=CLASSIC_MODE, render_mode=None,
+                 max_steps=None):
+        if render_mode is not None and render_mode not in self.metadata['render_modes']:
+            raise ValueError(f"unsupported render mode '{render_mode}'")
+        self.cols = cols
+        self.rows = rows
+        self.speed = speed
+        self.game_mode = game_mode
+        self.render_mode = render_mode
+        self.max_steps = max_steps
+        self.engine = None
+        self.steps = 0
+        self.seed_rng = random.Random()
+
+        self.buffer = np.zeros((len(PLANES), rows, cols), dtype=np.uint8)
+        self.observation = self.buffer.view()
+        self.observation.flags.writeable = False
+        self.planes = {name: self.observation[index] for index, name in enumerate(PLANES)}
+        self.flat = self.buffer.reshape(len(PLANES), -1)  # Same memory, indexed by cell
+        if gymnasium:
+            self.observation_space = spaces.Box(0, 255, self.buffer.shape, dtype=np.uint8)
+            self.action_space = spaces.Discrete(len(ACTIONS))
+
+    def reset(self, seed=None, options=None):
+        """Start a new game; a seed makes this and every later game reproducible"""
+        if seed is not None:
+            self.seed_rng = random.Random(seed)
+        game_seed = self.seed_rng.getrandbits(32)
+        if self.engine is None:
+            self.engine = SnakeEngine(self.cols * SNAKE_BLOCK, self.rows * SNAKE_BLOCK, self.speed, self.game_mode,
+                                      seed=game_seed)
+        else:
+            self.engine.reset(game_seed)
+        self.steps = 0
+        self._rebuild()
+        return self.observation, self._info()
+
+    def step(self, action):
+        """Move once; returns (observation, reward, terminated, truncated, info)"""
+        engine = self.engine
+        direction = ACTIONS[action] if action is not None and action >= 0 else None
+        score = engine.score
+        while True:
+            events = engine.step(direction)
+            direction = None
+            self._apply(events)
+            if engine.game_over or (events and events[0][0] == EVENT_MOVE):
+                break
+        self.steps += 1
+        truncated = bool(self.max_steps) and self.steps >= self.max_steps and not engine.game_over
+        return self.observation, engine.score - score, engine.game_over, truncated, self._info()
+
+    def _info(self):
+        engine = self.engine
+        return {'score': engine.score, 'length': len(engine.snake.positions), 'ticks': engine.ticks,
+                'cause': engine.death_cause, 'seed': engine.seed}
+
+    def _cell(self, position):
+        """Flat cell index, or None off the board (a head that hit the wall)"""
+        col = position[0] // SNAKE_BLOCK
+        row = position[1] // SNAKE_BLOCK
+        if 0 <= col < self.cols and 0 <= row < self.rows:
+            return row * self.cols + col
+        return None
+
+    def _rebuild(self):
+        """Fill the planes from scratch, after a reset"""
+        flat = self.flat
+        self.buffer.fill(0)
+        snake = self.engine.snake
+        for position in snake.positions:
+            cell = self._cell(position)
+            if cell is not None:
+                flat[BODY, cell] += 1
+        self.head = self._cell(snake.positions[0])
+        if self.head is not None:
+            flat[HEAD, self.head] = 1
+        self.food = None
+        self._update_food()
+        self.moving = []
+        self._add_obstacles(self.engine.obstacle_manager.obstacles)
+        self.timers = [0] * len(TIMER_ATTRIBUTES)
+        self._update_timers()
+
+    def _apply(self, events):
+        """Update the planes for one tick's events"""
+        flat = self.flat
+        for event in events:
+            kind = event[0]
+            if kind == EVENT_MOVE:
+                if self.head is not None:
+                    flat[HEAD, self.head] = 0
+                self.head = self._cell(event[1])
+                if self.head is not None:
+                    flat[HEAD, self.head] = 1
+                    flat[BODY, self.head] += 1
+                for position in event[2]:
+                    cell = self._cell(position)
+                    if cell is not None:
+                        flat[BODY, cell] -= 1
+            elif kind == EVENT_OBSTACLE_ADD:
+                self._add_obstacles(self.engine.obstacle_manager.obstacles[-1:])
+        if events:
+            self._update_timers()  # Timers only change when the snake moves or eats
+        self._update_food()  # A special food can also turn normal on its own
+        for entry in self.moving:
+            obstacle, cell = entry
+            new_cell = self._cell(obstacle.get_position())
+            if new_cell != cell:
+                flat[OBSTACLES, cell] -= 1
+                flat[OBSTACLES, new_cell] += 1
+                entry[1] = new_cell
+
+    def _update_food(self):
+        food = self.engine.food
+        position = food.position
+        current = (self._cell(position) if position is not None else None, food.food_type)
+        if current != self.food:
+            if self.food is not None and self.food[0] is not None:
+                self.flat[FOOD + self.food[1], self.food[0]] = 0
+            if current[0] is not None:
+                self.flat[FOOD + current[1], current[0]] = 1
+            self.food = current
+
+    def _add_obstacles(self, obstacles):
+        for obstacle in obstacles:
+            cell = self._cell(obstacle.get_position())
+            self.flat[OBSTACLES, cell] += 1
+            if obstacle.type == "moving":
+                self.moving.append([obstacle, cell])
+
+    def _update_timers(self):
+        snake = self.engine.snake
+        for index, attribute in enumerate(TIMER_ATTRIBUTES):
+            value = getattr(snake, attribute)
+            if value != self.timers[index]:
+                self.timers[index] = value
+                duration = TIMER_DURATIONS[index]
+                self.buffer[TIMERS + index].fill(min(255, -(-max(value, 0) * 255 // duration)))
+
+    def render(self):
+        if self.render_mode == 'rgb_array':
+            return self._render_rgb()
+        if self.render_mode == 'ansi':
+            return self._render_ansi()
+        return None
+
+    def _render_rgb(self):
+        """(rows * CELL_PIXELS, cols * CELL_PIXELS, 3) image of the board"""
+        planes = self.buffer
+        image = np.empty((self.rows, self.cols, 3), dtype=np.uint8)
+        image[:] = BACKGROUND_COLOR
+        image[planes[BODY] > 0] = GREEN
+        image[planes[OBSTACLES] > 0] = OBSTACLE_COLOR
+        for food_type in range(OBSTACLES - FOOD):
+            image[planes[FOOD + food_type] > 0] = FOOD_COLORS[food_type]
+        image[planes[HEAD] > 0] = YELLOW
+        return image.repeat(CELL_PIXELS, axis=0).repeat(CELL_PIXELS, axis=1)
+
+    def _render_ansi(self):
+        planes = self.buffer
+        board = np.full((self.rows, self.cols), '.', dtype='<U1')
+        board[planes[BODY] > 0] = 'o'
+        board[planes[OBSTACLES] > 0] = '#'
+        for food_type in range(OBSTACLES - FOOD):
+            board[planes[FOOD + food_type] > 0] = ANSI_FOOD[food_type]
+        board[planes[HEAD] > 0] = '@'
+        info = self._info()
+        status = f"score {info['score']}  length {info['length']}  tick {info['ticks']}"
+        if info['cause']:
+            status += f"  ({info['cause']})"
+        return '\n'.join(''.join(row) for row in board) + '\n' + status + '\n'
+
+    def close(self):
+        pass
@@ -2,42 +2,52 @@ import pygame
 import os
 from constants import *
 
+# Sound effects and the files they are loaded from
+SOUND_FILES = {
+    'eat': 'Collect_Point_2.wav',
+    'special': 'Character_Vowel_4.wav',
+    'super': 'High_Score.wav',
+    'crash': 'Orc_Hit03.wav',
+    'menu_select': 'Menu_Select2.wav',
+    'menu_change': 'Spring1.wav',
+    'pause': 'Animal_Vowel_4.wav'
+}
+
 class SoundManager:
-    def __init__(self):
+    def __init__(self, loader=None):
         self.sounds = {}
         self.music_playing = False
         self.sound_enabled = True
         self.music_enabled = True
-        self.load_sounds()
-        
-    def load_sounds(self):
-        # Initialize pygame mixer if not already initialized
+        # Initialize pygame mixer if not already initialized (on the main thread)
         if not pygame.mixer.get_init():
             pygame.mixer.init()
-            
-        # Map sound effects to files
-        sound_mapping = {
-            'eat': 'Collect_Point_2.wav',
-            'special': 'Character_Vowel_4.wav',
-            'super': 'High_Score.wav',
-            'crash': 'Orc_Hit03.wav',
-            'menu_select': 'Menu_Select2.wav',
-            'menu_change': 'Spring1.wav',
-            'pause': 'Animal_Vowel_4.wav'
-        }
+        if loader is None:
+            self.load_sounds()
+        else:
+            self.add_jobs(loader)
+    
+    def add_jobs(self, loader):
+        """Register one AssetLoader job per sound effect"""
+        for sound_name, filename in SOUND_FILES.items():
+            loader.add(f'sound.{sound_name}', lambda name=sound_name, file=filename: self.load_sound(name, file))
         
+    def load_sounds(self):
         # Load each sound effect
-        for sound_name, filename in sound_mapping.items():
-            filepath = os.path.join(SOUND_DIR, filename)
-            if os.path.exists(filepath):
-                try:
-                    self.sounds[sound_name] = pygame.mixer.Sound(filepath)
-                except Exception as e:
-                    print(f"Error loading sound {sound_name}: {e}")
-                    self.sounds[sound_name] = self._create_placeholder_sound(sound_name)
-            else:
-                print(f"Sound file not found: {filepath}")
+        for sound_name, filename in SOUND_FILES.items():
+            self.load_sound(sound_name, filename)
+    
+    def load_sound(self, sound_name, filename):
+        filepath = os.path.join(SOUND_DIR, filename)
+        if os.path.exists(filepath):
+            try:
+                self.sounds[sound_name] = pygame.mixer.Sound(filepath)
+            except Exception as e:
+                print(f"Error loading sound {sound_name}: {e}")
                 self.sounds[sound_name] = self._create_placeholder_sound(sound_name)
+        else:
+            print(f"Sound file not found: {filepath}")
+            self.sounds[sound_name] = self._create_placeholder_sound(sound_name)
                 
     def _create_placeholder_sound(self, sound_type):
         # Create a placeholder sound effect in memory
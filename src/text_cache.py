@@ -0,0 +1,49 @@
+import pygame
+from collections import OrderedDict
+
+class TextCache:
+    """Font pool keyed by size plus an LRU cache of rendered text surfaces"""
+    
+    def __init__(self, max_entries=256):
+        self.fonts = {}
+        self.surfaces = OrderedDict()
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        
+    def get_font(self, size):
+        font = self.fonts.get(size)
+        if font is None:
+            font = pygame.font.SysFont(None, size)
+            self.fonts[size] = font
+        return font
+    
+    def render(self, text, size, color):
+        """Return the rendered surface for (text, size, color), rasterizing it only once"""
+        key = (text, size, color)
+        surface = self.surfaces.get(key)
+        if surface is not None:
+            self.hits += 1
+            self.surfaces.move_to_end(key)
+            return surface
+        
+        self.misses += 1
+        surface = self.get_font(size).render(text, True, color)
+        self.surfaces[key] = surface
+        if len(self.surfaces) > self.max_entries:
+            self.surfaces.popitem(last=False)  # Drop the least recently used text
+        return surface
+    
+    def get_stats(self):
+        total = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / total if total else 0.0,
+            'entries': len(self.surfaces),
+            'fonts': len(self.fonts),
+        }
+    
+    def clear(self):
+        self.surfaces.clear()
+        self.fonts.clear()
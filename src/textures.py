@@ -2,15 +2,55 @@ import pygame
 import os
 import random
 import math
+import time
+import numpy as np
 from constants import *
+from loader import AssetLoader
+
+def background_period(width, height, textured):
+    """Size of the background tile for a screen: the checkerboard repeats every two tiles, so round up to that"""
+    pattern = 80 if textured else 64
+    return (-(-width // pattern) * pattern, -(-height // pattern) * pattern)
+
 
 class TextureManager:
-    def __init__(self):
+    """Loads and generates every texture, then serves them to the game.
+
+    Pass an AssetLoader to have the work done as loader jobs (on its worker
+    thread); without one everything is built right away. Textures are only
+    converted to the display format at the end, on the main thread.
+    """
+
+    def __init__(self, loader=None):
         self.textures = {}
         self.use_textures = True
         self.pixel_art_mode = True
-        self.load_textures()
-        self.create_pixel_art_assets()
+        # Full-screen background in display format, keyed by (screen size, texture mode).
+        # The scroll layer is the same pattern one period larger than the screen;
+        # it repeats every background_period pixels, so any camera position maps
+        # to a single blit from it.
+        self.background_layer = None
+        self.scroll_layer = None
+        self.background_key = None
+        self.background_period = (SCREEN_WIDTH, SCREEN_HEIGHT)
+        self.snake_body_sprites = []
+        self.create_palette()
+        if loader is None:
+            loader = AssetLoader()
+            self.add_jobs(loader)
+            loader.run()
+        else:
+            self.add_jobs(loader)
+    
+    def add_jobs(self, loader):
+        """Register the texture work with an AssetLoader"""
+        loader.add('textures.files', self.load_textures)
+        # The generated textures replace most of the file ones, so they come after
+        loader.add('textures.snake', self.create_snake_textures, after=['textures.files'], weight=2)
+        loader.add('textures.food', self.create_food_textures, after=['textures.files'])
+        loader.add('textures.background', self._create_background_tile, after=['textures.files'], weight=12)
+        loader.add('textures.ui', self.create_ui_elements, weight=25)
+        loader.on_main(self.convert_for_display)
         
     def load_textures(self):
         # Dictionary mapping texture names to file paths
@@ -23,23 +63,27 @@ class TextureManager:
             'background': os.path.join(IMAGE_DIR, 'snake.p8.png')
         }
         
-        # Coba load setiap texture
+        # Coba load setiap texture (each file only once, several names can share it)
+        images = {}
         for texture_name, filepath in texture_files.items():
-            if os.path.exists(filepath):
-                try:
-                    # Load texture dan simpan ukuran aslinya
-                    original_image = pygame.image.load(filepath).convert_alpha()
-                    
-                    # Simpan gambar original di dictionary textures
-                    self.textures[texture_name] = original_image
-                except Exception as e:
-                    print(f"Error loading texture {texture_name}: {e}")
-                    self.textures[texture_name] = None
-            else:                # Jika file tidak ada, set texture ke None
-                print(f"Texture file not found: {filepath}")
-                self.textures[texture_name] = None
+            if filepath not in images:
+                images[filepath] = self._load_image(filepath)
+            # Simpan gambar original di dictionary textures
+            self.textures[texture_name] = images[filepath]
     
-    def create_pixel_art_assets(self):
+    def _load_image(self, filepath):
+        """Decode an image file; conversion to the display format happens later"""
+        if not os.path.exists(filepath):
+            # Jika file tidak ada, set texture ke None
+            print(f"Texture file not found: {filepath}")
+            return None
+        try:
+            return pygame.image.load(filepath)
+        except Exception as e:
+            print(f"Error loading texture {filepath}: {e}")
+            return None
+    
+    def create_palette(self):
         # Buat palette warna 8-bit
         self.pixel_colors = {
             'black': (0, 0, 0),
@@ -69,12 +113,21 @@ class TextureManager:
             'pixel_orange': (247, 118, 34),
             'electric_blue': (48, 96, 255)
         }
-        
-        # Buat tekstur pixel art untuk berbagai elemen game
-        self.create_snake_textures()
-        self.create_food_textures()
-        self.create_background_texture()
-        self.create_ui_elements()
+    
+    def convert_for_display(self):
+        """Convert every texture to the display's pixel format; main thread only"""
+        if pygame.display.get_surface() is None:
+            return
+        converted = {}  # Shared surfaces are converted once and stay shared
+        def convert(surface):
+            if id(surface) not in converted:
+                converted[id(surface)] = (surface.convert_alpha() if surface.get_flags() & pygame.SRCALPHA
+                                          else surface.convert())
+            return converted[id(surface)]
+        for name, texture in self.textures.items():
+            if texture is not None:
+                self.textures[name] = convert(texture)
+        self.snake_body_sprites = [(convert(sprite), dx, dy) for sprite, dx, dy in self.snake_body_sprites]
         
     def create_snake_textures(self):
         # Snake head (base texture) - create a more detailed pixel art style
@@ -207,6 +260,13 @@ class TextureManager:
         
         self.textures['snake_body'] = body_surface
         
+        # Slightly rotated copies for the body wobble, made once instead of every frame
+        self.snake_body_sprites = []
+        for angle in (0, -2, 2):
+            sprite = pygame.transform.rotate(body_surface, angle) if angle else body_surface
+            rect = sprite.get_rect(center=(size / 2, size / 2))
+            self.snake_body_sprites.append((sprite, rect.x, rect.y))
+        
     def create_food_textures(self):
         size = SNAKE_BLOCK
         pixel_size = max(1, size // 10)  # Fine-grained pixel size
@@ -456,51 +516,58 @@ class TextureManager:
         
         self.textures['ghost_food'] = surface  # Don't pixelate to keep transparency
     
-    def create_background_texture(self):
+    def _create_background_tile(self, width=SCREEN_WIDTH, height=SCREEN_HEIGHT):
+        """Loader job: the background tile get_background_layer() will want for this screen size"""
+        self.create_background_texture(*background_period(width, height, textured=True))
+    
+    def create_background_texture(self, width=SCREEN_WIDTH, height=SCREEN_HEIGHT):
         # Create a retro pixel art background
         # Define grid sizes for the pixel art background
         tile_size = 40
         pixel_size = 4  # Size of each "pixel" in the pixel art
         
         # Create empty background
-        background = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
+        background = pygame.Surface((width, height))
         
         # Base colors for the grid
-        base_color1 = self.pixel_colors['dark_blue']
-        base_color2 = self.pixel_colors['dark_teal']
-        
-        # Create pixel art grid pattern
-        for grid_y in range(0, SCREEN_HEIGHT, tile_size):
-            for grid_x in range(0, SCREEN_WIDTH, tile_size):
-                # Alternate colors in a checkerboard pattern
-                base_color = base_color1 if (grid_x // tile_size + grid_y // tile_size) % 2 == 0 else base_color2
-                
-                # Fill the current grid tile with pixel art
-                for y in range(0, tile_size, pixel_size):
-                    for x in range(0, tile_size, pixel_size):
-                        # Add some noise/variation to create a textured look
-                        noise = random.randint(-10, 10)
-                        color = (
-                            max(0, min(255, base_color[0] + noise)),
-                            max(0, min(255, base_color[1] + noise)),
-                            max(0, min(255, base_color[2] + noise))
-                        )
-                        
-                        # Draw the "pixel"
-                        pygame.draw.rect(background, color, 
-                                        (grid_x + x, grid_y + y, pixel_size, pixel_size))
+        base_color1 = np.array(self.pixel_colors['dark_blue'])
+        base_color2 = np.array(self.pixel_colors['dark_teal'])
+        
+        # Work on whole tiles of "pixels" (blocks), indexed [x, y] like surfarray
+        tiles_x = -(-width // tile_size)
+        tiles_y = -(-height // tile_size)
+        blocks_per_tile = tile_size // pixel_size
+        block_x = np.arange(tiles_x * blocks_per_tile)[:, None]
+        block_y = np.arange(tiles_y * blocks_per_tile)[None, :]
+        
+        # Alternate colors in a checkerboard pattern
+        checker = (block_x // blocks_per_tile + block_y // blocks_per_tile) % 2 == 1
+        base = np.where(checker[:, :, None], base_color2, base_color1)
+        
+        # Add some noise/variation to create a textured look
+        noise = self._background_noise(tiles_x * blocks_per_tile, tiles_y * blocks_per_tile)
+        blocks = np.clip(base + noise[:, :, None], 0, 255).astype(np.uint8)
+        
+        # Blow every block up to pixel_size x pixel_size screen pixels
+        pixels = blocks.repeat(pixel_size, axis=0).repeat(pixel_size, axis=1)
+        pygame.surfarray.blit_array(background, pixels[:width, :height])
         
         # Add a subtle grid overlay
-        for y in range(0, SCREEN_HEIGHT, tile_size):
+        for y in range(0, height, tile_size):
             pygame.draw.line(background, self.pixel_colors['dark_gray'], 
-                            (0, y), (SCREEN_WIDTH, y), 1)
+                            (0, y), (width, y), 1)
         
-        for x in range(0, SCREEN_WIDTH, tile_size):
+        for x in range(0, width, tile_size):
             pygame.draw.line(background, self.pixel_colors['dark_gray'], 
-                            (x, 0), (x, SCREEN_HEIGHT), 1)
+                            (x, 0), (x, height), 1)
         
         # Save the background texture
         self.textures['background'] = background
+    
+    def _background_noise(self, blocks_x, blocks_y):
+        """Per-block brightness noise in [-10, 10], seeded from the random module"""
+        rng = np.random.default_rng(random.getrandbits(32))
+        return rng.integers(-10, 11, size=(blocks_x, blocks_y))
         
     def create_ui_elements(self):
         """Create pixel art UI elements like buttons, score displays, etc."""
@@ -510,35 +577,26 @@ class TextureManager:
         pixel_size = 2
         
         # Normal button
-        button_normal = pygame.Surface((button_width, button_height), pygame.SRCALPHA)
+        rgba = np.zeros((button_width, button_height, 4), dtype=np.uint8)
+        x, y = self._pixel_grid(button_width, button_height, pixel_size)
         
         # Button fill - dark center with lighter borders
-        for y in range(0, button_height, pixel_size):
-            for x in range(0, button_width, pixel_size):
-                # Border area
-                is_border = (x < pixel_size*3 or x >= button_width - pixel_size*3 or 
-                            y < pixel_size*3 or y >= button_height - pixel_size*3)
-                
-                # Corner pixels
-                is_corner = ((x < pixel_size*5 or x >= button_width - pixel_size*5) and
-                            (y < pixel_size*5 or y >= button_height - pixel_size*5))
-                
-                if is_corner:
-                    # Leave corners transparent for rounded effect
-                    continue
-                elif is_border:
-                    pygame.draw.rect(button_normal, self.pixel_colors['electric_blue'], 
-                                    (x, y, pixel_size, pixel_size))
-                else:
-                    pygame.draw.rect(button_normal, self.pixel_colors['dark_blue'], 
-                                    (x, y, pixel_size, pixel_size))
+        is_border = ((x < pixel_size*3) | (x >= button_width - pixel_size*3) |
+                     (y < pixel_size*3) | (y >= button_height - pixel_size*3))
+        
+        # Corner pixels, left transparent for rounded effect
+        is_corner = (((x < pixel_size*5) | (x >= button_width - pixel_size*5)) &
+                     ((y < pixel_size*5) | (y >= button_height - pixel_size*5)))
         
-        # Add scanlines for retro effect
-        for y in range(pixel_size*3, button_height - pixel_size*3, pixel_size*4):
-            for x in range(pixel_size*5, button_width - pixel_size*5, pixel_size):
-                pygame.draw.rect(button_normal, self.pixel_colors['blue'], 
-                                (x, y, pixel_size, pixel_size//2))
+        rgba[~is_corner & is_border] = self.pixel_colors['electric_blue'] + (255,)
+        rgba[~is_corner & ~is_border] = self.pixel_colors['dark_blue'] + (255,)
         
+        # Add scanlines for retro effect (half a "pixel" tall)
+        scan_rows = np.arange(pixel_size*3, button_height - pixel_size*3, pixel_size*4)
+        scan_rows = (scan_rows[:, None] + np.arange(pixel_size//2)).ravel()
+        rgba[pixel_size*5:button_width - pixel_size*5, scan_rows] = self.pixel_colors['blue'] + (255,)
+        
+        button_normal = self._surface_from_rgba(rgba)
         self.textures['button_normal'] = button_normal
         
         # Hover button (brighter)
@@ -552,20 +610,15 @@ class TextureManager:
         # Score display background
         score_bg_width = 120
         score_bg_height = 40
-        score_bg = pygame.Surface((score_bg_width, score_bg_height), pygame.SRCALPHA)
         
         # Fill with pixel pattern
-        for y in range(0, score_bg_height, pixel_size):
-            for x in range(0, score_bg_width, pixel_size):
-                is_border = (x < pixel_size*2 or x >= score_bg_width - pixel_size*2 or 
-                            y < pixel_size*2 or y >= score_bg_height - pixel_size*2)
-                
-                if is_border:
-                    pygame.draw.rect(score_bg, self.pixel_colors['yellow'], 
-                                    (x, y, pixel_size, pixel_size))
-                else:
-                    pygame.draw.rect(score_bg, (0, 0, 0, 180), 
-                                    (x, y, pixel_size, pixel_size))
+        x, y = self._pixel_grid(score_bg_width, score_bg_height, pixel_size)
+        is_border = ((x < pixel_size*2) | (x >= score_bg_width - pixel_size*2) |
+                     (y < pixel_size*2) | (y >= score_bg_height - pixel_size*2))
+        rgba = np.empty((score_bg_width, score_bg_height, 4), dtype=np.uint8)
+        rgba[is_border] = self.pixel_colors['yellow'] + (255,)
+        rgba[~is_border] = (0, 0, 0, 180)
+        score_bg = self._surface_from_rgba(rgba)
         
         self.textures['score_bg'] = score_bg
         
@@ -577,24 +630,34 @@ class TextureManager:
             pygame.draw.line(gameover_overlay, (0, 0, 0, 150), 
                             (0, y), (SCREEN_WIDTH, y), pixel_size)
         
-        # Add vignette effect (darker at edges)
-        vignette = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT), pygame.SRCALPHA)
-        for y in range(SCREEN_HEIGHT):
-            for x in range(SCREEN_WIDTH):
-                # Calculate distance from center (normalized)
-                dx = abs(x - SCREEN_WIDTH/2) / (SCREEN_WIDTH/2)
-                dy = abs(y - SCREEN_HEIGHT/2) / (SCREEN_HEIGHT/2)
-                distance = (dx**2 + dy**2)**0.5
-                
-                # Stronger effect at the edges
-                alpha = int(min(255, distance * 150))
-                if x % pixel_size == 0 and y % pixel_size == 0:  # Keep pixelated look
-                    pygame.draw.rect(vignette, (0, 0, 0, alpha), 
-                                    (x, y, pixel_size, pixel_size))
+        # Add vignette effect (darker at edges), as a distance field over the
+        # top-left pixel of every block to keep the pixelated look
+        x, y = self._pixel_grid(SCREEN_WIDTH, SCREEN_HEIGHT, pixel_size)
+        dx = np.abs(x - SCREEN_WIDTH/2) / (SCREEN_WIDTH/2)
+        dy = np.abs(y - SCREEN_HEIGHT/2) / (SCREEN_HEIGHT/2)
+        distance = np.sqrt(dx**2 + dy**2)
+        
+        # Stronger effect at the edges
+        rgba = np.zeros((SCREEN_WIDTH, SCREEN_HEIGHT, 4), dtype=np.uint8)
+        rgba[:, :, 3] = np.minimum(255, distance * 150).astype(np.uint8)
+        vignette = self._surface_from_rgba(rgba)
         
         gameover_overlay.blit(vignette, (0, 0))
         self.textures['gameover_overlay'] = gameover_overlay
     
+    def _pixel_grid(self, width, height, pixel_size):
+        """Coordinates [x, y] of the top-left corner of the "pixel" each screen pixel belongs to"""
+        x = (np.arange(width) // pixel_size * pixel_size)[:, None]
+        y = (np.arange(height) // pixel_size * pixel_size)[None, :]
+        return np.broadcast_to(x, (width, height)), np.broadcast_to(y, (width, height))
+    
+    def _surface_from_rgba(self, rgba):
+        """Build an SRCALPHA surface from a (width, height, 4) uint8 array"""
+        surface = pygame.Surface(rgba.shape[:2], pygame.SRCALPHA)
+        pygame.surfarray.pixels3d(surface)[...] = rgba[:, :, :3]
+        pygame.surfarray.pixels_alpha(surface)[...] = rgba[:, :, 3]
+        return surface
+    
     def pixelate_surface(self, surface, pixel_size=4):
         """Applies a pixelation effect to a surface."""
         width, height = surface.get_size()
@@ -616,6 +679,12 @@ class TextureManager:
             return self.textures[texture_name]
         return None
         
+    def get_snake_body_sprites(self):
+        """Body sprite and its wobble variants as (surface, dx, dy), or None without textures"""
+        if self.use_textures and self.get_texture('snake_body') is not None:
+            return self.snake_body_sprites
+        return None
+    
     def get_snake_head_texture(self, direction):
         """Get the appropriate snake head texture based on direction."""
         if direction == (0, -SNAKE_BLOCK):  # UP
@@ -631,30 +700,101 @@ class TextureManager:
             return self.textures[texture_name]
         return None
     
-    def draw_background(self, screen):
-        """Draw a pixel art background for the game."""
-        # Create a simple grid pattern background
+    def draw_background(self, screen, camera=None, rect=None):
+        """Draw a pixel art background for the game, or only the part under rect."""
+        layer = self.get_background_layer(screen)
+        if rect is None:
+            rect = screen.get_rect()
+        area = self.background_area(rect, camera)
+        if area.right > layer.get_width() or area.bottom > layer.get_height():
+            # Scrolled past the screen-sized copy (a plain full-width blit is faster)
+            layer = self.scroll_layer
+        screen.blit(layer, rect, area)
+    
+    def background_area(self, rect, camera=None):
+        """Area of the background layer that belongs under a screen rect for this camera"""
+        if camera is None:
+            return rect
+        period_x, period_y = self.background_period
+        return rect.move(camera.x % period_x, camera.y % period_y)
+    
+    def get_background_layer(self, screen):
+        """Return the cached background, rebuilding it if the screen size or texture mode changed"""
+        key = (screen.get_size(), self.use_textures)
+        if key != self.background_key:
+            width, height = key[0]
+            period = background_period(width, height, self.use_textures)
+            if self.use_textures:
+                tile = self.textures.get('background')
+                if tile is None or tile.get_size() != period:
+                    self.create_background_texture(*period)
+                    tile = self.textures['background']
+            else:
+                tile = self._create_grid_background(*period)
+            
+            scroll_layer = pygame.Surface((period[0] + width, period[1] + height))
+            for x in (0, period[0]):
+                for y in (0, period[1]):
+                    scroll_layer.blit(tile, (x, y))
+            
+            # Match the display pixel format so the per-frame blit is a plain copy
+            if pygame.display.get_surface() is not None:
+                scroll_layer = scroll_layer.convert()
+            self.scroll_layer = scroll_layer
+            self.background_layer = scroll_layer.subsurface((0, 0, width, height)).copy()
+            self.background_key = key
+            self.background_period = period
+        return self.background_layer
+    
+    def _create_grid_background(self, width, height):
+        """Plain checkerboard used when textures are turned off"""
+        background = pygame.Surface((width, height))
         grid_size = 32
         dark_color = self.pixel_colors['dark_blue']
         light_color = self.pixel_colors['dark_green']
         
-        for y in range(0, 600, grid_size):  # Use hardcoded values for now
-            for x in range(0, 800, grid_size):
+        for y in range(0, height, grid_size):
+            for x in range(0, width, grid_size):
                 # Checkerboard pattern
                 if (x // grid_size + y // grid_size) % 2 == 0:
                     color = dark_color
                 else:
                     color = light_color
                     
-                pygame.draw.rect(screen, color, (x, y, grid_size, grid_size))
+                background.fill(color, (x, y, grid_size, grid_size))
                 
         # Add some subtle border lines
         border_color = self.pixel_colors['dark_gray']
-        for y in range(0, 600, grid_size):
-            pygame.draw.line(screen, border_color, (0, y), (800, y), 1)
-        for x in range(0, 800, grid_size):
-            pygame.draw.line(screen, border_color, (x, 0), (x, 600), 1)
+        for y in range(0, height, grid_size):
+            pygame.draw.line(background, border_color, (0, y), (width, y), 1)
+        for x in range(0, width, grid_size):
+            pygame.draw.line(background, border_color, (x, 0), (x, height), 1)
+        return background
     
     def toggle_textures(self):
         self.use_textures = not self.use_textures
         return self.use_textures
+
+
+def benchmark_startup(repeats=5):
+    """Time TextureManager construction and each procedural generator"""
+    os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+    pygame.init()
+    pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+    
+    start = time.perf_counter()
+    for _ in range(repeats):
+        manager = TextureManager()
+    print(f"TextureManager(): {(time.perf_counter() - start) / repeats * 1000:.1f} ms")
+    
+    for name in ['create_snake_textures', 'create_food_textures',
+                 'create_background_texture', 'create_ui_elements']:
+        start = time.perf_counter()
+        for _ in range(repeats):
+            getattr(manager, name)()
+        print(f"  {name}: {(time.perf_counter() - start) / repeats * 1000:.1f} ms")
+    pygame.quit()
+
+
+if __name__ == "__main__":
+    benchmark_startup()
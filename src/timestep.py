@@ -0,0 +1,51 @@
+import time
+from constants import *
+
+class FixedTimestep:
+    """Accumulator that turns elapsed wall-clock time into fixed game ticks.
+    
+    The render loop calls advance() once per frame and runs update() as many
+    times as it returns, so game speed depends only on TICK_RATE and not on
+    how fast (or unevenly) frames are drawn. alpha tells the renderer how far
+    it is between the last tick and the next one.
+    """
+    
+    def __init__(self, tick_rate=TICK_RATE, max_ticks_per_frame=MAX_TICKS_PER_FRAME):
+        self.tick_duration = 1.0 / tick_rate
+        self.max_ticks_per_frame = max_ticks_per_frame
+        self.accumulator = 0.0
+        self.previous_time = None
+        self.total_ticks = 0
+        self.dropped_time = 0.0  # Time thrown away after stalls longer than the catch-up limit
+        
+    def advance(self, now=None):
+        """Add the time since the last call and return how many ticks to run"""
+        if now is None:
+            now = time.perf_counter()
+        if self.previous_time is None:
+            # Run the first tick right away so there is something to draw
+            self.previous_time = now
+            self.total_ticks += 1
+            return 1
+        
+        self.accumulator += now - self.previous_time
+        self.previous_time = now
+        
+        ticks = int(self.accumulator / self.tick_duration)
+        if ticks > self.max_ticks_per_frame:
+            # After a long stall, skip ahead instead of simulating every missed tick
+            self.dropped_time += (ticks - self.max_ticks_per_frame) * self.tick_duration
+            ticks = self.max_ticks_per_frame
+        self.accumulator = max(0.0, self.accumulator - ticks * self.tick_duration)
+        self.accumulator = min(self.accumulator, self.tick_duration)
+        self.total_ticks += ticks
+        return ticks
+    
+    @property
+    def alpha(self):
+        """Fraction of a tick accumulated since the last one (0..1)"""
+        return min(1.0, self.accumulator / self.tick_duration)
+    
+    def reset(self):
+        self.accumulator = 0.0
+        self.previous_time = None
@@ -0,0 +1,67 @@
+import random
+
+import numpy as np
+
+import engine as engine_module
+from batch_env import SnakeBatchEnv, UP, RIGHT, DOWN, LEFT
+from constants import *
+from engine import SnakeEngine
+
+DIRECTIONS = {UP: (0, -1), RIGHT: (1, 0), DOWN: (0, 1), LEFT: (-1, 0)}
+
+
+class FixedRolls:
+    """Stands in for both games' generators: every special roll lands on SPECIAL_FOOD"""
+
+    def random(self, size=None):
+        return 0.1 if size is None else np.full(size, 0.1)
+
+    def randrange(self, n):
+        return 0
+
+    def choice(self, options):
+        return options[0]
+
+
+def toward(head, food, direction):
+    """Direction index that steps the head (col, row) toward the food without reversing"""
+    wanted = [RIGHT if food[0] > head[0] else LEFT if food[0] < head[0] else None,
+              DOWN if food[1] > head[1] else UP if food[1] < head[1] else None]
+    for choice in wanted + [(direction + 1) % 4]:
+        if choice is not None and choice != (direction + 2) % 4:
+            return choice
+    return direction
+
+
+def test_special_food_schedule_matches_engine(monkeypatch):
+    """The batch env rolls for special food on the same spawns as SnakeEngine"""
+    spawns = 12
+    monkeypatch.setattr(engine_module.random, 'Random', lambda seed: FixedRolls())
+
+    game = SnakeEngine(speed=HARD, game_mode=TIME_ATTACK_MODE, seed=0)
+    engine_types = [game.food.food_type]
+    direction = RIGHT
+    while len(engine_types) < spawns:
+        head = (game.snake.get_head_position()[0] // SNAKE_BLOCK, game.snake.get_head_position()[1] // SNAKE_BLOCK)
+        food = (game.food.position[0] // SNAKE_BLOCK, game.food.position[1] // SNAKE_BLOCK)
+        direction = toward(head, food, direction)
+        dx, dy = DIRECTIONS[direction]
+        for event in game.step((dx * SNAKE_BLOCK, dy * SNAKE_BLOCK)):
+            if event[0] == EVENT_FOOD_SPAWN:
+                engine_types.append(game.food.food_type)
+        assert not game.game_over
+
+    env = SnakeBatchEnv(1, speed=HARD, game_mode=TIME_ATTACK_MODE, seed=0)
+    env.rng = FixedRolls()
+    env.reset()
+    batch_types = [int(env.food_type[0])]
+    while len(batch_types) < spawns:
+        head = divmod(int(env.head()[0]), env.cols)[::-1]
+        food = divmod(int(env.food[0]), env.cols)[::-1]
+        rewards, dones = env.step([toward(head, food, int(env.direction[0]))])
+        if rewards[0]:
+            batch_types.append(int(env.food_type[0]))
+        assert not dones[0]
+
+    assert engine_types == batch_types
+    assert engine_types.count(SPECIAL_FOOD) >= 2
@@ -0,0 +1,93 @@
+import random
+
+from codec import StateEncoder, StateDecoder, DIRECTION_CODES, KEYFRAME, DELTA
+from constants import *
+from engine import SnakeEngine
+
+TURNS = [None, (0, -SNAKE_BLOCK), (SNAKE_BLOCK, 0), (0, SNAKE_BLOCK), (-SNAKE_BLOCK, 0)]
+
+
+def assert_decoded(state, engine):
+    """The decoded board holds everything the encoder reads from the engine"""
+    snake = engine.snake
+    assert state.positions().tolist() == [list(position) for position in snake.positions]
+    assert state.direction == DIRECTION_CODES[(snake.direction[0] // SNAKE_BLOCK, snake.direction[1] // SNAKE_BLOCK)]
+    assert (state.tick, state.score, state.time_remaining, state.cause) == (
+        engine.ticks, engine.score, engine.time_remaining, engine.death_cause)
+    food = engine.food
+    assert (state.position(state.food) if state.food is not None else None) == food.position
+    assert (state.food_type, state.food_timer) == (food.food_type, max(food.special_timer, 0))
+    assert state.timers == [snake.boost_timer, snake.multiplier_timer, snake.shrink_timer, snake.slowmo_timer,
+                            snake.double_score_timer, snake.ghost_timer]
+    assert [obstacle[:3] for obstacle in state.obstacles] == [
+        (obstacle.x, obstacle.y, obstacle.type) for obstacle in engine.obstacle_manager.obstacles]
+
+
+def round_trip(engine):
+    data = StateEncoder().keyframe(engine)
+    assert data[0] & 0x0f == KEYFRAME
+    return StateDecoder().decode(data)
+
+
+def test_keyframe_round_trip():
+    engine = SnakeEngine(game_mode=CHALLENGE_MODE, seed=5)  # Has an obstacle off the grid
+    assert_decoded(round_trip(engine), engine)
+
+
+def test_keyframe_head_off_the_board():
+    engine = SnakeEngine(200, 200, seed=1)
+    while not engine.game_over:
+        engine.step()
+    assert engine.death_cause == DEATH_WALL
+    assert engine.snake.positions[0][0] == 200
+    assert_decoded(round_trip(engine), engine)
+
+
+def test_keyframe_ghost_overlap():
+    engine = SnakeEngine(seed=2)
+    # The head has come back round onto its own body
+    engine.snake.set_positions([(100, 100), (120, 100), (120, 120), (100, 120), (100, 100), (80, 100)])
+    engine.snake.ghost_timer = GHOST_DURATION
+    assert_decoded(round_trip(engine), engine)
+
+
+def test_deltas_follow_every_tick():
+    engine = SnakeEngine(game_mode=TIME_ATTACK_MODE, seed=3)
+    rng = random.Random(3)
+    encoder, decoder = StateEncoder(), StateDecoder()
+    kinds = set()
+    for _ in range(3000):
+        engine.step(rng.choice(TURNS) if rng.random() < 0.2 else None)
+        if engine.game_over:
+            engine.reset(rng.getrandbits(32))
+        data = encoder.encode(engine)
+        kinds.add(data[0] & 0x0f)
+        assert_decoded(decoder.decode(data), engine)
+    assert DELTA in kinds
+
+
+def test_delta_shrink_drops_two_segments():
+    engine = SnakeEngine(seed=4)
+    engine.snake.set_positions([(x, 100) for x in range(200, 0, -SNAKE_BLOCK)])
+    engine.snake.shrink_timer = SHRINK_DURATION
+    encoder, decoder = StateEncoder(), StateDecoder()
+    decoder.decode(encoder.encode(engine))
+    length = len(engine.snake.positions)
+    while len(engine.snake.positions) == length:
+        engine.step()
+        data = encoder.encode(engine)
+        assert data[0] & 0x0f == DELTA
+        assert_decoded(decoder.decode(data), engine)
+    assert len(engine.snake.positions) == length - 1
+
+
+def test_keyframe_after_reset():
+    engine = SnakeEngine(seed=6)
+    encoder, decoder = StateEncoder(), StateDecoder()
+    for _ in range(50):
+        engine.step()
+        decoder.decode(encoder.encode(engine))
+    engine.reset(7)
+    data = encoder.encode(engine)
+    assert data[0] & 0x0f == KEYFRAME
+    assert_decoded(decoder.decode(data), engine)
@@ -0,0 +1,17 @@
+import os
+import subprocess
+import sys
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src')
+
+def test_engine_does_not_import_pygame():
+    """The rules must run headless: importing and stepping the engine never loads pygame"""
+    code = ("import sys\n"
+            "from engine import SnakeEngine\n"
+            "engine = SnakeEngine(400, 400, seed=1)\n"
+            "for _ in range(300):\n"
+            "    engine.step()\n"
+            "print('pygame' in sys.modules)\n")
+    # A fresh interpreter, since other tests may already have imported pygame
+    result = subprocess.run([sys.executable, '-c', code], cwd=SRC_DIR, capture_output=True, text=True, check=True)
+    assert result.stdout.strip() == 'False'
@@ -0,0 +1,48 @@
+import random
+
+from constants import *
+from free_cells import FreeCellIndex
+
+
+def test_occupy_and_release_are_reference_counted():
+    index = FreeCellIndex(100, 100)
+    assert len(index) == 25
+    index.occupy((20, 40))
+    index.occupy((20, 40))
+    assert len(index) == 24
+    index.release((20, 40))
+    assert not index.is_free((20, 40))
+    index.release((20, 40))
+    assert index.is_free((20, 40))
+    assert len(index) == 25
+    index.release((20, 40))  # Releasing a free cell changes nothing
+    assert len(index) == 25
+
+
+def test_positions_off_the_board_are_ignored():
+    index = FreeCellIndex(100, 100)
+    for position in ((-20, 0), (100, 0), (0, 100)):
+        index.occupy(position)
+        assert not index.is_free(position)
+    assert len(index) == 25
+
+
+def test_choice_returns_only_free_cells():
+    index = FreeCellIndex(100, 100)
+    taken = {(x, y) for x in range(0, 100, SNAKE_BLOCK) for y in range(0, 100, SNAKE_BLOCK) if (x + y) % 40}
+    for position in taken:
+        index.occupy(position)
+    rng = random.Random(0)
+    for _ in range(200):
+        position = index.choice(rng)
+        assert position not in taken and index.is_free(position)
+
+
+def test_choice_on_a_full_board():
+    index = FreeCellIndex(40, 40)
+    for position in ((0, 0), (20, 0), (0, 20), (20, 20)):
+        index.occupy(position)
+    assert len(index) == 0
+    assert index.choice(random.Random(0)) is None
+    index.release((20, 20))
+    assert index.choice(random.Random(0)) == (20, 20)
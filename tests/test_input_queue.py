@@ -0,0 +1,48 @@
+from constants import *
+from input_queue import InputQueue
+
+UP, DOWN = (0, -SNAKE_BLOCK), (0, SNAKE_BLOCK)
+LEFT, RIGHT = (-SNAKE_BLOCK, 0), (SNAKE_BLOCK, 0)
+
+
+def test_turns_come_out_in_order():
+    queue = InputQueue()
+    assert queue.push(UP, RIGHT, now=0.0)
+    assert queue.push(LEFT, RIGHT, now=0.01)
+    assert queue.pop(now=0.05) == UP
+    assert queue.pop(now=0.05) == LEFT
+    assert queue.pop() is None
+    assert queue.applied == 2
+
+
+def test_repeats_and_reversals_are_dropped():
+    queue = InputQueue()
+    assert not queue.push(RIGHT, RIGHT)  # Already heading that way: not counted
+    assert not queue.push(LEFT, RIGHT)   # Reverses the current direction
+    assert queue.push(UP, RIGHT)
+    assert not queue.push(DOWN, RIGHT)   # Reverses the queued turn, not the current direction
+    assert queue.push(LEFT, RIGHT)       # Fine after UP
+    assert len(queue) == 2
+    assert queue.rejected == 2
+
+
+def test_full_queue_rejects_and_wraps():
+    queue = InputQueue(size=3)
+    for direction in (UP, LEFT, DOWN):
+        assert queue.push(direction, RIGHT)
+    assert not queue.push(RIGHT, RIGHT)
+    assert queue.rejected == 1
+    # Popping and pushing again wraps around the ring without losing order
+    assert queue.pop() == UP
+    assert queue.push(RIGHT, RIGHT)
+    assert [queue.pop(), queue.pop(), queue.pop()] == [LEFT, DOWN, RIGHT]
+    assert len(queue) == 0
+
+
+def test_latency_is_measured_from_the_key_press():
+    queue = InputQueue()
+    queue.push(UP, RIGHT, now=1.0)
+    queue.pop(now=1.1)
+    assert abs(queue.latency_ms - 100) < 1e-6
+    queue.clear()
+    assert queue.pop() is None
@@ -0,0 +1,40 @@
+import os
+
+from autopilot import Autopilot
+from constants import *
+from engine import SnakeEngine
+from replay import Replay
+
+
+def record_autopilot_game(seed):
+    engine = SnakeEngine(240, 240, HARD, CLASSIC_MODE, seed=seed)
+    replay = Replay.start(engine)
+    autopilot = Autopilot()
+    while not engine.game_over and engine.ticks < 5000:
+        action = autopilot.act(engine)
+        replay.record(action)
+        engine.step(action)
+    replay.finish(engine)
+    return replay
+
+
+def test_saved_replay_verifies(tmp_path):
+    replay = record_autopilot_game(seed=11)
+    assert replay.result['score'] > 0
+    path = str(tmp_path / 'replays' / 'game.json')
+    replay.save(path)
+    assert os.listdir(tmp_path / 'replays') == ['game.json']  # The temporary file was renamed over
+
+    loaded = Replay.load(path)
+    assert loaded.to_dict() == replay.to_dict()
+    assert loaded.verify() == {}
+
+
+def test_tampered_replay_fails(tmp_path):
+    replay = record_autopilot_game(seed=11)
+    path = str(tmp_path / 'game.json')
+    replay.save(path)
+    loaded = Replay.load(path)
+    # Turn the first recorded action a quarter turn
+    loaded.inputs[0][1] = loaded.inputs[0][1] % 4 + 1
+    assert loaded.verify() != {}